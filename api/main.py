@@ -4,32 +4,71 @@ Ce script doit contenir l'implémentation des endpoints pour les fonctionnalité
 - Récupération des prédictions pour une date donnée,
 - Récupération des prédictions combinées avec des données réelles observées pour une période donnée
 """
+import asyncio
 import os
 import platform
+from contextlib import asynccontextmanager
 from datetime import datetime, time, timedelta, date
 from urllib.parse import unquote
 
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException
-from sqlalchemy import func, and_
+import pandas as pd
+from fastapi import FastAPI, HTTPException, Depends, Query, Response
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, generate_latest
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from model.entity.data_predict_timeseries import DataPredictTimeseries
-from model.entity.data_process_timeseries import DataProcessTimeseries
+from api.metrics import MetricsRoute, StateCollector, instrument_engine
+from model.entity.location import DEFAULT_LOCATION
 from model.helpers.api_helper import get_version
-from model.repository.logging_timeseries_repository import LoggingTimeseriesRepository
-from model.services.database_manager import DatabaseManager
+from model.pipeline.timeseries.DataManager import DataManager
+from model.repository.data_process_timeseries_repository import AsyncDataProcessTimeSeriesRepository
+from model.repository.latest_prediction_repository import AsyncLatestPredictionRepository
+from model.services.database_manager import DatabaseManager, get_async_session
+from model.services.forecast_service import ForecastService
 from model.services.secure_logger_manager import SecureLoggerManager
 
 load_dotenv()
 api_version = get_version()
 nb_days_predict = 7
+max_forecast_horizon = int(os.getenv("FORECAST_MAX_HORIZON", "240"))
 
 secure_log = SecureLoggerManager('api').get_logger()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Crée le pool de connexions asynchrone une seule fois au démarrage de l'API
+    et le libère à l'arrêt. Charge aussi le modèle champion du site par défaut utilisé par /forecast
+    et surveille les changements des champions servis.
+    """
+    instrument_engine(DatabaseManager.init_shared_async_engine().sync_engine)
+
+    forecast_service = ForecastService()
+    app.state.forecast_service = forecast_service
+    try:
+        async with DatabaseManager.shared_async_session() as session:
+            await forecast_service.reload(session)
+    except Exception as e:
+        secure_log.error(f"Chargement du champion impossible au démarrage : {e}")
+    watcher = asyncio.create_task(forecast_service.watch(DatabaseManager.shared_async_session))
+
+    yield
+
+    watcher.cancel()
+    await forecast_service.stop()
+    await DatabaseManager.dispose_shared_async_engine()
+
+
 app = FastAPI(
     title="MESP2 API",
     description="API de prédiction de séries temporelles météo (projet MESP2)",
-    version=api_version
+    version=api_version,
+    lifespan=lifespan
 )
+# Routes déclarées ci-dessous instrumentées (requêtes, latence, requêtes en cours)
+app.router.route_class = MetricsRoute
+REGISTRY.register(StateCollector(app))
 
 @app.get("/",
          tags=["Informations"],
@@ -47,7 +86,9 @@ app = FastAPI(
                                  {"path": "/docs", "description": "Documentation Swagger"},
                                  {"path": "/predictions/{date}", "description": "Prédictions pour une date donnée"},
                                  {"path": "/predictions/combined/{start_date}/{end_date}", "description": "Données combinées (réelles + prédictions)"},
+                                 {"path": "/forecast", "description": "Prévision à la demande avec le modèle champion"},
                                  {"path": "/version", "description": "Version de l'API"},
+                                 {"path": "/metrics", "description": "Métriques Prometheus"},
                              ],
                              "contact": "contact@thodler.art"
                          }
@@ -72,7 +113,9 @@ async def root():
             {"path": "/docs", "description": "Documentation Swagger"},
             {"path": "/predictions/{date}", "description": "Prédictions pour une date donnée"},
             {"path": "/predictions/combined/{start_date}/{end_date}", "description": "Données combinées (réelles + prédictions)"},
+            {"path": "/forecast", "description": "Prévision à la demande avec le modèle champion"},
             {"path": "/version", "description": "Version de l’API"},
+            {"path": "/metrics", "description": "Métriques Prometheus"},
         ],
         "contact": "contact@thodler.art"
     }
@@ -110,18 +153,18 @@ async def root():
                  }
              }
          })
-async def combined_predictions(start_date: str, end_date: str):
+async def combined_predictions(start_date: str, end_date: str,
+                               location: str = Query(DEFAULT_LOCATION, description="Identifiant du site"),
+                               session: AsyncSession = Depends(get_async_session)):
     """
     Récupère les données combinées pour une période donnée.
 
     - **start_date** : Date de début au format YYYY-MM-DD (exemple: 2025-06-01)
     - **end_date** : Date de fin au format YYYY-MM-DD (exemple: 2025-06-07)
+    - **location** : Identifiant du site (berlin par défaut)
     - **Retourne** : Une liste d'objets contenant, pour chaque timestamp, la valeur réelle observée et la prédiction associée.
     """
-    db_manager = DatabaseManager()
     try:
-        db_manager.init_connection()
-
         if start_date > end_date:
             raise HTTPException(
                 status_code=400,
@@ -137,65 +180,17 @@ async def combined_predictions(start_date: str, end_date: str):
         start_dt_dt = datetime.combine(start_dt, time.min)
         end_dt_dt = datetime.combine(end_dt, time.max)
 
-        sub_obs = (
-            db_manager.session.query(DataProcessTimeseries.ds)
-            .filter(
-                DataProcessTimeseries.ds >= start_dt_dt,
-                DataProcessTimeseries.ds <= end_dt_dt
-            )
-            .group_by(DataProcessTimeseries.ds)
-            .subquery()
-        )
-
-        # Récupérer les données réelles pour ces timestamps exacts
-        observed = (
-            db_manager.session.query(DataProcessTimeseries)
-            .join(
-                sub_obs,
-                and_(
-                    DataProcessTimeseries.ds == sub_obs.c.ds
-                )
-            )
-            .all()
-        )
-
-        # Récupérer les prédictions
-        sub_pred = (
-            db_manager.session.query(
-                DataPredictTimeseries.ds,
-                func.max(DataPredictTimeseries.created_at).label("max_created_at")
-            )
-            .filter(
-                DataPredictTimeseries.ds >= start_dt_dt,
-                DataPredictTimeseries.ds <= end_dt_dt
-            )
-            .group_by(DataPredictTimeseries.ds)
-            .subquery()
-        )
-        predicts = (
-            db_manager.session.query(DataPredictTimeseries)
-            .join(
-                sub_pred,
-                and_(
-                    DataPredictTimeseries.ds == sub_pred.c.ds,
-                    DataPredictTimeseries.created_at == sub_pred.c.max_created_at
-                )
-            )
-            .all()
-        )
-
-        print(observed)
-        # Construire la réponse combinée
-        combined_list = []
-        for obs in observed:
-            print(obs.ds, obs.y)
-            pred = next((p.y for p in predicts if p.ds == obs.ds), None)
-            item = {
-                "ds": obs.ds.isoformat(),
-                "y_pred": pred ,
-                "y": obs.y
+        # Données réelles et dernière prédiction de chaque timestamp, alignées par la base
+        rows = await AsyncDataProcessTimeSeriesRepository(session).get_combined_between_dates(start_dt_dt, end_dt_dt, location)
+
+        combined_list = [
+            {
+                "ds": row.ds.isoformat(),
+                "y_pred": row.y_pred,
+                "y": row.y
             }
-            combined_list.append(item)
+            for row in rows
+        ]
 
         return {"combined": combined_list}
 
@@ -208,7 +203,6 @@ async def combined_predictions(start_date: str, end_date: str):
         return {"combined": [], "error": str(e)}
     finally:
         secure_log.info("Fin de combined_predictions")
-        db_manager.session.close()
 
 
 
@@ -249,19 +243,18 @@ async def combined_predictions(start_date: str, end_date: str):
                  "description": "Erreur interne du serveur"
              }
          })
-async def predictions(date: str):
+async def predictions(date: str, location: str = Query(DEFAULT_LOCATION, description="Identifiant du site"),
+                      session: AsyncSession = Depends(get_async_session)):
     """
     Récupère les prédictions pour une date donnée.
     - **date** : La date au format YYYY-MM-DD (exemple : 2025-06-20)
+    - **location** : Identifiant du site (berlin par défaut)
     """
 
     decoded_date = unquote(date)
     date = decoded_date.replace("/", "-")
 
-    db_manager = DatabaseManager()
     try:
-        db_manager.init_connection()
-
         target_date = datetime.strptime(date, "%Y-%m-%d").date()
         today = target_date.today()
 
@@ -278,31 +271,8 @@ async def predictions(date: str):
         start_dt = datetime.combine(target_date, time.min)
         end_dt = datetime.combine(target_date, time.max)
 
-        champion = LoggingTimeseriesRepository(db_manager.session).get_best_model()
-
-        latest_model_query = (
-            db_manager.session.query(
-                DataPredictTimeseries.model_id,
-                func.max(DataPredictTimeseries.created_at).label('max_created_at')
-            )
-            .filter(
-                DataPredictTimeseries.model_id.contains(champion.model)
-            )
-            .group_by(DataPredictTimeseries.model_id)
-            .order_by(func.max(DataPredictTimeseries.created_at).desc())
-            .limit(1)
-            .subquery()
-        )
-
-        predicts = (
-            db_manager.session.query(DataPredictTimeseries)
-            .filter(
-                DataPredictTimeseries.ds >= start_dt,
-                DataPredictTimeseries.ds <= end_dt,
-                DataPredictTimeseries.model_id == latest_model_query.c.model_id
-            )
-            .all()
-        )
+        # Dernières prédictions du champion, tenues à jour par le batch predictor
+        predicts = await AsyncLatestPredictionRepository(session).get_between_dates(start_dt, end_dt, location)
 
         return {
             "prediction": predicts,
@@ -322,7 +292,69 @@ async def predictions(date: str):
         raise HTTPException(status_code=500, detail=str(e))
     finally:
         secure_log.info("Fin de predictions")
-        db_manager.session.close()
+
+@app.get("/forecast",
+         responses={
+             200: {
+                 "description": "Prévision calculée avec succès",
+                 "content": {
+                     "application/json": {
+                         "example": {
+                             "model_id": "XGBRegressor_20250620000000",
+                             "location": "berlin",
+                             "forecast": [
+                                 {"ds": "2025-06-20T03:00:00", "y_pred": 21.4},
+                                 {"ds": "2025-06-20T06:00:00", "y_pred": 23.9}
+                             ],
+                             "count": 2
+                         }
+                     }
+                 }
+             },
+             400: {"description": "Horizon invalide"},
+             503: {"description": "Aucun modèle champion chargé ou historique insuffisant"}
+         })
+async def forecast(horizon: int = Query(120, description="Nombre de pas de 3h à prédire"),
+                   location: str = Query(DEFAULT_LOCATION, description="Identifiant du site"),
+                   session: AsyncSession = Depends(get_async_session)):
+    """
+    Prévision récursive à la demande, à partir des dernières données transformées du site,
+    avec le modèle champion du site gardé en mémoire.
+
+    - **horizon** : nombre de pas de 3 heures à prédire (120 par défaut)
+    - **location** : Identifiant du site (berlin par défaut)
+    """
+    if not 1 <= horizon <= max_forecast_horizon:
+        raise HTTPException(status_code=400, detail=f"L'horizon doit être compris entre 1 et {max_forecast_horizon}")
+
+    service = getattr(app.state, "forecast_service", None)
+    if service is None:
+        service = app.state.forecast_service = ForecastService()
+    if service.model(location) is None:
+        await service.reload(session, location)
+    # Modèle figé pour la requête, même si le champion est rechargé entre-temps
+    model = service.model(location)
+    if model is None:
+        raise HTTPException(status_code=503, detail=f"Aucun modèle champion disponible pour le site {location}")
+    model_id, booster, n_lags = model
+
+    rows = await AsyncDataProcessTimeSeriesRepository(session).get_last_values(n_lags, location)
+    if len(rows) < n_lags:
+        raise HTTPException(status_code=503, detail="Historique insuffisant pour construire les lags")
+
+    predictions = await service.forecast([row.y for row in rows], horizon, booster)
+
+    step = pd.Timedelta(DataManager.RESAMPLE_FREQUENCY)
+    last_ds = pd.Timestamp(rows[0].ds)
+    return {
+        "model_id": model_id,
+        "location": location,
+        "forecast": [
+            {"ds": (last_ds + step * (i + 1)).isoformat(), "y_pred": float(value)}
+            for i, value in enumerate(predictions)
+        ],
+        "count": horizon,
+    }
 
 @app.get("/version",
          responses={
@@ -348,3 +380,29 @@ async def version():
     - **Exemple de réponse** : {"version" : "0.0.0"} ou {"version" : "a1b2c3d4"} ou {"version" : "v1.0.0"}
     """
     return {"version": api_version}
+
+@app.get("/metrics",
+         tags=["Informations"],
+         response_class=Response,
+         responses={
+             200: {
+                 "description": "Métriques au format texte Prometheus",
+                 "content": {
+                     "text/plain": {
+                         "example": (
+                             'http_requests_total{method="GET",route="/forecast",status="200"} 42.0\n'
+                             'champion_model_info{location="berlin",model_id="XGBRegressor_20250620000000"} 1.0'
+                         )
+                     }
+                 }
+             }
+         })
+async def metrics():
+    """
+    Métriques Prometheus de l'API :
+    - requêtes, latence et requêtes en cours par route,
+    - durée des requêtes SQL par opération et table,
+    - succès / échecs du cache des modèles,
+    - modèle champion servi par /forecast pour chaque site.
+    """
+    return Response(generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,140 @@
+"""
+Métriques Prometheus de l'API, exposées sur /metrics :
+- requêtes par route (compteur, histogramme de latence, requêtes en cours) via la classe de route MetricsRoute,
+- durée d'exécution des requêtes SQL via les événements d'engine SQLAlchemy,
+- succès / échecs du cache LRU des modèles et modèle champion servi par /forecast, lus à chaque collecte.
+
+Le coût par requête se limite à quelques incréments et une observation d'histogramme (API_METRICS=false pour désactiver).
+"""
+import os
+import re
+import time
+from functools import lru_cache
+
+from fastapi.exceptions import RequestValidationError
+from fastapi.routing import APIRoute
+from prometheus_client import Counter, Gauge, Histogram, disable_created_metrics
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, InfoMetricFamily
+from prometheus_client.registry import Collector
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.exceptions import HTTPException
+
+from model.services.registry_manager import RegistryManager
+
+ENABLED = os.getenv("API_METRICS", "true").lower() in ('1', 'true', 'yes')
+
+# Séries *_created inutiles pour des compteurs vivant avec le processus : collecte deux fois plus légère
+disable_created_metrics()
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+QUERY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+HTTP_REQUESTS = Counter('http_requests', "Requêtes HTTP traitées", ['method', 'route', 'status'])
+HTTP_LATENCY = Histogram('http_request_duration_seconds', "Durée de traitement des requêtes (secondes)",
+                         ['method', 'route'], buckets=LATENCY_BUCKETS)
+HTTP_IN_PROGRESS = Gauge('http_requests_in_progress', "Requêtes en cours de traitement", ['method', 'route'])
+DB_QUERY_LATENCY = Histogram('db_query_duration_seconds', "Durée d'exécution des requêtes SQL (secondes)",
+                             ['operation', 'table'], buckets=QUERY_BUCKETS)
+
+QUERY_TABLE = re.compile(r'\b(?:FROM|INTO|UPDATE|JOIN)\s+"?(\w+)', re.IGNORECASE)
+
+
+class MetricsRoute(APIRoute):
+    """
+    Route FastAPI instrumentée : le libellé est le modèle de chemin (/predictions/{date}),
+    pas l'URL, pour garder un nombre de séries borné.
+    """
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        if not ENABLED:
+            return handler
+        route = self.path_format
+        # Séries de la route résolues une seule fois (labels() coûte une recherche sous verrou)
+        in_progress = {method: HTTP_IN_PROGRESS.labels(method, route) for method in self.methods}
+        latency = {method: HTTP_LATENCY.labels(method, route) for method in self.methods}
+        requests = {}
+
+        async def instrumented(request):
+            method = request.method
+            in_progress[method].inc()
+            status = 500
+            start = time.perf_counter()
+            try:
+                response = await handler(request)
+                status = response.status_code
+                return response
+            except HTTPException as e:
+                status = e.status_code
+                raise
+            except RequestValidationError:
+                status = 422
+                raise
+            finally:
+                latency[method].observe(time.perf_counter() - start)
+                counter = requests.get((method, status))
+                if counter is None:
+                    counter = requests[(method, status)] = HTTP_REQUESTS.labels(method, route, str(status))
+                counter.inc()
+                in_progress[method].dec()
+
+        return instrumented
+
+
+@lru_cache(maxsize=1024)
+def query_labels(statement: str) -> tuple[str, str]:
+    """Opération (SELECT, INSERT...) et première table d'une requête SQL, mémorisées par texte de requête"""
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ''
+    match = QUERY_TABLE.search(statement)
+    return operation, match.group(1) if match else ''
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['query_start'].pop()
+    DB_QUERY_LATENCY.labels(*query_labels(statement)).observe(elapsed)
+
+
+def _handle_error(exception_context):
+    starts = exception_context.connection.info.get('query_start') if exception_context.connection else None
+    if starts:
+        starts.pop()
+
+
+def instrument_engine(engine: Engine):
+    """
+    Mesure la durée d'exécution de chaque requête SQL de l'engine (engine.sync_engine pour un engine asynchrone).
+    Sans effet si l'engine est déjà instrumenté ou si API_METRICS=false.
+    """
+    if not ENABLED or event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        return
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+    event.listen(engine, 'handle_error', _handle_error)
+
+
+class StateCollector(Collector):
+    """Cache LRU des modèles et champion de chaque site, lus au moment de la collecte (aucun coût par requête)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    def collect(self):
+        hits, misses, entries = RegistryManager.cache_stats()
+        yield CounterMetricFamily('model_cache_hits', "Modèles servis par le cache LRU du registre", value=hits)
+        yield CounterMetricFamily('model_cache_misses', "Modèles lus sur disque par le registre", value=misses)
+        yield GaugeMetricFamily('model_cache_entries', "Modèles présents dans le cache LRU du registre", value=entries)
+
+        service = getattr(self.app.state, 'forecast_service', None)
+        models = getattr(service, 'models', None) or {}
+        yield GaugeMetricFamily('champion_model_loaded', "Nombre de sites dont le champion est chargé pour /forecast",
+                                value=len(models))
+        if models:
+            info = InfoMetricFamily('champion_model', "Modèle champion servi par /forecast", labels=['location'])
+            for location_id, (model_id, _, _) in sorted(models.items()):
+                info.add_metric([location_id], {'model_id': model_id})
+            yield info
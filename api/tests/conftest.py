@@ -1,12 +1,44 @@
 import pytest
 from fastapi.testclient import TestClient
 from datetime import datetime, timedelta
-from unittest.mock import patch, MagicMock
+from unittest.mock import AsyncMock
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 
 from api.main import app
+from api.metrics import instrument_engine
+from model.entity.base import Base
+from model.entity.location import DEFAULT_LOCATION
+from model.services.database_manager import get_async_session
+from model.services.forecast_service import ForecastService
 from model.entity.data_predict_timeseries import DataPredictTimeseries
 from model.entity.data_process_timeseries import DataProcessTimeseries
 
+class IdleForecastService(ForecastService):
+    """
+    Service de prévision du lifespan des tests : ni chargement ni surveillance du champion
+    """
+
+    async def reload(self, session, location_id: str = DEFAULT_LOCATION) -> bool:
+        return False
+
+    async def watch(self, session_factory):
+        return None
+
+
+@pytest.fixture(autouse=True)
+def isolated_lifespan(tmp_path, monkeypatch):
+    """
+    Le lifespan de l'API (TestClient en contexte) ouvre une base SQLite temporaire
+    au lieu de data/open_meteo.db et ne charge pas le champion
+    """
+    monkeypatch.setenv("SQLITE_PATH", str(tmp_path / "api.db"))
+    monkeypatch.setattr("api.main.ForecastService", IdleForecastService)
+
+
 @pytest.fixture
 def client():
     """
@@ -17,22 +49,12 @@ def client():
 @pytest.fixture
 def mock_db_session():
     """
-    Simule une session de base de données pour isoler les tests
+    Simule la session asynchrone fournie par la dépendance get_async_session pour isoler les tests
     """
-    with patch('api.main.DatabaseManager') as mock_db_manager:
-        mock_session = MagicMock()
-        mock_db_manager.return_value.session = mock_session
-        mock_db_manager.return_value.init_connection.return_value = None
-        yield mock_db_manager
-
-@pytest.fixture
-def mock_champion_model():
-    """
-    Fixture qui simule le modèle champion retourné par le repository
-    """
-    mock_champion = MagicMock()
-    mock_champion.model = "champion_model"
-    return mock_champion
+    mock_session = AsyncMock()
+    app.dependency_overrides[get_async_session] = lambda: mock_session
+    yield mock_session
+    app.dependency_overrides.pop(get_async_session, None)
 
 @pytest.fixture
 def mock_predictions():
@@ -66,3 +88,27 @@ def mock_observed_data():
     return observed
 
 
+@pytest.fixture
+def sqlite_db(tmp_path):
+    """
+    Base SQLite temporaire, branchée sur la dépendance get_async_session.
+    Retourne une session synchrone pour alimenter les tables.
+    """
+    db_path = tmp_path / "test.db"
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", poolclass=NullPool)
+    instrument_engine(async_engine.sync_engine)  # comme l'engine partagé au démarrage de l'API
+    async_session_factory = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+
+    async def override():
+        async with async_session_factory() as async_session:
+            yield async_session
+
+    app.dependency_overrides[get_async_session] = override
+    yield session
+    app.dependency_overrides.pop(get_async_session, None)
+    session.close()
+    engine.dispose()
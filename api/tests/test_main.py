@@ -1,19 +1,30 @@
 from api.main import app
 
 from datetime import datetime, timedelta
+from types import SimpleNamespace
 from fastapi.testclient import TestClient
-from unittest.mock import patch
+from unittest.mock import patch, AsyncMock
+
+import numpy as np
+import pandas as pd
+from xgboost import XGBRegressor
+
+from model.entity.data_process_timeseries import DataProcessTimeseries
+from model.entity.latest_prediction import LatestPrediction
+from model.entity.logging_timeseries import LoggingTimeseries
+from model.services.database_manager import DatabaseManager
+from model.services.forecast_service import ForecastService, recursive_forecast
+from model.services.registry_manager import RegistryManager
 
 
 client = TestClient(app)
 
-def test_predictions_success(client, mock_db_session, mock_champion_model, mock_predictions):
+def test_predictions_success(client, mock_db_session, mock_predictions):
     """
     Test de succès pour l'endpoint /predictions/{date}
     """
-    with patch('api.main.LoggingTimeseriesRepository') as mock_repo:
-        mock_repo.return_value.get_best_model.return_value = mock_champion_model
-        mock_db_session.return_value.session.query.return_value.filter.return_value.all.return_value = mock_predictions
+    with patch('api.main.AsyncLatestPredictionRepository') as mock_latest_repo:
+        mock_latest_repo.return_value.get_between_dates = AsyncMock(return_value=mock_predictions)
 
         future_date = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
 
@@ -61,18 +72,20 @@ def test_predictions_invalid_date_format(client):
     assert "Format de date invalide" in response.json()["detail"]
 
 
-def test_combined_predictions_success(client, mock_db_session, mock_champion_model, mock_predictions,
-                                      mock_observed_data):
-
-    mock_db_session.return_value.session.query.return_value.join.return_value.all.side_effect = [
-        mock_observed_data,
-        mock_predictions
-    ]
+def test_combined_predictions_success(client, mock_db_session, mock_predictions, mock_observed_data):
 
     start_date = "2025-06-20"
     end_date = "2025-06-21"
 
-    response = client.get(f"/predictions/combined/{start_date}/{end_date}")
+    rows = [
+        SimpleNamespace(ds=obs.ds, y=obs.y, y_pred=pred.y)
+        for obs, pred in zip(mock_observed_data, mock_predictions)
+    ]
+
+    with patch('api.main.AsyncDataProcessTimeSeriesRepository') as mock_process_repo:
+        mock_process_repo.return_value.get_combined_between_dates = AsyncMock(return_value=rows)
+
+        response = client.get(f"/predictions/combined/{start_date}/{end_date}")
 
     assert response.status_code == 200
     assert "combined" in response.json()
@@ -102,7 +115,7 @@ def test_predictions_database_error(client, mock_db_session):
     """
     Test de gestion d'erreur de base de données pour l'endpoint /predictions/{date}
     """
-    mock_db_session.return_value.init_connection.side_effect = Exception("Erreur de connexion à la base de données")
+    mock_db_session.execute.side_effect = Exception("Erreur de connexion à la base de données")
 
     future_date = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
 
@@ -116,10 +129,10 @@ def test_combined_predictions_database_error(client, mock_db_session):
     """
     Test de gestion d'erreur de base de données pour l'endpoint /predictions/combined/{start_date}/{end_date}
     """
-    mock_db_session.return_value.init_connection.side_effect = Exception("Erreur de connexion à la base de données")
+    mock_db_session.execute.side_effect = Exception("Erreur de connexion à la base de données")
 
-    start_date = datetime.now().strftime("%Y-%m-%d")
-    end_date = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
+    start_date = (datetime.now() - timedelta(days=2)).strftime("%Y-%m-%d")
+    end_date = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
 
     response = client.get(f"/predictions/combined/{start_date}/{end_date}")
 
@@ -131,3 +144,125 @@ def test_version():
     assert response.status_code == 200
     assert "version" in response.json()
 
+
+def test_lifespan_shared_engine():
+    """
+    Le lifespan crée un unique engine asynchrone partagé au démarrage et le libère à l'arrêt
+    """
+    with TestClient(app):
+        engine = DatabaseManager._shared_async_engine
+        assert engine is not None
+        assert DatabaseManager.init_shared_async_engine() is engine
+
+    assert DatabaseManager._shared_async_engine is None
+
+
+def test_predictions_from_database(client, sqlite_db):
+    """
+    Test de bout en bout de /predictions/{date} sur une base SQLite réelle (accès asynchrone)
+    """
+    target = datetime.combine((datetime.now() + timedelta(days=1)).date(), datetime.min.time())
+    sqlite_db.add_all([
+        LatestPrediction(ds=target + timedelta(hours=3 * i), y=20.0 + i,
+                         model_id="XGBRegressor_20250101000000", run_id="run")
+        for i in range(9)
+    ])
+    sqlite_db.commit()
+
+    response = client.get(f"/predictions/{target.strftime('%Y-%m-%d')}")
+
+    assert response.status_code == 200
+    assert response.json()["count"] == 8
+
+
+def test_predictions_filtered_by_location(client, sqlite_db):
+    """
+    Le paramètre location sélectionne les prédictions d'un site ; berlin par défaut
+    """
+    target = datetime.combine((datetime.now() + timedelta(days=1)).date(), datetime.min.time())
+    for location_id, count in (('berlin', 8), ('paris', 3)):
+        sqlite_db.add_all([
+            LatestPrediction(location_id=location_id, ds=target + timedelta(hours=3 * i), y=20.0 + i,
+                             model_id="XGBRegressor_20250101000000", run_id="run")
+            for i in range(count)
+        ])
+    sqlite_db.commit()
+
+    day = target.strftime('%Y-%m-%d')
+    assert client.get(f"/predictions/{day}").json()["count"] == 8
+    assert client.get(f"/predictions/{day}?location=paris").json()["count"] == 3
+    assert client.get(f"/predictions/{day}?location=lyon").json()["count"] == 0
+
+
+def test_combined_predictions_from_database(client, sqlite_db):
+    """
+    Test de bout en bout de /predictions/combined sur une base SQLite réelle (accès asynchrone)
+    """
+    start = datetime(2025, 6, 20)
+    sqlite_db.add_all([
+        DataProcessTimeseries(ds=start + timedelta(hours=3 * i), y=15.0 + i, relative_humidity_2m=50.0)
+        for i in range(8)
+    ])
+    sqlite_db.add_all([
+        LatestPrediction(ds=start + timedelta(hours=3 * i), y=14.0 + i, model_id="XGBRegressor_1", run_id="run")
+        for i in range(4)
+    ])
+    sqlite_db.commit()
+
+    response = client.get("/predictions/combined/2025-06-20/2025-06-20")
+
+    assert response.status_code == 200
+    combined = response.json()["combined"]
+    assert len(combined) == 8
+    assert combined[0] == {"ds": "2025-06-20T00:00:00", "y_pred": 14.0, "y": 15.0}
+    assert combined[-1]["y_pred"] is None
+
+
+def test_forecast_with_champion_loaded_on_demand(sqlite_db, tmp_path):
+    """
+    /forecast charge le champion du site, construit les lags à partir des dernières données
+    transformées et renvoie une prévision récursive ; un site sans champion n'est pas prédit
+    """
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(15, 5, size=(200, 3)), columns=['y_lag_1', 'y_lag_2', 'y_lag_3'])
+    model = XGBRegressor(n_estimators=20, max_depth=3).fit(X, X['y_lag_1'] * 0.9 + 1)
+    paris_model = XGBRegressor(n_estimators=20, max_depth=3).fit(X[['y_lag_1', 'y_lag_2']], X['y_lag_1'] * 0.5)
+    registry = RegistryManager(tmp_path / "registry")
+    registry.save(model, "XGBRegressor_20250101000000")
+    registry.save(paris_model, "XGBRegressor_20250102000000", location_id='paris')
+
+    start = datetime(2025, 6, 20)
+    for location_id in ('berlin', 'paris', 'lyon'):
+        sqlite_db.add_all([
+            DataProcessTimeseries(location_id=location_id, ds=start + timedelta(hours=3 * i), y=15.0 + i,
+                                  relative_humidity_2m=50.0)
+            for i in range(8)
+        ])
+    sqlite_db.add(LoggingTimeseries(model='XGBRegressor', model_id="XGBRegressor_20250101000000", score=1.0,
+                                    params={'n_lags': 3}, results={}, is_notebook=False))
+    # Meilleur score, mais champion de paris seulement
+    sqlite_db.add(LoggingTimeseries(model='XGBRegressor', model_id="XGBRegressor_20250102000000", score=0.5,
+                                    params={'n_lags': 2}, results={}, is_notebook=False, location_id='paris'))
+    sqlite_db.commit()
+
+    with TestClient(app) as test_client:
+        app.state.forecast_service = ForecastService(registry=registry)
+        response = test_client.get("/forecast?horizon=5")
+        invalid = test_client.get("/forecast?horizon=0")
+        paris = test_client.get("/forecast?horizon=5&location=paris")
+        untrained = test_client.get("/forecast?horizon=5&location=lyon")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["model_id"] == "XGBRegressor_20250101000000"
+    assert body["count"] == 5
+    assert body["forecast"][0]["ds"] == "2025-06-21T00:00:00"
+
+    expected = recursive_forecast(model.get_booster(), np.array([[22.0, 21.0, 20.0]]), 5)[0]
+    np.testing.assert_allclose([point["y_pred"] for point in body["forecast"]], expected, rtol=1e-6)
+    assert invalid.status_code == 400
+
+    assert paris.json()["model_id"] == "XGBRegressor_20250102000000"
+    expected = recursive_forecast(paris_model.get_booster(), np.array([[22.0, 21.0]]), 5)[0]
+    np.testing.assert_allclose([point["y_pred"] for point in paris.json()["forecast"]], expected, rtol=1e-6)
+    assert untrained.status_code == 503
@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from prometheus_client import REGISTRY
+
+from api.main import app
+from model.entity.latest_prediction import LatestPrediction
+
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_requests_are_counted_per_route_template(client):
+    """
+    Compteur, histogramme de latence et requêtes en cours sont libellés par modèle de chemin,
+    avec le statut réel des requêtes rejetées
+    """
+    route = {'method': 'GET', 'route': '/predictions/{date}'}
+    rejected = sample('http_requests_total', status='400', **route)
+    observed = sample('http_request_duration_seconds_count', **route)
+
+    for days in (1, 2):
+        past = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+        assert client.get(f"/predictions/{past}").status_code == 400
+    assert client.get("/forecast?horizon=0").status_code == 400
+
+    assert sample('http_requests_total', status='400', **route) == rejected + 2
+    assert sample('http_request_duration_seconds_count', **route) == observed + 2
+    assert sample('http_requests_in_progress', **route) == 0
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('text/plain')
+    assert 'http_requests_total{method="GET",route="/forecast",status="400"}' in response.text
+
+
+def test_database_queries_are_timed(client, sqlite_db):
+    """Les requêtes SQL de l'engine asynchrone sont mesurées par opération et table"""
+    target = datetime.combine((datetime.now() + timedelta(days=1)).date(), datetime.min.time())
+    sqlite_db.add(LatestPrediction(ds=target, y=20.0, model_id="XGBRegressor_20250101000000", run_id="run"))
+    sqlite_db.commit()
+    query = {'operation': 'SELECT', 'table': 'latest_prediction'}
+    before = sample('db_query_duration_seconds_count', **query)
+
+    assert client.get(f"/predictions/{target.strftime('%Y-%m-%d')}").json()["count"] == 1
+
+    assert sample('db_query_duration_seconds_count', **query) == before + 1
+    assert sample('db_query_duration_seconds_sum', **query) > 0
+
+
+def test_champion_and_model_cache_are_reported(client, monkeypatch):
+    """Le champion servi par /forecast pour chaque site et le cache LRU des modèles sont lus à chaque collecte"""
+    models = {'berlin': ('XGBRegressor_20250620000000', None, 3), 'paris': ('XGBRegressor_20250621000000', None, 5)}
+    monkeypatch.setattr(app.state, 'forecast_service', SimpleNamespace(models=models), raising=False)
+
+    text = client.get("/metrics").text
+
+    assert 'champion_model_info{location="berlin",model_id="XGBRegressor_20250620000000"} 1.0' in text
+    assert 'champion_model_info{location="paris",model_id="XGBRegressor_20250621000000"} 1.0' in text
+    assert 'champion_model_loaded 2.0' in text
+    assert 'model_cache_hits_total' in text and 'model_cache_misses_total' in text
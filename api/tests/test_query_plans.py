@@ -0,0 +1,76 @@
+"""
+Vérifie, via EXPLAIN QUERY PLAN sur une base SQLite migrée, que les requêtes
+de l'API s'appuient sur les index plutôt que sur un parcours complet des tables.
+"""
+import asyncio
+import sqlite3
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.pool import NullPool
+
+from model.repository.data_process_timeseries_repository import AsyncDataProcessTimeSeriesRepository
+from model.repository.latest_prediction_repository import AsyncLatestPredictionRepository
+from model.repository.logging_timeseries_repository import AsyncLoggingTimeseriesRepository
+from model.services.database_manager import DatabaseManager
+
+START = datetime(2025, 6, 1)
+END = datetime(2025, 6, 30, 23, 59, 59)
+
+
+@pytest.fixture
+def migrated_db_path(tmp_path):
+    db_path = tmp_path / "plans.db"
+    db_manager = DatabaseManager()
+    db_manager.connect_sqlite(str(db_path))
+    db_manager.upgrade_schema()
+    db_manager.close()
+    db_manager.engine.dispose()
+    return db_path
+
+
+def query_plans(db_path, call):
+    """Exécute l'appel de repository et retourne le plan de chaque requête émise."""
+    statements = []
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", poolclass=NullPool)
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    async def run():
+        async with async_sessionmaker(bind=engine)() as session:
+            await call(session)
+        await engine.dispose()
+
+    asyncio.run(run())
+
+    with sqlite3.connect(db_path) as connection:
+        return [
+            " | ".join(row[-1] for row in connection.execute(f"EXPLAIN QUERY PLAN {statement}", parameters))
+            for statement, parameters in statements
+        ]
+
+
+def test_predictions_plan_uses_primary_key(migrated_db_path):
+    [plan] = query_plans(migrated_db_path,
+                         lambda session: AsyncLatestPredictionRepository(session).get_between_dates(START, END))
+    assert "SEARCH latest_prediction USING INDEX sqlite_autoindex_latest_prediction_1" in plan
+
+
+def test_combined_plan_uses_indexes(migrated_db_path):
+    [plan] = query_plans(migrated_db_path,
+                         lambda session: AsyncDataProcessTimeSeriesRepository(session).get_combined_between_dates(START, END))
+    assert "SEARCH data_process_timeseries USING INDEX" in plan
+    assert "SEARCH latest_prediction USING INDEX sqlite_autoindex_latest_prediction_1" in plan
+    assert "SCAN" not in plan.replace("SCAN CONSTANT ROW", "")
+
+
+def test_best_model_plan_uses_location_score_index(migrated_db_path):
+    [plan] = query_plans(migrated_db_path,
+                         lambda session: AsyncLoggingTimeseriesRepository(session).get_best_model('paris'))
+    assert "ix_logging_timeseries_location_id_is_notebook_score" in plan
+    assert "SCAN logging_timeseries" not in plan
+
@@ -0,0 +1,147 @@
+"""
+Benchmark du débit de l'endpoint /predictions/combined :
+handler bloquant (session SQLAlchemy synchrone dans un endpoint async, comportement historique)
+contre le chemin asynchrone (AsyncSession + aiosqlite).
+
+Une latence réseau par requête SQL est simulée (--latency-ms) pour reproduire
+un aller-retour vers PostgreSQL : en mode bloquant elle gèle la boucle d'événements,
+en mode asynchrone les requêtes concurrentes se recouvrent.
+
+Usage :
+    python -m benchmarks.bench_api_async --requests 200 --concurrency 20 --latency-ms 5
+"""
+import argparse
+import asyncio
+import tempfile
+import time as time_module
+from datetime import datetime, timedelta, time
+from pathlib import Path
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import sessionmaker, Session
+
+from api.main import app as async_app
+from model.entity.base import Base
+from model.entity.data_predict_timeseries import DataPredictTimeseries
+from model.entity.data_process_timeseries import DataProcessTimeseries
+from model.services.database_manager import get_async_session, DatabaseManager
+
+
+def seed(db_path: Path, days: int):
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(engine)
+    start = datetime(2025, 1, 1)
+    steps = days * 8
+    with sessionmaker(bind=engine)() as session:
+        session.add_all([
+            DataProcessTimeseries(ds=start + timedelta(hours=3 * i), y=10.0, relative_humidity_2m=50.0)
+            for i in range(steps)
+        ])
+        session.add_all([
+            DataPredictTimeseries(ds=start + timedelta(hours=3 * i), y=11.0, model_id="XGBRegressor_bench")
+            for i in range(steps)
+        ])
+        session.commit()
+    engine.dispose()
+
+
+def latency_callback(latency_ms: float):
+    def callback(statement):
+        time_module.sleep(latency_ms / 1000)
+    return callback
+
+
+def blocking_app(db_path: Path, latency_ms: float) -> FastAPI:
+    """Reproduit le handler historique : requêtes synchrones dans un endpoint async."""
+    engine = create_engine(f"sqlite:///{db_path}", **DatabaseManager.pool_options())
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        dbapi_connection.set_trace_callback(latency_callback(latency_ms))
+
+    factory = sessionmaker(bind=engine)
+    app = FastAPI()
+
+    @app.get("/predictions/combined/{start_date}/{end_date}")
+    async def combined(start_date: str, end_date: str):
+        with factory() as session:
+            return combined_blocking(session, start_date, end_date)
+
+    return app
+
+
+def combined_blocking(session: Session, start_date: str, end_date: str):
+    start_dt = datetime.combine(datetime.strptime(start_date, "%Y-%m-%d").date(), time.min)
+    end_dt = datetime.combine(datetime.strptime(end_date, "%Y-%m-%d").date(), time.max)
+    observed = session.query(DataProcessTimeseries).filter(
+        DataProcessTimeseries.ds >= start_dt, DataProcessTimeseries.ds <= end_dt
+    ).all()
+    predicts = session.query(DataPredictTimeseries).filter(
+        DataPredictTimeseries.ds >= start_dt, DataPredictTimeseries.ds <= end_dt
+    ).all()
+    by_ds = {p.ds: p.y for p in predicts}
+    return {"combined": [{"ds": o.ds.isoformat(), "y_pred": by_ds.get(o.ds), "y": o.y} for o in observed]}
+
+
+def async_app_with_db(db_path: Path, latency_ms: float) -> FastAPI:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", **DatabaseManager.pool_options())
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        dbapi_connection.run_async(lambda conn: conn.set_trace_callback(latency_callback(latency_ms)))
+
+    factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+
+    async def override():
+        async with factory() as session:
+            yield session
+
+    async_app.dependency_overrides[get_async_session] = override
+    return async_app
+
+
+async def run_load(app: FastAPI, url: str, total: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one():
+            async with semaphore:
+                response = await client.get(url)
+                response.raise_for_status()
+
+        await one()  # échauffement (ouverture du pool)
+        start = time_module.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        return time_module.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    parser.add_argument("--days", type=int, default=7)
+    args = parser.parse_args()
+
+    url = "/predictions/combined/2025-01-01/2025-01-07"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bench.db"
+        seed(db_path, args.days)
+
+        results = {}
+        for name, app in (("bloquant", blocking_app(db_path, args.latency_ms)),
+                          ("asynchrone", async_app_with_db(db_path, args.latency_ms))):
+            elapsed = asyncio.run(run_load(app, url, args.requests, args.concurrency))
+            results[name] = args.requests / elapsed
+            print(f"{name:<11} : {results[name]:8.1f} req/s ({elapsed:.2f}s pour {args.requests} requêtes)")
+
+        print(f"Gain de débit : x{results['asynchrone'] / results['bloquant']:.1f}")
+
+
+if __name__ == '__main__':
+    main()
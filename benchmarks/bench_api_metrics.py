@@ -0,0 +1,99 @@
+"""
+Benchmark du coût des métriques Prometheus de l'API : mêmes endpoints (/predictions/combined, /version)
+servis par des routes standard sur un engine non instrumenté, puis par MetricsRoute sur un engine
+instrumenté (durée des requêtes SQL). Mesure le débit, le surcoût par requête et la durée d'une collecte /metrics.
+
+Usage :
+    python -m benchmarks.bench_api_metrics --requests 2000 --concurrency 20
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+from prometheus_client import REGISTRY, generate_latest
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from api.main import app as api_app
+from api.metrics import MetricsRoute, instrument_engine
+from benchmarks.bench_api_async import seed
+from model.services.database_manager import get_async_session, DatabaseManager
+
+ENDPOINTS = ("/predictions/combined/{start_date}/{end_date}", "/version")
+URLS = ("/predictions/combined/2025-01-01/2025-01-02", "/version")
+
+
+def build_app(db_path: Path, route_class: type, instrumented: bool) -> FastAPI:
+    """Application servant les endpoints de l'API avec la classe de route donnée"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", **DatabaseManager.pool_options())
+    if instrumented:
+        instrument_engine(engine.sync_engine)
+    factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+
+    async def override():
+        async with factory() as session:
+            yield session
+
+    app = FastAPI()
+    app.router.route_class = route_class
+    for route in api_app.routes:
+        if isinstance(route, APIRoute) and route.path in ENDPOINTS:
+            app.add_api_route(route.path, route.endpoint, methods=list(route.methods))
+    app.dependency_overrides[get_async_session] = override
+    return app
+
+
+async def run_load(app: FastAPI, total: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one(url):
+            async with semaphore:
+                response = await client.get(url)
+                response.raise_for_status()
+
+        for url in URLS:
+            await one(url)  # échauffement (ouverture du pool)
+        start = time.perf_counter()
+        await asyncio.gather(*(one(URLS[i % len(URLS)]) for i in range(total)))
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bench.db"
+        seed(db_path, 7)
+
+        apps = {"sans métriques": build_app(db_path, APIRoute, False),
+                "avec métriques": build_app(db_path, MetricsRoute, True)}
+        # Variantes alternées, meilleur temps de chacune : le bruit de la machine touche les deux
+        results = {name: float('inf') for name in apps}
+        for _ in range(args.repeat):
+            for name, app in apps.items():
+                results[name] = min(results[name], asyncio.run(run_load(app, args.requests, args.concurrency)))
+        for name, elapsed in results.items():
+            print(f"{name:<15} : {args.requests / elapsed:8.1f} req/s ({elapsed:.2f}s pour {args.requests} requêtes)")
+
+    overhead = (results["avec métriques"] - results["sans métriques"]) / args.requests
+    print(f"Surcoût par requête : {overhead * 1e6:.1f} µs "
+          f"({overhead / results['sans métriques'] * args.requests:.1%})")
+
+    start = time.perf_counter()
+    for _ in range(100):
+        payload = generate_latest(REGISTRY)
+    print(f"Collecte /metrics : {(time.perf_counter() - start) * 10:.2f} ms ({len(payload) / 1024:.1f} Ko)")
+
+
+if __name__ == '__main__':
+    main()
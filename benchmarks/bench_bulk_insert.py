@@ -0,0 +1,83 @@
+"""
+Benchmark d'insertion en masse dans data_reel_timeseries (SQLite) :
+construction historique ligne à ligne (df.iterrows) contre BaseRepository.bulk_insert.
+
+Usage :
+    python -m benchmarks.bench_bulk_insert --rows 1000000
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from model.entity.base import Base
+from model.entity.data_reel_timeseries import DataReelTimeseries
+from model.repository.data_reel_timeseries_repository import DataReelTimeseriesRepository
+
+
+def synthetic_frame(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(42)
+    return pd.DataFrame({
+        'time': pd.date_range('1900-01-01', periods=rows, freq='h'),
+        'temperature_2m': rng.normal(10, 8, rows).astype(np.float32),
+        'relative_humidity_2m': rng.uniform(20, 100, rows).astype(np.float32),
+    })
+
+
+def legacy_insert(session, df: pd.DataFrame):
+    """Implémentation historique de insert_from_dataframe"""
+    data = [
+        {
+            "time": row['time'],
+            "temperature_2m": row['temperature_2m'],
+            "relative_humidity_2m": row['relative_humidity_2m']
+        }
+        for _, row in df.iterrows()
+    ]
+    session.execute(insert(DataReelTimeseries.__table__), data)
+    session.commit()
+
+
+def timed_insert(db_path: Path, df: pd.DataFrame, insert_function) -> float:
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as session:
+        start = time.perf_counter()
+        insert_function(session, df)
+        elapsed = time.perf_counter() - start
+    engine.dispose()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--chunk-size", type=int, default=None)
+    args = parser.parse_args()
+
+    df = synthetic_frame(args.rows)
+
+    def bulk(session, frame):
+        DataReelTimeseriesRepository(session).bulk_insert(frame, {
+            'time': 'time',
+            'temperature_2m': 'temperature_2m',
+            'relative_humidity_2m': 'relative_humidity_2m'
+        }, chunk_size=args.chunk_size)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {}
+        for name, function in (("iterrows", legacy_insert), ("bulk_insert", bulk)):
+            elapsed = timed_insert(Path(tmp) / f"{name}.db", df, function)
+            results[name] = args.rows / elapsed
+            print(f"{name:<12} : {results[name]:10.0f} lignes/s ({elapsed:.1f}s pour {args.rows} lignes)")
+
+        print(f"Accélération : x{results['bulk_insert'] / results['iterrows']:.1f}")
+
+
+if __name__ == '__main__':
+    main()
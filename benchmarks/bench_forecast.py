@@ -0,0 +1,80 @@
+"""
+Benchmark de l'inférence à la demande (ForecastService) : latence d'une prévision récursive
+sur 120 pas avec le champion en mémoire, et débit de requêtes concurrentes regroupées
+(micro-batching) contre des prévisions traitées une à une.
+
+Usage :
+    python -m benchmarks.bench_forecast --horizon 120 --concurrency 64
+"""
+import argparse
+import asyncio
+import time
+
+import numpy as np
+import pandas as pd
+from xgboost import XGBRegressor
+
+from model.services.forecast_service import ForecastService, recursive_forecast
+
+
+def champion(n_lags: int, trees: int, depth: int) -> XGBRegressor:
+    rng = np.random.default_rng(42)
+    X = pd.DataFrame(rng.normal(15, 6, size=(20000, n_lags)).astype(np.float32),
+                     columns=[f"y_lag_{k}" for k in range(1, n_lags + 1)])
+    y = 0.7 * X['y_lag_1'] + 0.2 * X['y_lag_2'] + rng.normal(0, 1, len(X))
+    return XGBRegressor(n_estimators=trees, max_depth=depth, tree_method='hist').fit(X, y)
+
+
+async def latencies(service: ForecastService, histories: np.ndarray, horizon: int) -> list[float]:
+    results = []
+    for history in histories:
+        start = time.perf_counter()
+        await service.forecast(history, horizon)
+        results.append(time.perf_counter() - start)
+    return results
+
+
+async def concurrent(service: ForecastService, histories: np.ndarray, horizon: int) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(*(service.forecast(history, horizon) for history in histories))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--horizon", type=int, default=120)
+    parser.add_argument("--n-lags", type=int, default=10)
+    parser.add_argument("--trees", type=int, default=300)
+    parser.add_argument("--depth", type=int, default=6)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    booster = champion(args.n_lags, args.trees, args.depth).get_booster()
+    histories = np.random.default_rng(0).normal(15, 6, size=(max(args.requests, args.concurrency), args.n_lags))
+
+    async def run():
+        service = ForecastService(max_wait=0.001)
+        service.set_model("XGBRegressor_bench", booster, args.n_lags)
+        await service.forecast(histories[0], args.horizon)  # préchauffage
+
+        single = np.array(await latencies(service, histories[:args.requests], args.horizon)) * 1000
+        batched = await concurrent(service, histories[:args.concurrency], args.horizon)
+        await service.stop()
+        return single, batched
+
+    single, batched = asyncio.run(run())
+
+    start = time.perf_counter()
+    for history in histories[:args.concurrency]:
+        recursive_forecast(booster, history[None, :], args.horizon)
+    sequential = time.perf_counter() - start
+
+    print(f"Requête isolée ({args.horizon} pas) : p50 {np.percentile(single, 50):6.2f} ms, "
+          f"p95 {np.percentile(single, 95):6.2f} ms")
+    print(f"{args.concurrency} requêtes concurrentes : regroupées {batched * 1000:7.1f} ms, "
+          f"une à une {sequential * 1000:7.1f} ms (x{sequential / batched:.1f})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Micro-benchmark de la construction des lags pendant le tuning (30 essais x 3 plis) :
+feature_engine.LagFeatures recalculé à chaque pli contre LagMatrix construite une fois.
+Seule la préparation des features est mesurée (pas l'entraînement XGBoost).
+
+Usage :
+    python -m benchmarks.bench_lag_features --years 10
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from feature_engine.timeseries.forecasting import LagFeatures
+from sklearn.model_selection import TimeSeriesSplit
+
+from model.pipeline.timeseries.classes.LagMatrix import LagMatrix
+from model.pipeline.timeseries.classes.XGBoostManager import XGBoostManager
+
+
+def synthetic_train(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(42)
+    return pd.DataFrame({
+        'y': rng.normal(10, 8, rows),
+        'relative_humidity_2m': rng.uniform(20, 100, rows),
+    })
+
+
+def legacy(train: pd.DataFrame, trials: list[int]):
+    """Implémentation historique de l'objectif Optuna"""
+    for n_lags in trials:
+        for train_idx, val_idx in TimeSeriesSplit(n_splits=3).split(train):
+            train_tss = train.iloc[train_idx].copy()
+            val_tss = train.iloc[val_idx].copy()
+            lag_transformer = LagFeatures(variables=['y'], periods=list(range(1, n_lags + 1)))
+            train_transformed = lag_transformer.fit_transform(train_tss).dropna()
+            val_init = pd.concat([train_tss.tail(n_lags), val_tss])
+            val_transformed = lag_transformer.transform(val_init).iloc[n_lags:].dropna()
+            train_transformed.drop(columns=['y']).to_numpy(), val_transformed.drop(columns=['y']).to_numpy()
+
+
+def lag_matrix(train: pd.DataFrame, trials: list[int]):
+    matrix = LagMatrix(train, XGBoostManager.MAX_LAGS)
+    for n_lags in trials:
+        for train_idx, val_idx in TimeSeriesSplit(n_splits=3).split(train):
+            matrix.arrays(n_lags, train_idx[0], train_idx[-1] + 1)
+            matrix.arrays(n_lags, val_idx[0], val_idx[-1] + 1)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--trials", type=int, default=30)
+    args = parser.parse_args()
+
+    train = synthetic_train(args.years * 365 * 8)  # pas de 3h
+    trials = list(np.random.default_rng(0).integers(1, XGBoostManager.MAX_LAGS + 1, args.trials))
+
+    results = {}
+    for name, function in (("LagFeatures", legacy), ("LagMatrix", lag_matrix)):
+        start = time.perf_counter()
+        function(train, trials)
+        results[name] = time.perf_counter() - start
+        print(f"{name:<12} : {results[name] * 1000:8.1f} ms ({args.trials} essais x 3 plis, {len(train)} lignes)")
+
+    print(f"Accélération : x{results['LagFeatures'] / results['LagMatrix']:.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark du chargement des données brutes (DataManager.loadData) sur une table
+data_reel_timeseries synthétique : objets ORM (getAll + extract_object_to_dataframe)
+contre lecture en flux dans des colonnes typées (load_columns).
+
+Chaque mode est mesuré dans un sous-processus séparé pour isoler le pic mémoire (RSS).
+
+Usage :
+    python -m benchmarks.bench_load_data --years 10
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.bench_bulk_insert import synthetic_frame
+from model.entity.base import Base
+from model.helpers.dataset_helper import extract_object_to_dataframe
+from model.repository.data_reel_timeseries_repository import DataReelTimeseriesRepository
+
+COLUMNS = ['time', 'temperature_2m', 'relative_humidity_2m']
+
+
+def build_database(db_path: Path, rows: int):
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as session:
+        DataReelTimeseriesRepository(session).insert_from_dataframe(synthetic_frame(rows))
+    engine.dispose()
+
+
+def measure(db_path: Path, mode: str) -> dict:
+    """Charge la table selon le mode demandé et renvoie temps et pic RSS du processus"""
+    engine = create_engine(f"sqlite:///{db_path}")
+    with sessionmaker(bind=engine)() as session:
+        repository = DataReelTimeseriesRepository(session)
+        start = time.perf_counter()
+        if mode == "orm":
+            df = extract_object_to_dataframe(repository.getAll(), COLUMNS)
+        else:
+            df = repository.load_columns()
+        elapsed = time.perf_counter() - start
+    engine.dispose()
+    # ru_maxrss est exprimé en kilo-octets sous Linux
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return {"rows": len(df), "seconds": elapsed, "peak_rss_mb": peak_rss}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--measure", choices=["orm", "stream"], help=argparse.SUPPRESS)
+    parser.add_argument("--db", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure(args.db, args.measure)))
+        return
+
+    rows = args.years * 365 * 24
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "load.db"
+        build_database(db_path, rows)
+
+        results = {}
+        for mode in ("orm", "stream"):
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_load_data", "--measure", mode, "--db", str(db_path)],
+                check=True, capture_output=True, text=True
+            ).stdout
+            results[mode] = json.loads(output)
+            print(f"{mode:<7} : {results[mode]['seconds']:6.2f}s, pic RSS {results[mode]['peak_rss_mb']:7.1f} Mo "
+                  f"({results[mode]['rows']} lignes)")
+
+        print(f"Accélération : x{results['orm']['seconds'] / results['stream']['seconds']:.1f}, "
+              f"mémoire : x{results['orm']['peak_rss_mb'] / results['stream']['peak_rss_mb']:.1f}")
+
+
+if __name__ == '__main__':
+    main()
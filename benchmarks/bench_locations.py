@@ -0,0 +1,63 @@
+"""
+Benchmark de l'ingestion multi-sites (data/fetch_data.py) : débit en sites par seconde
+selon le nombre de sites et de processus du pool, contre un serveur HTTP local
+qui imite l'API d'archive Open-Meteo (réponses FlatBuffers, latence simulée).
+
+Usage :
+    python -m benchmarks.bench_locations --locations 1 8 32 --workers 1 4 --latency 0.3 --chunk-days 365
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+from data.fetch_data import fetch_location
+from model.helpers.location_helper import run_by_location
+from model.services.database_manager import DatabaseManager
+from model.tests.open_meteo_stand_in import OpenMeteoStandIn
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--locations", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--latency", type=float, default=0.3, help="latence simulée de l'API (secondes)")
+    parser.add_argument("--chunk-days", type=int, default=365, help="jours par requête (OPEN_METEO_CHUNK_DAYS)")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    workdir = tempfile.mkdtemp()
+    os.environ["OPEN_METEO_CHUNK_DAYS"] = str(args.chunk_days)
+
+    print(f"Latence simulée {args.latency}s, historique complet (depuis 2023-01-01) par site, "
+          f"tranches de {args.chunk_days} jours")
+    with OpenMeteoStandIn(latency=args.latency) as stand_in:
+        os.environ["OPEN_METEO_URL"] = stand_in.url
+        for n_locations in args.locations:
+            for workers in args.workers:
+                # Cache Open-Meteo vide par scénario, puis relance sur une base neuve avec le cache rempli
+                os.environ["OPEN_METEO_CACHE_PATH"] = os.path.join(workdir, f"cache_{n_locations}_{workers}.sqlite")
+                for run in ("cache vide", "cache rempli"):
+                    os.environ["SQLITE_PATH"] = os.path.join(workdir, f"bench_{n_locations}_{workers}_{run[-6:]}.db")
+                    db_manager = DatabaseManager()
+                    db_manager.init_connection()
+                    db_manager.upgrade_schema()
+                    db_manager.close()
+
+                    locations = [{'location_id': f'site_{k}', 'latitude': 40 + k * 0.01,
+                                  'longitude': 10 + k * 0.01} for k in range(n_locations)]
+
+                    requests_before = len(stand_in.requests)
+                    start = time.perf_counter()
+                    results = run_by_location(fetch_location, locations, max_workers=workers)
+                    elapsed = time.perf_counter() - start
+
+                    rows = sum(result for result in results.values() if not isinstance(result, Exception))
+                    failed = sum(isinstance(result, Exception) for result in results.values())
+                    print(f"{n_locations:4d} sites, {workers} processus, {run:12s} : {elapsed:6.2f} s, "
+                          f"{n_locations / elapsed:6.1f} sites/s, {len(stand_in.requests) - requests_before} "
+                          f"requêtes, {rows} lignes, {failed} échec(s)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark des stratégies de prévision du batch predictor sur une série synthétique
+(saisonnalités journalière et annuelle, bruit météo autocorrélé) :
+- proxy : lags tirés des valeurs observées un an plus tôt (DataManager.loadFutureData) ;
+- recursive : les prédictions alimentent les lags des pas suivants (RecursiveForecaster),
+  une origine à la fois ou toutes les origines regroupées en un appel par pas.
+Compare la durée et la RMSE sur 120 pas, pour plusieurs origines de prévision.
+
+Usage :
+    python -m benchmarks.bench_recursive_forecast --origins 100
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from xgboost import XGBRegressor
+
+from model.pipeline.timeseries.DataManager import DataManager
+from model.pipeline.timeseries.FeatureManager import FeatureManager
+from model.pipeline.timeseries.classes.LagMatrix import LagMatrix
+from model.pipeline.timeseries.classes.RecursiveForecaster import RecursiveForecaster
+
+
+def weather_series(years: int) -> pd.DataFrame:
+    rng = np.random.default_rng(42)
+    rows = years * 365 * 8  # pas de 3h
+    t = np.arange(rows)
+    noise = np.zeros(rows)
+    shocks = rng.normal(0, 0.7, rows)
+    for i in range(1, rows):
+        noise[i] = 0.97 * noise[i - 1] + shocks[i]
+    y = 12 + 8 * np.sin(2 * np.pi * t / (8 * 365)) + 4 * np.sin(2 * np.pi * t / 8) + noise
+    return pd.DataFrame({'ds': pd.date_range('2020-01-01', periods=rows, freq='3h'), 'y': y})
+
+
+def rmse(predictions: np.ndarray, truth: np.ndarray) -> float:
+    return float(np.sqrt(np.mean((predictions - truth) ** 2)))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--years", type=int, default=4)
+    parser.add_argument("--origins", type=int, default=100)
+    parser.add_argument("--n-lags", type=int, default=10)
+    args = parser.parse_args()
+
+    horizon = DataManager.FORECAST_HORIZON
+    df = weather_series(args.years)
+    train_end = len(df) - 365 * 8  # dernière année réservée aux origines de prévision
+    lag_matrix = LagMatrix(df[['y']], args.n_lags)
+    X, y = lag_matrix.arrays(args.n_lags, 0, train_end)
+    model = XGBRegressor(n_estimators=300, max_depth=6, learning_rate=0.05, tree_method='hist', random_state=42)
+    model.fit(pd.DataFrame(X, columns=lag_matrix.lag_names(args.n_lags)), y)
+    booster = model.get_booster()
+
+    origins = np.linspace(train_end, len(df) - horizon, args.origins).astype(int)
+    truth = np.vstack([df['y'].to_numpy()[o:o + horizon] for o in origins])
+
+    data_manager = DataManager(db_manager=None)
+    feature_manager = FeatureManager(model_manager=None)
+    start = time.perf_counter()
+    proxy = []
+    for origin in origins:
+        history = df.iloc[:origin]
+        future = data_manager.loadFutureData(history)
+        train, test = feature_manager.transformData(history, future)
+        _, _, X_test, _ = feature_manager.lagger(train, test, args.n_lags)
+        proxy.append(booster.inplace_predict(X_test.astype(np.float32)))
+    proxy_seconds = time.perf_counter() - start
+    proxy = np.vstack(proxy)
+
+    forecaster = RecursiveForecaster(booster, args.n_lags)
+    lags = np.vstack([forecaster.last_lags(df['y'].iloc[:origin]) for origin in origins])
+
+    start = time.perf_counter()
+    one_by_one = np.vstack([forecaster.forecast(row, horizon) for row in lags])
+    one_by_one_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batched = forecaster.forecast(lags, horizon)
+    batched_seconds = time.perf_counter() - start
+
+    last_year = np.vstack([df['y'].to_numpy()[o - 365 * 8:o - 365 * 8 + horizon] for o in origins])
+
+    print(f"{args.origins} origines, {horizon} pas, {args.n_lags} lags")
+    print(f"proxy (pipeline actuel)       : {proxy_seconds * 1000:8.1f} ms   RMSE {rmse(proxy, truth):.3f}")
+    print(f"recursive, origine par origine: {one_by_one_seconds * 1000:8.1f} ms   RMSE {rmse(one_by_one, truth):.3f}")
+    print(f"recursive, origines regroupées: {batched_seconds * 1000:8.1f} ms   RMSE {rmse(batched, truth):.3f}")
+    print(f"référence naïve (valeurs N-1) :                RMSE {rmse(last_year, truth):.3f}")
+    print("RMSE recursive par tranche de 24h : " + " ".join(
+        f"{rmse(batched[:, k:k + 8], truth[:, k:k + 8]):.2f}" for k in range(0, horizon, 8)))
+
+
+if __name__ == '__main__':
+    main()
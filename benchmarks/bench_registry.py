@@ -0,0 +1,61 @@
+"""
+Benchmark du registre de modèles : taille des artefacts et temps de chargement
+joblib (XGBRegressor picklé) contre UBJSON natif + métadonnées, à froid et depuis le cache LRU.
+
+Usage :
+    python -m benchmarks.bench_registry --trees 300 --depth 8
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from xgboost import XGBRegressor
+
+from model.services.registry_manager import RegistryManager
+
+
+def timed(function, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--trees", type=int, default=300)
+    parser.add_argument("--depth", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    X = pd.DataFrame(rng.normal(size=(20000, 10)).astype(np.float32), columns=[f"y_lag_{k}" for k in range(1, 11)])
+    y = X.sum(axis=1) + rng.normal(0, 0.5, len(X))
+    model = XGBRegressor(n_estimators=args.trees, max_depth=args.depth, tree_method='hist').fit(X, y)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        registry = RegistryManager(Path(tmp))
+        legacy = registry.legacy_path("XGBRegressor_joblib")
+        joblib.dump(model, legacy)
+        registry.save(model, "XGBRegressor_native")
+
+        def cold_native():
+            RegistryManager.clear_cache()
+            registry.load("XGBRegressor_native")
+
+        results = {
+            "joblib": (legacy.stat().st_size, timed(lambda: joblib.load(legacy), args.repeat)),
+            "ubj (froid)": (registry.model_path("XGBRegressor_native").stat().st_size, timed(cold_native, args.repeat)),
+            "ubj (cache)": (registry.model_path("XGBRegressor_native").stat().st_size,
+                            timed(lambda: registry.load("XGBRegressor_native"), args.repeat)),
+        }
+        for name, (size, seconds) in results.items():
+            print(f"{name:<12} : {size / 1024:8.1f} Ko, chargement {seconds * 1000:8.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark d'un cycle complet (récupération -> tuning / entraînement -> prédictions batch) :
+trois processus successifs comme l'ancien start.sh, contre le PipelineRunner en un seul processus.
+Chaque variante part d'une copie de la même base (historique déjà récupéré depuis un serveur
+Open-Meteo local) ; sont mesurés la durée et le volume écrit sur disque par les processus.
+Le runner est ensuite relancé sans nouvelle donnée (cache des étapes rempli).
+
+Usage :
+    python -m benchmarks.bench_runner --locations 4 --trials 5
+"""
+import argparse
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from model.repository.location_repository import LocationRepository
+from model.services.database_manager import DatabaseManager
+from model.tests.open_meteo_stand_in import OpenMeteoStandIn
+
+ROOT = Path(__file__).resolve().parents[1]
+
+START_SH = [
+    [sys.executable, "./data/fetch_data.py"],
+    [sys.executable, "-m", "model.pipeline.PipelineOrchestrator"],
+    [sys.executable, "-m", "model.pipeline.PipelineBatchPredictor"],
+]
+RUNNER = [[sys.executable, "-m", "model.pipeline.PipelineRunner"]]
+
+# (nom, commandes, base de la variante, cache des étapes)
+VARIANTS = [
+    ("3 processus (start.sh)", START_SH, "start_sh.db", "false"),
+    ("PipelineRunner", RUNNER, "runner.db", "true"),
+    ("PipelineRunner, relance", RUNNER, "runner.db", "true"),
+]
+
+
+def children_written_bytes() -> int:
+    return resource.getrusage(resource.RUSAGE_CHILDREN).ru_oublock * 512
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--locations", type=int, default=4)
+    parser.add_argument("--trials", type=int, default=5, help="essais de tuning (TUNING_N_TRIALS)")
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp())
+    env = dict(os.environ, TUNING_N_TRIALS=str(args.trials), TRAINING_MODE="full", LOCATION_MAX_WORKERS="1",
+               OPEN_METEO_CACHE_PATH=str(workdir / "open_meteo_cache.sqlite"),
+               PIPELINE_CACHE_DIR=str(workdir / "pipeline_cache"),
+               PIPELINE_METRICS_DIR=str(workdir / "metrics"))
+    registry_before = {path for directory in ("model/registry", "monitoring/output")
+                       for path in (ROOT / directory).iterdir()}
+
+    with OpenMeteoStandIn() as stand_in:
+        env["OPEN_METEO_URL"] = stand_in.url
+
+        # Base de départ : sites et historique déjà récupéré
+        seed = workdir / "seed.db"
+        os.environ["SQLITE_PATH"] = str(seed)
+        db_manager = DatabaseManager()
+        db_manager.init_connection()
+        db_manager.upgrade_schema()
+        LocationRepository(db_manager.session).upsert_locations([
+            {'location_id': f'site_{k}', 'name': f'site_{k}', 'latitude': 40 + k, 'longitude': 10 + k,
+             'is_active': True} for k in range(args.locations - 1)])
+        db_manager.close()
+        subprocess.run([sys.executable, "./data/fetch_data.py"], cwd=ROOT, check=True,
+                       env=dict(env, SQLITE_PATH=str(seed)), capture_output=True)
+
+        print(f"{args.locations} sites, {args.trials} essais de tuning, historique déjà récupéré")
+        for name, commands, database, step_cache in VARIANTS:
+            database = workdir / database
+            if not database.exists():
+                shutil.copy(seed, database)
+            written = children_written_bytes()
+            start = time.perf_counter()
+            for command in commands:
+                subprocess.run(command, cwd=ROOT, check=True, capture_output=True,
+                               env=dict(env, SQLITE_PATH=str(database), PIPELINE_CACHE=step_cache))
+            elapsed = time.perf_counter() - start
+            written = children_written_bytes() - written
+            print(f"{name:24s} : {elapsed:6.2f} s, {written / 1e6:7.1f} Mo écrits")
+
+    print(f"Mesures des étapes : {workdir / 'metrics'}")
+
+    # Modèles et graphiques produits par le benchmark
+    for directory in ("model/registry", "monitoring/output"):
+        for path in (ROOT / directory).iterdir():
+            if path not in registry_before:
+                shutil.rmtree(path) if path.is_dir() else path.unlink()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark du tuning Optuna sur un jeu synthétique fixe (saisonnalités journalière et annuelle) :
+essais complets contre pruning (MedianPruner) + arrêt anticipé XGBoost.
+Compare le temps total et la MSE du champion réentraîné sur un jeu de test.
+
+Usage :
+    python -m benchmarks.bench_tuning --years 5 --trials 30
+"""
+import argparse
+import time
+
+import numpy as np
+import optuna
+import pandas as pd
+from sklearn.metrics import mean_squared_error
+from xgboost import XGBRegressor
+
+from model.pipeline.timeseries.classes.LagMatrix import LagMatrix
+from model.pipeline.timeseries.classes.XGBoostManager import TuningObjective, XGBoostManager, study_pruner
+
+
+def synthetic_series(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(42)
+    t = np.arange(rows)
+    y = 12 + 8 * np.sin(2 * np.pi * t / (8 * 365)) + 4 * np.sin(2 * np.pi * t / 8) + rng.normal(0, 1.5, rows)
+    return pd.DataFrame({'y': y})
+
+
+def run(train: pd.DataFrame, test: pd.DataFrame, trials: int, pruner, early_stopping_rounds) -> dict:
+    objective = TuningObjective(train, XGBoostManager.MAX_LAGS, early_stopping_rounds=early_stopping_rounds)
+    study = optuna.create_study(direction='minimize', sampler=optuna.samplers.TPESampler(seed=0),
+                                pruner=study_pruner(pruner))
+    start = time.perf_counter()
+    study.optimize(objective, n_trials=trials)
+    elapsed = time.perf_counter() - start
+
+    # Champion réentraîné sur tout train, comme XGBoostManager.train
+    params = dict(study.best_params)
+    n_lags = params.pop('n_lags')
+    params['n_estimators'] = study.best_trial.user_attrs.get('best_n_estimators', params['n_estimators'])
+    lag_matrix = LagMatrix(pd.concat([train, test], ignore_index=True), n_lags)
+    X_train, y_train = lag_matrix.arrays(n_lags, 0, len(train))
+    X_test, y_test = lag_matrix.arrays(n_lags, len(train))
+    model = XGBRegressor(**params, random_state=42).fit(X_train, y_train)
+
+    pruned = len(study.get_trials(states=(optuna.trial.TrialState.PRUNED,)))
+    return {"seconds": elapsed, "pruned": pruned,
+            "test_mse": mean_squared_error(y_test, model.predict(X_test))}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--trials", type=int, default=30)
+    args = parser.parse_args()
+
+    df = synthetic_series(args.years * 365 * 8)  # pas de 3h
+    split = int(len(df) * 0.9)
+    train, test = df.iloc[:split], df.iloc[split:]
+
+    results = {
+        "complet": run(train, test, args.trials, None, None),
+        "pruning + arrêt": run(train, test, args.trials, 'median', 20),
+    }
+    for name, result in results.items():
+        print(f"{name:<16} : {result['seconds']:6.1f}s, {result['pruned']:2d} essais abandonnés, "
+              f"MSE test du champion {result['test_mse']:.4f}")
+
+    print(f"Accélération : x{results['complet']['seconds'] / results['pruning + arrêt']['seconds']:.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark tuning + entraînement final d'XGBoostManager : chemin XGBRegressor historique
+(DataFrame/ndarray float64 reconvertis à chaque fit) contre chemin rapide
+(hist, QuantileDMatrix float32 réutilisées entre essais, inplace_predict).
+
+Usage :
+    python -m benchmarks.bench_xgb_fast_path --years 5 --trials 30
+"""
+import argparse
+import time
+
+import optuna
+
+from benchmarks.bench_tuning import synthetic_series
+from model.pipeline.timeseries.FeatureManager import FeatureManager
+from model.pipeline.timeseries.classes.XGBoostManager import XGBoostManager
+
+
+def run(train, test, trials: int, fast_path: bool, n_jobs: int) -> dict:
+    xgb = XGBoostManager(n_trials=trials, fast_path=fast_path, n_jobs=n_jobs)
+    # Échantillonneur déterministe : les deux chemins évaluent les mêmes essais
+    create_study = optuna.create_study
+    optuna.create_study = lambda **kwargs: create_study(sampler=optuna.samplers.TPESampler(seed=0), **kwargs)
+    try:
+        start = time.perf_counter()
+        xgb.tune(train)
+        tuned = time.perf_counter()
+    finally:
+        optuna.create_study = create_study
+
+    X_train, y_train, X_test, _ = FeatureManager(xgb).lagger(train, test, xgb.params.best_params['n_lags'])
+    xgb.train(X_train, y_train)
+    trained = time.perf_counter()
+    xgb.predict(X_test)
+    predicted = time.perf_counter()
+    return {"tune": tuned - start, "train": trained - tuned, "predict": predicted - trained,
+            "best_value": xgb.params.best_value}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--trials", type=int, default=30)
+    parser.add_argument("--n-jobs", type=int, default=None)
+    args = parser.parse_args()
+
+    df = synthetic_series(args.years * 365 * 8)  # pas de 3h
+    split = int(len(df) * 0.9)
+    train, test = df.iloc[:split], df.iloc[split:]
+
+    results = {}
+    for name, fast_path in (("XGBRegressor", False), ("chemin rapide", True)):
+        results[name] = run(train, test, args.trials, fast_path, args.n_jobs)
+        r = results[name]
+        print(f"{name:<14} : tuning {r['tune']:6.1f}s, entraînement {r['train']:5.2f}s, "
+              f"prédiction {r['predict'] * 1000:6.1f} ms, meilleure MSE {r['best_value']:.4f}")
+
+    total = {name: r['tune'] + r['train'] for name, r in results.items()}
+    print(f"Accélération tuning + entraînement : x{total['XGBRegressor'] / total['chemin rapide']:.1f}")
+
+
+if __name__ == '__main__':
+    main()
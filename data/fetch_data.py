@@ -7,15 +7,11 @@ from datetime import datetime, timedelta
 
 from dotenv import load_dotenv
 
-from model.entity.base import Base
-
-from model.repository.data_reel_timeseries_repository import DataReelTimeseriesRepository
-from model.repository.data_process_timeseries_repository import DataProcessTimeSeriesRepository
-from model.repository.data_predict_timeseries_repository import DataPredictTimeseriesRepository
-from model.repository.logging_timeseries_repository import LoggingTimeseriesRepository
+from model.helpers.location_helper import run_by_location
+from model.repository.location_repository import LocationRepository
 
 from model.services.database_manager import DatabaseManager
-from model.services.open_meteo_service import OpenMeteoService
+from model.services.open_meteo_backfill import OpenMeteoBackfill
 from model.services.secure_logger_manager import SecureLoggerManager
 
 # Chargement des variables d'environnement postgres
@@ -23,52 +19,61 @@ load_dotenv()
 
 app_env = os.getenv("APP_ENV", "dev")
 
-secure_logger = SecureLoggerManager('initialisation').get_logger()
-
-secure_logger.info("Connexion à la base de données...")
-
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s - %(levelname)s - %(message)s"
 )
 
-db_manager = DatabaseManager()
-db_manager.init_connection()
-
-
-try:
-    Base.metadata.create_all(db_manager.engine)
 
-except Exception as e:
-    secure_logger.error("Erreur lors de la connexion à la base de données:", e)
-    print("Vérifiez que les containers sont bien démarrés et que les paramètres de connexion sont corrects.")
-    db_manager.close()
+def fetch_location(location: dict) -> int:
+    """
+    Récupère et enregistre les nouvelles mesures d'un site (exécuté dans un processus du pool,
+    avec sa propre connexion à la base), par tranches parallèles reprenant au dernier point de reprise.
+    :param location: site (location_id, latitude, longitude)
+    :return: nombre de lignes enregistrées
+    """
+    location_id = location['location_id']
+    db_manager = DatabaseManager()
+    db_manager.init_connection()
+    try:
+        end_date = (datetime.today() - timedelta(days=2)).date()
+        with OpenMeteoBackfill(db_manager.session, location) as backfill:
+            rows = backfill.backfill(OpenMeteoBackfill.START_DATE, end_date)
+        if rows:
+            logging.info(f"Site {location_id} : {rows} lignes enregistrées")
+        else:
+            logging.info(f"Site {location_id} : données déjà à jour")
+        return rows
+    finally:
+        db_manager.close()
 
-data_reel_repository = DataReelTimeseriesRepository(db_manager.session)
-last_row = data_reel_repository.get_last_row()
 
-if last_row is not None:
-    start_date = last_row.time + timedelta(days=1)
-    end_date = (datetime.today() - timedelta(days=2)).date()
+if __name__ == '__main__':
+    secure_logger = SecureLoggerManager('initialisation').get_logger()
 
-    if start_date.date() > end_date:
-        secure_logger.warning("Les données sont déjà à jour. Arrêt du script.")
-        db_manager.close()
-        sys.exit()
+    secure_logger.info("Connexion à la base de données...")
 
-    start_date = start_date.strftime("%Y-%m-%d")
-else:
-    start_date = None
+    db_manager = DatabaseManager()
+    db_manager.init_connection()
 
-secure_logger.info("Récupération des données de l'API")
-open_meteo_service = OpenMeteoService(start_date=start_date)
-df_fetch = open_meteo_service.get_meteo()
+    try:
+        db_manager.upgrade_schema()
 
-secure_logger.info("Enregistrement dans la base de données.")
-data_reel_repository.insert_from_dataframe(df_fetch)
+    except Exception as e:
+        secure_logger.error("Erreur lors de la connexion à la base de données:", e)
+        print("Vérifiez que les containers sont bien démarrés et que les paramètres de connexion sont corrects.")
+        db_manager.close()
 
-db_manager.close()
+    locations = LocationRepository(db_manager.session).get_active()
+    db_manager.close()
 
-secure_logger.info("Script terminé avec succès.")
+    secure_logger.info(f"Récupération des données de l'API pour {len(locations)} site(s)")
+    results = run_by_location(fetch_location, locations)
 
+    failed = sorted(location_id for location_id, result in results.items() if isinstance(result, Exception))
+    if failed:
+        secure_logger.error(f"Sites en échec : {', '.join(failed)}")
+    if locations and len(failed) == len(locations):
+        sys.exit(1)
 
+    secure_logger.info("Script terminé avec succès.")
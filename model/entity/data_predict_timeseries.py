@@ -1,11 +1,17 @@
-from sqlalchemy import Column, Integer, DateTime, Float, func, String, ForeignKey
+from sqlalchemy import Column, Integer, DateTime, Float, func, String, ForeignKey, Index
 
 from model.entity.base import Base
+from model.entity.location import DEFAULT_LOCATION
 
 class DataPredictTimeseries(Base):
     __tablename__ = 'data_predict_timeseries'
+    __table_args__ = (
+        Index('ix_data_predict_timeseries_location_id_ds_created_at', 'location_id', 'ds', 'created_at'),
+        Index('ix_data_predict_timeseries_model_id_ds', 'model_id', 'ds'),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
+    location_id = Column(String, nullable=False, default=DEFAULT_LOCATION, server_default=DEFAULT_LOCATION)
     ds = Column(DateTime)
     y = Column(Float)
     model_id = Column(String, nullable=False)
@@ -1,12 +1,17 @@
-from sqlalchemy import Column, Integer, DateTime, Float
+from sqlalchemy import Column, Integer, DateTime, Float, String, UniqueConstraint
 
 from model.entity.base import Base
+from model.entity.location import DEFAULT_LOCATION
 
 class DataProcessTimeseries(Base):
     __tablename__ = 'data_process_timeseries'
+    __table_args__ = (
+        UniqueConstraint('location_id', 'ds', name='uq_data_process_timeseries_location_id_ds'),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    ds = Column(DateTime, unique=True)
+    location_id = Column(String, nullable=False, default=DEFAULT_LOCATION, server_default=DEFAULT_LOCATION)
+    ds = Column(DateTime)
     y = Column(Float)
     relative_humidity_2m = Column(Float)
 
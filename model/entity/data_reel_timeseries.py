@@ -1,11 +1,16 @@
-from sqlalchemy import Column, Integer, DateTime, Float
+from sqlalchemy import Column, Integer, DateTime, Float, String, UniqueConstraint
 
 from model.entity.base import Base
+from model.entity.location import DEFAULT_LOCATION
 
 class DataReelTimeseries(Base):
     __tablename__ = 'data_reel_timeseries'
+    __table_args__ = (
+        UniqueConstraint('location_id', 'time', name='uq_data_reel_timeseries_location_id_time'),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    time = Column(DateTime, unique=True)
+    location_id = Column(String, nullable=False, default=DEFAULT_LOCATION, server_default=DEFAULT_LOCATION)
+    time = Column(DateTime)
     temperature_2m = Column(Float)
     relative_humidity_2m = Column(Float)
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, DateTime, Float, String, func
+
+from model.entity.base import Base
+from model.entity.location import DEFAULT_LOCATION
+
+class LatestPrediction(Base):
+    """Dernière prédiction connue pour chaque site et timestamp, maintenue par le batch predictor."""
+    __tablename__ = 'latest_prediction'
+
+    location_id = Column(String, primary_key=True, default=DEFAULT_LOCATION, server_default=DEFAULT_LOCATION)
+    ds = Column(DateTime, primary_key=True)
+    y = Column(Float)
+    model_id = Column(String, nullable=False)  # modèle champion ayant produit la prédiction
+    run_id = Column(String, nullable=False)  # identifiant du run batch
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
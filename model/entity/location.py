@@ -0,0 +1,16 @@
+from sqlalchemy import Boolean, Column, Float, String, true
+
+from model.entity.base import Base
+
+# Site historique du projet (coordonnées codées jusqu'ici dans OpenMeteoService)
+DEFAULT_LOCATION = 'berlin'
+
+class Location(Base):
+    """Site suivi : coordonnées transmises à Open-Meteo, clé location_id des séries temporelles."""
+    __tablename__ = 'location'
+
+    location_id = Column(String, primary_key=True)  # ex: 'berlin'
+    name = Column(String, nullable=True)
+    latitude = Column(Float, nullable=False)
+    longitude = Column(Float, nullable=False)
+    is_active = Column(Boolean, nullable=False, default=True, server_default=true())
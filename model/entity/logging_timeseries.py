@@ -1,17 +1,23 @@
-from sqlalchemy import Column, Integer, DateTime, String, JSON, Index, Float
+from sqlalchemy import Column, Integer, DateTime, String, JSON, Index, Float, Boolean, false
 
 from model.entity.base import Base
+from model.entity.location import DEFAULT_LOCATION
 
 class LoggingTimeseries(Base):
     __tablename__ = 'logging_timeseries'
+    __table_args__ = (
+        Index('ix_logging_timeseries_location_id_is_notebook_score', 'location_id', 'is_notebook', 'score'),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     timestamp = Column(DateTime)  # Date/heure de la prédiction
     model = Column(String)  # 'ARIMA', 'SARIMA', 'Prophet', etc.
     model_id = Column(String, default=None, unique=True)
+    location_id = Column(String, nullable=False, default=DEFAULT_LOCATION, server_default=DEFAULT_LOCATION)  # site d'entraînement
     score = Column(Float, nullable=True)
     params = Column(JSON)
     results = Column(JSON)
+    is_notebook = Column(Boolean, nullable=False, default=False, server_default=false())  # run issu d'un notebook
 
     def __str__(self):
         return (f"Timestamp: {self.timestamp}\n"
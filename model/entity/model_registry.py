@@ -0,0 +1,22 @@
+from sqlalchemy import Column, DateTime, Index, Integer, JSON, String
+
+from model.entity.base import Base
+from model.entity.location import DEFAULT_LOCATION
+
+class ModelRegistry(Base):
+    """Index du registre de modèles : un artefact par model_id, avec son statut de rétention."""
+    __tablename__ = 'model_registry'
+    __table_args__ = (
+        Index('ix_model_registry_location_id_status_created_at', 'location_id', 'status', 'created_at'),
+    )
+
+    model_id = Column(String, primary_key=True)
+    location_id = Column(String, nullable=False, default=DEFAULT_LOCATION, server_default=DEFAULT_LOCATION)  # site d'entraînement
+    artifact_path = Column(String, nullable=False)  # booster (UBJSON ou joblib historique)
+    metadata_path = Column(String, nullable=True)  # métadonnées JSON
+    image_path = Column(String, nullable=True)  # graphique d'évaluation (monitoring/output)
+    size = Column(Integer, nullable=True)  # taille de l'artefact en octets
+    checksum = Column(String, nullable=True)
+    metrics = Column(JSON, nullable=True)
+    status = Column(String, nullable=False, default='challenger')  # 'champion' (du site), 'challenger' ou 'deleted'
+    created_at = Column(DateTime, nullable=False)
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, DateTime, Float, String, ForeignKey, Index, BigInteger
+
+from model.entity.base import Base
+from model.entity.location import DEFAULT_LOCATION
+
+class PipelineRunMetric(Base):
+    """Mesures d'une étape d'un run de pipeline (durée, temps CPU, mémoire, lignes traitées)."""
+    __tablename__ = 'pipeline_run_metric'
+    __table_args__ = (
+        Index('ix_pipeline_run_metric_pipeline_stage_started_at', 'pipeline', 'stage', 'started_at'),
+        Index('ix_pipeline_run_metric_model_id', 'model_id'),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    run_id = Column(String, nullable=False)
+    pipeline = Column(String, nullable=False)  # 'orchestrator', 'batch_predictor', 'runner'
+    location_id = Column(String, nullable=False, default=DEFAULT_LOCATION, server_default=DEFAULT_LOCATION)
+    model_id = Column(String, ForeignKey('logging_timeseries.model_id'), nullable=True)  # modèle entraîné ou champion utilisé
+    stage = Column(String, nullable=False)
+    started_at = Column(DateTime, nullable=False)
+    wall_seconds = Column(Float, nullable=False)
+    cpu_seconds = Column(Float, nullable=False)  # processus et sous-processus terminés pendant l'étape
+    rss_peak_delta_bytes = Column(BigInteger, nullable=False)  # pic de RSS de l'étape moins la RSS à son début
+    rows = Column(Integer, nullable=True)
+    status = Column(String, nullable=False)  # 'ok' ou 'error'
@@ -0,0 +1,11 @@
+from sqlalchemy import Column, DateTime, String, func
+
+from model.entity.base import Base
+
+class PipelineWatermark(Base):
+    """Point de reprise (high-water mark) d'un traitement incrémental."""
+    __tablename__ = 'pipeline_watermark'
+
+    name = Column(String, primary_key=True)  # ex: 'data_process_timeseries'
+    value = Column(DateTime, nullable=False)  # dernière date traitée
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,42 @@
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+
+def location_workers() -> int:
+    """Nombre de processus traitant les sites en parallèle (LOCATION_MAX_WORKERS, tous les cœurs par défaut)"""
+    return int(os.getenv("LOCATION_MAX_WORKERS") or os.cpu_count() or 1)
+
+
+def run_by_location(function, locations: list[dict], max_workers: int = None) -> dict:
+    """
+    Exécute function(location) pour chaque site dans un pool de processus borné.
+    Chaque site est isolé : une exception est journalisée et retournée à sa place,
+    les autres sites sont traités normalement.
+    :param function: fonction de niveau module (sérialisable) recevant le dictionnaire du site
+    :param locations: sites (dictionnaires contenant au moins location_id)
+    :param max_workers: nombre maximal de processus (location_workers() par défaut)
+    :return: dictionnaire location_id -> résultat de function ou exception levée
+    """
+    max_workers = min(max_workers or location_workers(), max(len(locations), 1))
+    results = {}
+
+    if max_workers == 1:
+        for location in locations:
+            try:
+                results[location['location_id']] = function(location)
+            except Exception as e:
+                logging.error(f"Site {location['location_id']} en échec : {e}")
+                results[location['location_id']] = e
+        return results
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(function, location): location['location_id'] for location in locations}
+        for future in as_completed(futures):
+            location_id = futures[future]
+            try:
+                results[location_id] = future.result()
+            except Exception as e:
+                logging.error(f"Site {location_id} en échec : {e}")
+                results[location_id] = e
+    return results
@@ -0,0 +1,79 @@
+"""
+Environnement Alembic du projet.
+
+La connexion est, par ordre de priorité :
+- une connexion déjà ouverte passée via config.attributes['connection'] (DatabaseManager.upgrade_schema),
+- l'option sqlalchemy.url de la configuration,
+- l'URL déduite de l'environnement (APP_ENV / POSTGRES_*).
+"""
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine, pool
+
+from model.entity.base import Base
+from model.entity.data_predict_timeseries import DataPredictTimeseries
+from model.entity.data_process_timeseries import DataProcessTimeseries
+from model.entity.data_reel_timeseries import DataReelTimeseries
+from model.entity.latest_prediction import LatestPrediction
+from model.entity.location import Location
+from model.entity.logging_timeseries import LoggingTimeseries
+from model.entity.model_registry import ModelRegistry
+from model.entity.pipeline_run_metric import PipelineRunMetric
+from model.entity.pipeline_watermark import PipelineWatermark
+from model.services.database_manager import DatabaseManager
+
+config = context.config
+
+if config.config_file_name is not None and config.attributes.get('connection') is None:
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+target_metadata = Base.metadata
+
+
+def database_url() -> str:
+    return config.get_main_option("sqlalchemy.url") or DatabaseManager().database_url()
+
+
+def run_migrations_offline() -> None:
+    """Génère le SQL des migrations sans connexion à la base."""
+    context.configure(
+        url=database_url(),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=True,
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    """Applique les migrations sur la base."""
+    connection = config.attributes.get('connection')
+
+    if connection is not None:
+        do_run_migrations(connection)
+        return
+
+    engine = create_engine(database_url(), poolclass=pool.NullPool)
+    with engine.connect() as connection:
+        do_run_migrations(connection)
+
+
+def do_run_migrations(connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        render_as_batch=True,  # ALTER TABLE compatibles SQLite
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,85 @@
+"""Schéma initial (tables créées jusqu'ici par Base.metadata.create_all)
+
+Les tables déjà présentes sont conservées : une base existante peut être
+mise à niveau sur place avec `alembic upgrade head`.
+
+Revision ID: 0001
+Revises:
+Create Date: 2025-07-01 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'data_reel_timeseries' not in existing:
+        op.create_table(
+            'data_reel_timeseries',
+            sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column('time', sa.DateTime(), unique=True),
+            sa.Column('temperature_2m', sa.Float()),
+            sa.Column('relative_humidity_2m', sa.Float()),
+        )
+
+    if 'data_process_timeseries' not in existing:
+        op.create_table(
+            'data_process_timeseries',
+            sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column('ds', sa.DateTime(), unique=True),
+            sa.Column('y', sa.Float()),
+            sa.Column('relative_humidity_2m', sa.Float()),
+        )
+
+    if 'data_predict_timeseries' not in existing:
+        op.create_table(
+            'data_predict_timeseries',
+            sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column('ds', sa.DateTime()),
+            sa.Column('y', sa.Float()),
+            sa.Column('model_id', sa.String(), nullable=False),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+
+    if 'logging_timeseries' not in existing:
+        op.create_table(
+            'logging_timeseries',
+            sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column('timestamp', sa.DateTime()),
+            sa.Column('model', sa.String()),
+            sa.Column('model_id', sa.String(), unique=True),
+            sa.Column('score', sa.Float(), nullable=True),
+            sa.Column('params', sa.JSON()),
+            sa.Column('results', sa.JSON()),
+        )
+
+    if 'latest_prediction' not in existing:
+        op.create_table(
+            'latest_prediction',
+            sa.Column('ds', sa.DateTime(), primary_key=True),
+            sa.Column('y', sa.Float()),
+            sa.Column('model_id', sa.String(), nullable=False),
+            sa.Column('run_id', sa.String(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('latest_prediction')
+    op.drop_table('logging_timeseries')
+    op.drop_table('data_predict_timeseries')
+    op.drop_table('data_process_timeseries')
+    op.drop_table('data_reel_timeseries')
@@ -0,0 +1,50 @@
+"""Index des tables de séries temporelles et colonne is_notebook
+
+- data_predict_timeseries : index (ds, created_at) et (model_id, ds)
+- logging_timeseries : colonne booléenne is_notebook (remplace le filtre LIKE '%notebook%')
+  et index (is_notebook, score) pour la recherche du modèle champion
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2025-07-01 00:00:01
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_data_predict_timeseries_ds_created_at', 'data_predict_timeseries', ['ds', 'created_at'])
+    op.create_index('ix_data_predict_timeseries_model_id_ds', 'data_predict_timeseries', ['model_id', 'ds'])
+
+    with op.batch_alter_table('logging_timeseries') as batch_op:
+        batch_op.add_column(sa.Column('is_notebook', sa.Boolean(), nullable=False, server_default=sa.false()))
+
+    # Les runs issus des notebooks étaient jusqu'ici reconnus à leur model_id
+    op.execute(
+        sa.text("UPDATE logging_timeseries SET is_notebook = :flag WHERE model_id LIKE '%notebook%'")
+        .bindparams(flag=True)
+    )
+
+    op.create_index('ix_logging_timeseries_is_notebook_score', 'logging_timeseries', ['is_notebook', 'score'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_logging_timeseries_is_notebook_score', table_name='logging_timeseries')
+
+    with op.batch_alter_table('logging_timeseries') as batch_op:
+        batch_op.drop_column('is_notebook')
+
+    op.drop_index('ix_data_predict_timeseries_model_id_ds', table_name='data_predict_timeseries')
+    op.drop_index('ix_data_predict_timeseries_ds_created_at', table_name='data_predict_timeseries')
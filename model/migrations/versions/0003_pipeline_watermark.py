@@ -0,0 +1,33 @@
+"""Table pipeline_watermark (points de reprise des traitements incrémentaux)
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2025-07-02 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'pipeline_watermark',
+        sa.Column('name', sa.String(), primary_key=True),
+        sa.Column('value', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('pipeline_watermark')
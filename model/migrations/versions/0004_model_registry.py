@@ -0,0 +1,41 @@
+"""Table model_registry (index des artefacts du registre de modèles)
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2025-07-09 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'model_registry',
+        sa.Column('model_id', sa.String(), primary_key=True),
+        sa.Column('artifact_path', sa.String(), nullable=False),
+        sa.Column('metadata_path', sa.String(), nullable=True),
+        sa.Column('image_path', sa.String(), nullable=True),
+        sa.Column('size', sa.Integer(), nullable=True),
+        sa.Column('checksum', sa.String(), nullable=True),
+        sa.Column('metrics', sa.JSON(), nullable=True),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+    )
+    op.create_index('ix_model_registry_status_created_at', 'model_registry', ['status', 'created_at'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_model_registry_status_created_at', table_name='model_registry')
+    op.drop_table('model_registry')
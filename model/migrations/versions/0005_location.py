@@ -0,0 +1,136 @@
+"""Dimension location (multi-sites)
+
+- table location (coordonnées des sites), initialisée avec le site historique 'berlin'
+- colonne location_id sur data_reel_timeseries, data_process_timeseries, data_predict_timeseries
+  et latest_prediction ; les lignes existantes sont rattachées à 'berlin'
+- unicité (location_id, time) / (location_id, ds) à la place de l'unicité sur la date seule
+- index (location_id, ds, created_at) à la place de (ds, created_at) sur data_predict_timeseries
+- clé primaire (location_id, ds) sur latest_prediction
+- point de reprise de data_process_timeseries suffixé par le site
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2025-07-10 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+DEFAULT_LOCATION = 'berlin'
+
+# Les contraintes d'unicité de 0001 n'ont pas de nom sous SQLite : la convention leur en donne un
+UNIQUE_NAMING = {"uq": "uq_%(table_name)s_%(column_0_name)s"}
+
+
+def unique_name(table: str, column: str) -> str:
+    """Nom de la contrainte d'unicité historique portant sur la seule colonne de date"""
+    for constraint in sa.inspect(op.get_bind()).get_unique_constraints(table):
+        if constraint['column_names'] == [column] and constraint['name']:
+            return constraint['name']
+    return f"uq_{table}_{column}"
+
+
+def location_column() -> sa.Column:
+    return sa.Column('location_id', sa.String(), nullable=False, server_default=DEFAULT_LOCATION)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    location = op.create_table(
+        'location',
+        sa.Column('location_id', sa.String(), primary_key=True),
+        sa.Column('name', sa.String(), nullable=True),
+        sa.Column('latitude', sa.Float(), nullable=False),
+        sa.Column('longitude', sa.Float(), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=False, server_default=sa.true()),
+    )
+    op.bulk_insert(location, [
+        {'location_id': DEFAULT_LOCATION, 'name': 'Berlin', 'latitude': 52.52, 'longitude': 13.41, 'is_active': True}
+    ])
+
+    for table, column in (('data_reel_timeseries', 'time'), ('data_process_timeseries', 'ds')):
+        name = unique_name(table, column)
+        with op.batch_alter_table(table, naming_convention=UNIQUE_NAMING) as batch_op:
+            batch_op.add_column(location_column())
+            batch_op.drop_constraint(name, type_='unique')
+            batch_op.create_unique_constraint(f'uq_{table}_location_id_{column}', ['location_id', column])
+
+    op.drop_index('ix_data_predict_timeseries_ds_created_at', table_name='data_predict_timeseries')
+    with op.batch_alter_table('data_predict_timeseries') as batch_op:
+        batch_op.add_column(location_column())
+    op.create_index('ix_data_predict_timeseries_location_id_ds_created_at', 'data_predict_timeseries',
+                    ['location_id', 'ds', 'created_at'])
+
+    # Nouvelle clé primaire : la table est recréée et ses lignes recopiées
+    op.rename_table('latest_prediction', 'latest_prediction_old')
+    op.create_table(
+        'latest_prediction',
+        sa.Column('location_id', sa.String(), primary_key=True, server_default=DEFAULT_LOCATION),
+        sa.Column('ds', sa.DateTime(), primary_key=True),
+        sa.Column('y', sa.Float()),
+        sa.Column('model_id', sa.String(), nullable=False),
+        sa.Column('run_id', sa.String(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.execute(
+        sa.text("INSERT INTO latest_prediction (location_id, ds, y, model_id, run_id, updated_at) "
+                "SELECT :location, ds, y, model_id, run_id, updated_at FROM latest_prediction_old")
+        .bindparams(location=DEFAULT_LOCATION)
+    )
+    op.drop_table('latest_prediction_old')
+
+    op.execute(
+        sa.text("UPDATE pipeline_watermark SET name = :new WHERE name = :old")
+        .bindparams(new=f'data_process_timeseries:{DEFAULT_LOCATION}', old='data_process_timeseries')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(
+        sa.text("DELETE FROM pipeline_watermark WHERE name LIKE 'data_process_timeseries:%' AND name != :default")
+        .bindparams(default=f'data_process_timeseries:{DEFAULT_LOCATION}')
+    )
+    op.execute(
+        sa.text("UPDATE pipeline_watermark SET name = :old WHERE name = :new")
+        .bindparams(new=f'data_process_timeseries:{DEFAULT_LOCATION}', old='data_process_timeseries')
+    )
+
+    # Seules les données du site historique sont conservées
+    for table in ('latest_prediction', 'data_predict_timeseries', 'data_process_timeseries', 'data_reel_timeseries'):
+        op.execute(sa.text(f"DELETE FROM {table} WHERE location_id != :location").bindparams(location=DEFAULT_LOCATION))
+
+    op.rename_table('latest_prediction', 'latest_prediction_new')
+    op.create_table(
+        'latest_prediction',
+        sa.Column('ds', sa.DateTime(), primary_key=True),
+        sa.Column('y', sa.Float()),
+        sa.Column('model_id', sa.String(), nullable=False),
+        sa.Column('run_id', sa.String(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.execute("INSERT INTO latest_prediction (ds, y, model_id, run_id, updated_at) "
+               "SELECT ds, y, model_id, run_id, updated_at FROM latest_prediction_new")
+    op.drop_table('latest_prediction_new')
+
+    op.drop_index('ix_data_predict_timeseries_location_id_ds_created_at', table_name='data_predict_timeseries')
+    with op.batch_alter_table('data_predict_timeseries') as batch_op:
+        batch_op.drop_column('location_id')
+    op.create_index('ix_data_predict_timeseries_ds_created_at', 'data_predict_timeseries', ['ds', 'created_at'])
+
+    for table, column in (('data_reel_timeseries', 'time'), ('data_process_timeseries', 'ds')):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_constraint(f'uq_{table}_location_id_{column}', type_='unique')
+            batch_op.drop_column('location_id')
+            batch_op.create_unique_constraint(f'uq_{table}_{column}', [column])
+
+    op.drop_table('location')
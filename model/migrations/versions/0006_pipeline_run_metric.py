@@ -0,0 +1,47 @@
+"""Table pipeline_run_metric (mesures par étape des runs de pipeline)
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2025-07-16 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'pipeline_run_metric',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('run_id', sa.String(), nullable=False),
+        sa.Column('pipeline', sa.String(), nullable=False),
+        sa.Column('location_id', sa.String(), nullable=False, server_default='berlin'),
+        sa.Column('model_id', sa.String(), sa.ForeignKey('logging_timeseries.model_id'), nullable=True),
+        sa.Column('stage', sa.String(), nullable=False),
+        sa.Column('started_at', sa.DateTime(), nullable=False),
+        sa.Column('wall_seconds', sa.Float(), nullable=False),
+        sa.Column('cpu_seconds', sa.Float(), nullable=False),
+        sa.Column('rss_peak_delta_bytes', sa.BigInteger(), nullable=False),
+        sa.Column('rows', sa.Integer(), nullable=True),
+        sa.Column('status', sa.String(), nullable=False),
+    )
+    op.create_index('ix_pipeline_run_metric_pipeline_stage_started_at', 'pipeline_run_metric',
+                    ['pipeline', 'stage', 'started_at'])
+    op.create_index('ix_pipeline_run_metric_model_id', 'pipeline_run_metric', ['model_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_pipeline_run_metric_model_id', table_name='pipeline_run_metric')
+    op.drop_index('ix_pipeline_run_metric_pipeline_stage_started_at', table_name='pipeline_run_metric')
+    op.drop_table('pipeline_run_metric')
@@ -0,0 +1,62 @@
+"""Dimension location des modèles (un champion par site)
+
+- colonne location_id sur logging_timeseries et model_registry ; les modèles existants,
+  entraînés sur le site historique, sont rattachés à 'berlin'
+- index (location_id, is_notebook, score) à la place de (is_notebook, score) sur logging_timeseries
+- index (location_id, status, created_at) à la place de (status, created_at) sur model_registry
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2025-07-20 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+DEFAULT_LOCATION = 'berlin'
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.drop_index('ix_logging_timeseries_is_notebook_score', table_name='logging_timeseries')
+    with op.batch_alter_table('logging_timeseries') as batch_op:
+        batch_op.add_column(sa.Column('location_id', sa.String(), nullable=False, server_default=DEFAULT_LOCATION))
+    op.create_index('ix_logging_timeseries_location_id_is_notebook_score', 'logging_timeseries',
+                    ['location_id', 'is_notebook', 'score'])
+
+    op.drop_index('ix_model_registry_status_created_at', table_name='model_registry')
+    with op.batch_alter_table('model_registry') as batch_op:
+        batch_op.add_column(sa.Column('location_id', sa.String(), nullable=False, server_default=DEFAULT_LOCATION))
+    op.create_index('ix_model_registry_location_id_status_created_at', 'model_registry',
+                    ['location_id', 'status', 'created_at'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Seuls les modèles du site historique sont conservés ; leurs mesures de run sont détachées
+    op.execute(
+        sa.text("UPDATE pipeline_run_metric SET model_id = NULL WHERE model_id IN "
+                "(SELECT model_id FROM logging_timeseries WHERE location_id != :location)")
+        .bindparams(location=DEFAULT_LOCATION)
+    )
+    for table in ('model_registry', 'logging_timeseries'):
+        op.execute(sa.text(f"DELETE FROM {table} WHERE location_id != :location").bindparams(location=DEFAULT_LOCATION))
+
+    op.drop_index('ix_model_registry_location_id_status_created_at', table_name='model_registry')
+    with op.batch_alter_table('model_registry') as batch_op:
+        batch_op.drop_column('location_id')
+    op.create_index('ix_model_registry_status_created_at', 'model_registry', ['status', 'created_at'])
+
+    op.drop_index('ix_logging_timeseries_location_id_is_notebook_score', table_name='logging_timeseries')
+    with op.batch_alter_table('logging_timeseries') as batch_op:
+        batch_op.drop_column('location_id')
+    op.create_index('ix_logging_timeseries_is_notebook_score', 'logging_timeseries', ['is_notebook', 'score'])
@@ -1,7 +1,12 @@
 import json
 import logging
+import os
 import uuid
 
+import pandas as pd
+
+from model.entity.location import DEFAULT_LOCATION
+from model.repository.latest_prediction_repository import LatestPredictionRepository
 from model.repository.logging_timeseries_repository import LoggingTimeseriesRepository
 from model.services.secure_logger_manager import SecureLoggerManager
 
@@ -10,7 +15,6 @@ logging.basicConfig(
     format="%(asctime)s - %(levelname)s - %(message)s"
 )
 
-from model.entity.base import Base
 from model.pipeline.interface import ModelManagerInterface
 from model.pipeline.interface.DataManagerInterface import DataManagerInterface
 
@@ -19,74 +23,187 @@ from model.pipeline.timeseries.FeatureManager import FeatureManager
 from model.pipeline.timeseries.classes.XGBoostManager import XGBoostManager
 from model.services.database_manager import DatabaseManager
 from model.services.logger_manager import LoggerManager
+from model.services.registry_manager import RegistryManager
+from model.services.stage_metrics import StageMetrics
+from model.services.step_cache import StepCache, code_version
 
 
 class PipelineBatchPredictor:
+
+    STRATEGIES = ('recursive', 'proxy')
+
     def __init__(self,
                  data_manager: DataManagerInterface,
                  logger_database: LoggerManager,
                  feature_manager: FeatureManagerInterface,
-                 model_manager: ModelManagerInterface
+                 model_manager: ModelManagerInterface,
+                 champion_id: str = None,
+                 run_id: str = None,
+                 strategy: str = 'recursive',
+                 step_cache: StepCache = None
                  ):
+        """
+        :param strategy: 'recursive' (les prédictions alimentent les lags des pas suivants)
+                         ou 'proxy' (lags tirés des valeurs observées un an plus tôt)
+        :param step_cache: cache des étapes ; la prédiction est ignorée si données, champion et stratégie sont inchangés
+        """
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Stratégie de prévision inconnue : {strategy} ({', '.join(self.STRATEGIES)})")
         self.data_manager = data_manager
         self.feature_manager = feature_manager
         self.model_manager = model_manager
         self.logger_database = logger_database
-
-    def run(self):
-
+        self.champion_id = champion_id
+        self.run_id = run_id
+        self.strategy = strategy
+        self.step_cache = step_cache
+
+    def run(self, df: pd.DataFrame = None):
+        """
+        Exécute le pipeline ; les mesures de chaque étape sont enregistrées (rattachées au champion)
+        et exportées à la fin du run, y compris en cas d'échec.
+        :param df: données transformées et déjà sauvegardées (PipelineRunner) ; chargées depuis la base sinon.
+                   Un modèle déjà présent dans model_manager est utilisé tel quel, sans relecture du registre.
+        """
+        self.metrics = StageMetrics('batch_predictor', getattr(self.data_manager, 'location_id', DEFAULT_LOCATION),
+                                    run_id=self.run_id)
+        try:
+            self.runSteps(df)
+        finally:
+            # Champion connu à l'appel ou chargé par loadBestModel
+            self.metrics.model_id = self.champion_id or getattr(self.model_manager, 'champion_id', None)
+            self.metrics.publish(self.logger_database.repository.session)
+
+    def runSteps(self, df: pd.DataFrame = None):
         secure_log = SecureLoggerManager('pipeline_batch').get_logger()
 
         secure_log.info("Lancement du pipeline")
 
-        secure_log.info("Etape 1 - Nettoyage des données")
-        df = self.data_manager.loadData()
-        df = self.data_manager.cleanData(df)
-        df = self.data_manager.transformData(df)
-
-        self.data_manager.saveData(df)
-
-        secure_log.info("Etape 2 - Transformation des données")
-        data_future = self.data_manager.loadFutureData(df)
-        train_future, test_future = self.feature_manager.transformData(df, data_future)
-
-        best_n_lags = self.model_manager.params['n_lags']
-        X_train, y_train, X_test, y_test = self.feature_manager.lagger(train_future, test_future, best_n_lags)
-
-        secure_log.info("Etape 3 - Evaluation")
-        self.model_manager.loadBestModel()
-        secure_log.info(f"Modèle utilisé : {self.model_manager.model_id}")
-        results, predict = self.model_manager.eval(X_test, y_test)
-
-        self.data_manager.savePredict(predict, self.model_manager.model_id)
+        if df is None:
+            secure_log.info("Etape 1 - Nettoyage des données")
+            with self.metrics.stage('prepare') as stage:
+                df = self.data_manager.prepareData()
+                stage['rows'] = len(df)
+
+        step = f"predict_{getattr(self.data_manager, 'location_id', 'default')}"
+        predict_key = self.predictFingerprint(df) if self.step_cache is not None else None
+        if predict_key is not None and self.step_cache.load(step, predict_key) is not None:
+            secure_log.info("Prédictions déjà enregistrées pour ces données et ce champion")
+            secure_log.info("Finished pipeline")
+            return
+
+        if self.strategy == 'recursive':
+            secure_log.info("Etape 2 - Prévision récursive")
+            with self.metrics.stage('forecast', rows=len(df)):
+                if self.model_manager.model is None:
+                    self.model_manager.loadBestModel()
+                secure_log.info(f"Modèle utilisé : {self.model_manager.model_id}")
+                predict = self.model_manager.forecast(df.set_index('ds')['y'], self.data_manager.futureDates(df))
+        else:
+            secure_log.info("Etape 2 - Transformation des données")
+            with self.metrics.stage('features') as stage:
+                data_future = self.data_manager.loadFutureData(df)
+                train_future, test_future = self.feature_manager.transformData(df, data_future)
+
+                best_n_lags = self.model_manager.params['n_lags']
+                X_train, y_train, X_test, y_test = self.feature_manager.lagger(train_future, test_future, best_n_lags)
+                stage['rows'] = len(X_train) + len(X_test)
+
+            secure_log.info("Etape 3 - Evaluation")
+            with self.metrics.stage('evaluation', rows=len(X_test)):
+                if self.model_manager.model is None:
+                    self.model_manager.loadBestModel()
+                secure_log.info(f"Modèle utilisé : {self.model_manager.model_id}")
+                # Pas de graphique : les sites d'un run partagent le même model_id
+                results, predict = self.model_manager.eval(X_test, y_test, plot=False)
+
+        with self.metrics.stage('save', rows=len(predict)):
+            self.data_manager.savePredict(predict, self.model_manager.model_id, self.champion_id, self.run_id)
+        if predict_key is not None:
+            self.step_cache.save(step, predict_key, predict)
 
         secure_log.info("Finished pipeline")
 
-if __name__ == '__main__':
+    def predictFingerprint(self, df: pd.DataFrame) -> str:
+        """Empreinte des prédictions : données préparées, champion, stratégie, période prédite et version du code"""
+        future = self.data_manager.futureDates(df)
+        return self.step_cache.fingerprint(
+            data=self.data_manager.fingerprint(),
+            champion_id=self.champion_id or getattr(self.model_manager, 'champion_id', None),
+            strategy=self.strategy,
+            future=(future.min(), len(future)),
+            code=code_version(PipelineBatchPredictor, type(self.model_manager), type(self.data_manager)),
+        )
+
+def predict_location(location: dict, run_id: str) -> str:
+    """
+    Prédictions d'un site avec son champion (exécuté dans un processus du pool,
+    avec sa propre connexion à la base).
+    :param location: site (location_id, latitude, longitude)
+    :return: identifiant du modèle de prédiction enregistré
+    :raise RuntimeError: aucun modèle entraîné pour le site
+    """
     from model.pipeline.timeseries.DataManager import DataManager
 
     db_manager = DatabaseManager()
     db_manager.init_connection()
+    step_cache = StepCache.from_env()
+    try:
+        champion = LoggingTimeseriesRepository(db_manager.session).get_best_model(location['location_id'])
+        if champion is None:
+            raise RuntimeError(f"Aucun modèle entraîné pour le site {location['location_id']}")
+        champion_id = champion.model_id
+
+        xgb = XGBoostManager(
+            fast_path=os.getenv('XGB_FAST_PATH', 'true').lower() in ('1', 'true', 'yes'),
+            n_jobs=int(os.getenv('XGB_N_JOBS')) if os.getenv('XGB_N_JOBS') else None,
+            registry=RegistryManager(session=db_manager.session)
+        )
+        xgb.model_id = champion_id + '_' + run_id
+        xgb.params = champion.params
+        xgb.champion_id = champion_id
+
+        batch_predictor = PipelineBatchPredictor(
+            data_manager=DataManager(db_manager, location_id=location['location_id'], step_cache=step_cache),
+            model_manager=xgb,
+            feature_manager=FeatureManager(xgb),
+            logger_database=LoggerManager(db_manager.session),
+            champion_id=champion_id,
+            run_id=run_id,
+            strategy=os.getenv('FORECAST_STRATEGY', 'recursive'),
+            step_cache=step_cache
+        )
+        batch_predictor.run()
+        return xgb.model_id
+    finally:
+        db_manager.close()
 
-    logger_manager = LoggerManager(db_manager.session)
 
-    Base.metadata.create_all(db_manager.engine)
+if __name__ == '__main__':
+    from functools import partial
 
-    logging_timeseries_repository = LoggingTimeseriesRepository(db_manager.session)
+    from model.helpers.location_helper import run_by_location
+    from model.repository.location_repository import LocationRepository
+
+    db_manager = DatabaseManager()
+    db_manager.init_connection()
 
-    xgb = XGBoostManager()
-    best_model = logging_timeseries_repository.get_best_model()
+    db_manager.upgrade_schema()
 
-    xgb.model_id = best_model.model_id + '_'+ str(uuid.uuid4())
-    xgb.params = best_model.params
+    latest_prediction_repository = LatestPredictionRepository(db_manager.session)
+    if latest_prediction_repository.is_empty():
+        latest_prediction_repository.rebuild_from_history()
 
-    PipelineBatchPredictor = PipelineBatchPredictor(
-        data_manager=DataManager(db_manager),
-        model_manager=xgb,
-        feature_manager=FeatureManager(xgb),
-        logger_database=logger_manager
-    )
+    locations = LocationRepository(db_manager.session).get_active()
+    db_manager.session.close()
 
-    PipelineBatchPredictor.run()
+    # Un même run_id pour tous les sites : les prédictions d'un run restent regroupées ;
+    # chaque site est prédit avec son propre champion
+    run_id = str(uuid.uuid4())
+    results = run_by_location(partial(predict_location, run_id=run_id), locations)
 
-    db_manager.session.close()
\ No newline at end of file
+    failed = sorted(location_id for location_id, result in results.items() if isinstance(result, Exception))
+    if failed:
+        logging.error(f"Sites en échec : {', '.join(failed)}")
+    if locations and len(failed) == len(locations):
+        raise SystemExit(1)
@@ -1,5 +1,12 @@
 import logging
+import os
+from datetime import datetime, timedelta
 
+import numpy as np
+import pandas as pd
+from sklearn.metrics import mean_squared_error
+
+from model.entity.location import DEFAULT_LOCATION
 from model.services.secure_logger_manager import SecureLoggerManager
 
 logging.basicConfig(
@@ -7,88 +14,341 @@ logging.basicConfig(
     format="%(asctime)s - %(levelname)s - %(message)s"
 )
 
-from model.entity.base import Base
 from model.pipeline.interface import ModelManagerInterface
 from model.pipeline.interface.DataManagerInterface import DataManagerInterface
 
 from model.pipeline.interface.FeatureManagerInterface import FeatureManagerInterface
 from model.pipeline.timeseries.FeatureManager import FeatureManager
 from model.pipeline.timeseries.classes.XGBoostManager import XGBoostManager
+from model.repository.pipeline_watermark_repository import PipelineWatermarkRepository
 from model.services.database_manager import DatabaseManager
 from model.services.logger_manager import LoggerManager
+from model.services.registry_manager import RegistryManager
+from model.services.stage_metrics import StageMetrics
+from model.services.step_cache import StepCache, code_version
 
 
 class PipelineOrchestrator:
+    """
+    Tuning / entraînement d'un site (celui du data_manager) : le champion du site est choisi
+    parmi les seuls modèles entraînés sur ses données.
+    """
+
+    # Date du dernier tuning complet (suffixé par le site), indépendante du champion
+    FULL_TUNE_WATERMARK = 'full_tune'
+
     def __init__(self,
                  data_manager: DataManagerInterface,
                  logger_database: LoggerManager,
                  feature_manager: FeatureManagerInterface,
-                 model_manager: ModelManagerInterface
+                 model_manager: ModelManagerInterface,
+                 training_mode: str = 'auto',
+                 retune_interval_days: float = 7,
+                 drift_rmse_ratio: float = 1.5,
+                 incremental_rounds: int = 50,
+                 max_rounds: int = 600,
+                 registry: RegistryManager = None,
+                 keep_challengers: int = 5,
+                 step_cache: StepCache = None
                  ):
+        """
+        :param training_mode: 'full' (tuning + entraînement complet), 'incremental' (poursuite du
+                              champion sur les nouvelles lignes) ou 'auto' (incrémental, sauf si le
+                              dernier tuning date de plus de retune_interval_days ou en cas de dérive)
+        :param retune_interval_days: intervalle entre deux tunings complets, en jours
+        :param drift_rmse_ratio: dérive détectée si la RMSE du champion sur les nouvelles lignes
+                                 dépasse ce multiple de sa RMSE de test
+        :param incremental_rounds: tours de boosting ajoutés en mode incrémental
+        :param max_rounds: nombre maximal de tours d'un booster poursuivi ; au-delà, tuning complet
+        :param registry: registre indexé en base ; si fourni, la rétention est appliquée après chaque run
+        :param keep_challengers: nombre de challengers conservés en plus du champion
+        :param step_cache: cache des étapes ; l'entraînement est ignoré si données et configuration sont inchangées
+        """
         self.data_manager = data_manager
         self.feature_manager = feature_manager
         self.model_manager = model_manager
         self.logger_database = logger_database
+        self.training_mode = training_mode
+        self.retune_interval_days = retune_interval_days
+        self.drift_rmse_ratio = drift_rmse_ratio
+        self.incremental_rounds = incremental_rounds
+        self.max_rounds = max_rounds
+        self.registry = registry
+        self.keep_challengers = keep_challengers
+        self.step_cache = step_cache
+        self.metrics = StageMetrics('orchestrator', getattr(data_manager, 'location_id', DEFAULT_LOCATION))
 
-    def run(self):
+    def run(self, df: pd.DataFrame = None):
+        """
+        Exécute le pipeline ; les mesures de chaque étape sont enregistrées et exportées à la fin du run,
+        y compris en cas d'échec.
+        :param df: données transformées et déjà sauvegardées (PipelineRunner) ; chargées depuis la base sinon
+        """
+        self.metrics = StageMetrics('orchestrator', self.metrics.location_id)
+        try:
+            self.runSteps(df)
+        finally:
+            self.metrics.publish(self.logger_database.repository.session)
 
+    def runSteps(self, df: pd.DataFrame = None):
         secure_log = SecureLoggerManager('pipeline_orchestrator').get_logger()
         secure_log.info("Lancement du pipeline")
 
-        secure_log.info("Etape 1 - Nettoyage des données")
-        df = self.data_manager.loadData()
-        df = self.data_manager.cleanData(df)
-        df = self.data_manager.transformData(df)
+        if df is None:
+            secure_log.info("Etape 1 - Nettoyage des données")
+            with self.metrics.stage('prepare') as stage:
+                df = self.data_manager.prepareData()
+                stage['rows'] = len(df)
 
-        self.data_manager.saveData(df)
-        train, test = self.data_manager.splitData(df)
+        step = f"train_{self.metrics.location_id}"
+        training_key = self.trainingFingerprint() if self.step_cache is not None else None
+        if training_key is not None:
+            previous = self.step_cache.load(step, training_key)
+            if previous is not None:
+                secure_log.info(f"Données et configuration inchangées depuis le run de {previous['model_id']}")
+                self.metrics.model_id = previous['model_id']
+                secure_log.info("Finished pipeline")
+                return
 
-        secure_log.info("Etape 2 - Recherche des hyperparameters")
-        self.model_manager.tune(train)
+        with self.metrics.stage('split', rows=len(df)):
+            train, test = self.data_manager.splitData(df)
 
-        secure_log.info("Etape 3 - Recherche des features")
-        train, test = self.feature_manager.transformData(train, test)
+        champion = self.logger_database.repository.get_best_model(self.metrics.location_id)
+        watermarks = PipelineWatermarkRepository(self.logger_database.repository.session)
+        mode = self.trainingMode(champion, watermarks.get_value(self.full_tune_watermark))
+        secure_log.info(f"Mode d'entraînement : {mode}")
 
-        best_n_lags=self.model_manager.params.best_params['n_lags']
-        X_train, y_train, X_test, y_test = self.feature_manager.lagger(train, test, best_n_lags)
+        trained = None
+        if mode == 'incremental':
+            trained = self.incrementalTraining(train, test, champion, secure_log)
+            if trained is False:
+                secure_log.info("Aucune nouvelle donnée depuis le dernier entraînement")
+                self.metrics.model_id = champion.model_id
+                if training_key is not None:
+                    self.step_cache.save(step, training_key, {'model_id': champion.model_id, 'training_mode': mode})
+                secure_log.info("Finished pipeline")
+                return
+        if trained is None:
+            mode = 'full'
+            trained = self.fullTraining(train, test, champion, secure_log)
 
-        secure_log.info("Etape 4 - Entrainement")
-        self.model_manager.train(X_train, y_train)
+        params, X_test, y_test, metadata = trained
 
         secure_log.info("Etape 5 - Evaluation")
-        results, _ = self.model_manager.eval(X_test, y_test)
+        with self.metrics.stage('evaluation', rows=len(X_test)):
+            results, _ = self.model_manager.eval(X_test, y_test)
+        # Score du champion : MSE sur la fenêtre récente de test, exclue de l'entraînement dans les deux modes
+        score = float(results['RMSE'] ** 2)
 
         secure_log.info("Etape 6 - Results")
-        self.model_manager.save()
-        secure_log.info(f"Modèle sauvegardé : {self.model_manager.model_id}")
-        self.logger_database.log_training(
-            'XGBRegressor',
-            self.model_manager.params.best_value,
-            self.model_manager.params.best_params,
-            results,
-            self.model_manager.model_id,
-        )
+        with self.metrics.stage('results'):
+            self.model_manager.save()
+            secure_log.info(f"Modèle sauvegardé : {self.model_manager.model_id}")
+            if mode == 'full':
+                # Validé avec la ligne de journal : un tuning moins bon que le champion compte aussi
+                watermarks.set_value(self.full_tune_watermark, datetime.fromisoformat(metadata['last_full_tune']))
+            self.logger_database.log_training(
+                'XGBRegressor',
+                score,
+                params,
+                dict(results, training_mode=mode, **metadata),
+                self.model_manager.model_id,
+                location_id=self.metrics.location_id,
+            )
+            self.metrics.model_id = self.model_manager.model_id
+
+            if self.registry is not None:
+                champion = self.logger_database.repository.get_best_model(self.metrics.location_id)
+                deleted = self.registry.apply_retention(champion.model_id if champion else None, self.keep_challengers,
+                                                        self.metrics.location_id)
+                secure_log.info(f"Registre : champion {champion.model_id if champion else None}, {len(deleted)} modèle(s) supprimé(s)")
+
+        if training_key is not None:
+            self.step_cache.save(step, training_key, {'model_id': self.model_manager.model_id, 'training_mode': mode})
 
         secure_log.info("Finished pipeline")
 
+    def trainingFingerprint(self) -> str:
+        """Empreinte de l'entraînement : données préparées, configuration du run et version du code"""
+        tuning = {name: getattr(self.model_manager, name, None)
+                  for name in ('n_trials', 'timeout', 'pruner', 'early_stopping_rounds', 'fast_path')}
+        return self.step_cache.fingerprint(
+            data=self.data_manager.fingerprint(),
+            training_mode=self.training_mode,
+            retune_interval_days=self.retune_interval_days,
+            drift_rmse_ratio=self.drift_rmse_ratio,
+            incremental_rounds=self.incremental_rounds,
+            max_rounds=self.max_rounds,
+            tuning=tuning,
+            code=code_version(PipelineOrchestrator, type(self.model_manager), type(self.feature_manager)),
+        )
 
-if __name__ == '__main__':
-    from model.pipeline.timeseries.DataManager import DataManager
+    @property
+    def full_tune_watermark(self) -> str:
+        return f"{self.FULL_TUNE_WATERMARK}:{self.metrics.location_id}"
 
-    db_manager = DatabaseManager()
-    db_manager.init_connection()
+    def trainingMode(self, champion, last_full_tune: datetime = None) -> str:
+        """
+        Choisit entre tuning complet et entraînement incrémental.
+        Le mode incrémental exige un champion dont la date de fin d'entraînement est connue.
+        :param last_full_tune: date du dernier tuning complet, champion ou non (point de reprise full_tune) ;
+                               à défaut, celle enregistrée avec le champion (journaux antérieurs au point de reprise)
+        """
+        results = (champion.results or {}) if champion is not None else {}
+        if self.training_mode == 'full' or 'trained_until' not in results:
+            return 'full'
+        if self.training_mode == 'incremental':
+            return 'incremental'
+
+        if last_full_tune is None and results.get('last_full_tune') is not None:
+            last_full_tune = datetime.fromisoformat(results['last_full_tune'])
+        if last_full_tune is None:
+            return 'full'
+        elapsed = datetime.now() - last_full_tune
+        return 'full' if elapsed >= timedelta(days=self.retune_interval_days) else 'incremental'
+
+    def fullTraining(self, train, test, champion, secure_log):
+        """Tuning complet (amorcé avec les paramètres du champion) puis entraînement sur tout train"""
+        secure_log.info("Etape 2 - Recherche des hyperparameters")
+        if champion is not None and champion.params:
+            self.model_manager.warm_start_params = champion.params
+        with self.metrics.stage('tuning', rows=len(train)):
+            self.model_manager.tune(train)
+
+        secure_log.info("Etape 3 - Recherche des features")
+        with self.metrics.stage('features') as stage:
+            train, test = self.feature_manager.transformData(train, test)
+
+            best_n_lags=self.model_manager.params.best_params['n_lags']
+            X_train, y_train, X_test, y_test = self.feature_manager.lagger(train, test, best_n_lags)
+            stage['rows'] = len(X_train) + len(X_test)
+
+        secure_log.info("Etape 4 - Entrainement")
+        with self.metrics.stage('training', rows=len(X_train)):
+            self.model_manager.train(X_train, y_train)
+
+        metadata = {
+            'trained_until': X_train.index.max().isoformat(),
+            'last_full_tune': datetime.now().isoformat(),
+            'cv_score': self.model_manager.params.best_value,
+        }
+        return self.model_manager.params.best_params, X_test, y_test, metadata
+
+    def incrementalTraining(self, train, test, champion, secure_log):
+        """
+        Poursuit le champion sur les lignes arrivées depuis son entraînement.
+        :return: None si un tuning complet est nécessaire (dérive, modèle introuvable, max_rounds atteint),
+                 False s'il n'y a aucune nouvelle ligne, sinon le résultat de l'entraînement
+        """
+        secure_log.info("Etape 2 - Reprise des hyperparameters du champion")
+        params = dict(champion.params)
+        self.model_manager.params = params
+
+        secure_log.info("Etape 3 - Recherche des features")
+        with self.metrics.stage('features') as stage:
+            train, test = self.feature_manager.transformData(train, test)
+            X_train, y_train, X_test, y_test = self.feature_manager.lagger(train, test, params['n_lags'])
+            stage['rows'] = len(X_train) + len(X_test)
+
+        new_rows = X_train.index > pd.Timestamp(champion.results['trained_until'])
+        if not new_rows.any():
+            return False
+        if params.get('n_estimators', 0) + self.incremental_rounds > self.max_rounds:
+            secure_log.info(f"Booster de {params['n_estimators']} tours (max {self.max_rounds}) : tuning complet")
+            return None
+        X_new, y_new = X_train[new_rows], y_train[new_rows]
 
-    logger_manager = LoggerManager(db_manager.session)
+        with self.metrics.stage('drift', rows=len(X_new)):
+            try:
+                self.model_manager.loadModel(champion.model_id)
+            except FileNotFoundError:
+                secure_log.warning(f"Modèle {champion.model_id} introuvable : tuning complet")
+                return None
 
-    Base.metadata.create_all(db_manager.engine)
+            # Dérive : le champion se dégrade nettement sur les nouvelles lignes
+            rmse_new = float(np.sqrt(mean_squared_error(y_new, self.model_manager.predict(X_new)['y'])))
+        rmse_ref = champion.results.get('RMSE')
+        if rmse_ref is not None and rmse_new > self.drift_rmse_ratio * rmse_ref:
+            secure_log.info(f"Dérive détectée (RMSE {rmse_new:.2f} > {self.drift_rmse_ratio} x {rmse_ref:.2f}) : tuning complet")
+            self.model_manager.params = None
+            return None
+
+        secure_log.info(f"Etape 4 - Entrainement incrémental ({len(X_new)} nouvelles lignes)")
+        with self.metrics.stage('training', rows=len(X_new)):
+            self.model_manager.trainIncremental(X_new, y_new, champion.model_id, self.incremental_rounds)
+
+        metadata = {
+            'trained_until': X_train.index.max().isoformat(),
+            'base_model_id': champion.model_id,
+        }
+        return self.model_manager.params, X_test, y_test, metadata
+
+
+def orchestrator_from_env(db_manager: DatabaseManager, registry: RegistryManager = None,
+                          step_cache: StepCache = None, location_id: str = DEFAULT_LOCATION) -> PipelineOrchestrator:
+    """
+    Orchestrateur d'un site configuré par les variables d'environnement
+    (TUNING_*, XGB_*, TRAINING_MODE, PIPELINE_CACHE, ...)
+    """
+    from model.pipeline.timeseries.DataManager import DataManager
 
-    xgb = XGBoostManager()
+    registry = registry or RegistryManager(session=db_manager.session)
+    step_cache = step_cache or StepCache.from_env()
 
-    pipelineOrchestrator = PipelineOrchestrator(
-        data_manager=DataManager(db_manager),
+    # Tuning : nombre d'essais, processus parallèles et budget de temps (secondes)
+    timeout = os.getenv('TUNING_TIMEOUT')
+    # Une étude par site : un nom fixé est suffixé par le site
+    study_name = os.getenv('TUNING_STUDY_NAME')
+    xgb = XGBoostManager(
+        n_trials=int(os.getenv('TUNING_N_TRIALS', '30')),
+        n_workers=int(os.getenv('TUNING_N_WORKERS', '1')),
+        timeout=float(timeout) if timeout else None,
+        storage=os.getenv('TUNING_STORAGE') or None,
+        study_name=f"{study_name}_{location_id}" if study_name else None,
+        grace_period=float(os.getenv('TUNING_GRACE_PERIOD', '600')),
+        fast_path=os.getenv('XGB_FAST_PATH', 'true').lower() in ('1', 'true', 'yes'),
+        n_jobs=int(os.getenv('XGB_N_JOBS')) if os.getenv('XGB_N_JOBS') else None,
+        registry=registry,
+        location_id=location_id
+    )
+
+    return PipelineOrchestrator(
+        data_manager=DataManager(db_manager, location_id=location_id, step_cache=step_cache),
         model_manager=xgb,
         feature_manager=FeatureManager(xgb),
-        logger_database=logger_manager
+        logger_database=LoggerManager(db_manager.session),
+        training_mode=os.getenv('TRAINING_MODE', 'auto'),
+        retune_interval_days=float(os.getenv('RETUNE_INTERVAL_DAYS', '7')),
+        drift_rmse_ratio=float(os.getenv('DRIFT_RMSE_RATIO', '1.5')),
+        incremental_rounds=int(os.getenv('INCREMENTAL_ROUNDS', '50')),
+        max_rounds=int(os.getenv('MAX_BOOSTING_ROUNDS', '600')),
+        registry=registry,
+        keep_challengers=int(os.getenv('REGISTRY_KEEP_CHALLENGERS', '5')),
+        step_cache=step_cache
     )
 
-    pipelineOrchestrator.run()
\ No newline at end of file
+
+if __name__ == '__main__':
+    from model.repository.location_repository import LocationRepository
+
+    db_manager = DatabaseManager()
+    db_manager.init_connection()
+
+    db_manager.upgrade_schema()
+
+    # Un champion par site : les sites actifs sont entraînés l'un après l'autre
+    locations = LocationRepository(db_manager.session).get_active()
+    failed = []
+    for location in locations:
+        try:
+            orchestrator_from_env(db_manager, location_id=location['location_id']).run()
+        except Exception as e:
+            logging.error(f"Site {location['location_id']} : entraînement en échec : {e}")
+            db_manager.session.rollback()
+            failed.append(location['location_id'])
+    db_manager.close()
+
+    if failed:
+        logging.error(f"Sites en échec : {', '.join(failed)}")
+    if locations and len(failed) == len(locations):
+        raise SystemExit(1)
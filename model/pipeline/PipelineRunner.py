@@ -0,0 +1,213 @@
+import logging
+import os
+import sys
+import uuid
+
+from model.helpers.location_helper import run_by_location
+from model.pipeline.PipelineBatchPredictor import PipelineBatchPredictor
+from model.pipeline.PipelineOrchestrator import orchestrator_from_env
+from model.pipeline.timeseries.DataManager import DataManager
+from model.pipeline.timeseries.FeatureManager import FeatureManager
+from model.pipeline.timeseries.classes.XGBoostManager import XGBoostManager
+from model.repository.latest_prediction_repository import LatestPredictionRepository
+from model.repository.location_repository import LocationRepository
+from model.services.database_manager import DatabaseManager
+from model.services.logger_manager import LoggerManager
+from model.services.registry_manager import RegistryManager
+from model.services.secure_logger_manager import SecureLoggerManager
+from model.services.stage_metrics import StageMetrics
+from model.services.step_cache import StepCache
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+
+class PipelineRunner:
+    """
+    Cycle complet dans un seul processus : récupération Open-Meteo, tuning / entraînement
+    de chaque site, puis prédictions batch de chaque site avec son propre champion.
+
+    Les données de chaque site sont chargées, nettoyées, rééchantillonnées et sauvegardées
+    une seule fois, puis transmises en mémoire à l'entraînement et au batch predictor ;
+    le champion du site (modèle tout juste entraîné le plus souvent) est passé tel quel aux prédictions.
+    Avec le cache des étapes, un cycle sans nouvelle donnée relit les données préparées
+    et ignore entraînement et prédictions.
+    Les mesures des quatre étapes du cycle (site 'all') sont enregistrées et exportées
+    comme celles des pipelines.
+    """
+
+    def __init__(self, db_manager: DatabaseManager, fetch: bool = True, strategy: str = 'recursive',
+                 step_cache: StepCache = None):
+        """
+        :param fetch: récupère les nouvelles mesures Open-Meteo avant l'entraînement
+        :param strategy: stratégie du batch predictor ('recursive' ou 'proxy')
+        :param step_cache: cache des étapes (préparation, entraînement, prédictions)
+        """
+        self.db_manager = db_manager
+        self.fetch = fetch
+        self.strategy = strategy
+        self.step_cache = step_cache
+        self.registry = RegistryManager(session=db_manager.session)
+
+    def run(self) -> dict:
+        """
+        :return: dictionnaire location_id -> identifiant du modèle de prédiction ou exception
+        """
+        secure_log = SecureLoggerManager('pipeline_runner').get_logger()
+        secure_log.info("Lancement du cycle complet")
+
+        locations = LocationRepository(self.db_manager.session).get_active()
+        metrics = StageMetrics('runner', 'all')
+        try:
+            if self.fetch:
+                secure_log.info(f"Etape 1 - Récupération des données de l'API pour {len(locations)} site(s)")
+                with metrics.stage('fetch') as stage:
+                    fetched = self.fetchData(locations)
+                    stage['rows'] = sum(rows for rows in fetched.values() if not isinstance(rows, Exception))
+
+            secure_log.info("Etape 2 - Préparation des données")
+            with metrics.stage('prepare') as stage:
+                frames = self.prepareData(locations)
+                stage['rows'] = sum(len(df) for df in frames.values())
+
+            secure_log.info("Etape 3 - Tuning / entraînement")
+            with metrics.stage('train', rows=sum(len(df) for df in frames.values())):
+                trained = self.train(frames)
+
+            secure_log.info("Etape 4 - Prédictions batch")
+            with metrics.stage('predict', rows=sum(not isinstance(xgb, Exception) for xgb in trained.values())):
+                results = self.predict(frames, trained)
+        finally:
+            if self.step_cache is not None:
+                metrics.count_cache('step', self.step_cache.hits, self.step_cache.misses)
+            metrics.publish(self.db_manager.session)
+
+        secure_log.info("Cycle terminé")
+        return results
+
+    def fetchData(self, locations: list[dict]) -> dict:
+        """Nouvelles mesures de chaque site (pool de processus, entrées/sorties réseau uniquement)"""
+        from data.fetch_data import fetch_location
+
+        results = run_by_location(fetch_location, locations)
+        failed = sorted(location_id for location_id, result in results.items() if isinstance(result, Exception))
+        if failed:
+            logging.error(f"Récupération en échec : {', '.join(failed)}")
+        return results
+
+    def prepareData(self, locations: list[dict]) -> dict:
+        """
+        Chargement, nettoyage, rééchantillonnage et sauvegarde des données de chaque site, une seule fois par cycle.
+        :return: dictionnaire location_id -> données transformées
+        """
+        frames = {}
+        for location in locations:
+            location_id = location['location_id']
+            try:
+                data_manager = DataManager(self.db_manager, location_id=location_id, step_cache=self.step_cache)
+                frames[location_id] = data_manager.prepareData()
+            except Exception as e:
+                logging.error(f"Site {location_id} : préparation en échec : {e}")
+        return frames
+
+    def train(self, frames: dict) -> dict:
+        """
+        Tuning / entraînement de chaque site sur ses données préparées ; un site en échec
+        est journalisé sans interrompre les autres.
+        :return: dictionnaire location_id -> gestionnaire du modèle entraîné ou exception
+        """
+        trained = {}
+        for location_id, df in frames.items():
+            try:
+                orchestrator = orchestrator_from_env(self.db_manager, self.registry, self.step_cache, location_id)
+                orchestrator.run(df)
+                trained[location_id] = orchestrator.model_manager
+            except Exception as e:
+                logging.error(f"Site {location_id} : entraînement en échec : {e}")
+                self.db_manager.session.rollback()
+                trained[location_id] = e
+        return trained
+
+    def champion(self, location_id: str, trained: XGBoostManager, run_id: str) -> XGBoostManager:
+        """
+        Gestionnaire de modèle des prédictions d'un site : le modèle tout juste entraîné s'il est
+        champion du site, sinon le champion du site lu dans le registre, à la première prédiction à calculer.
+        :raise RuntimeError: aucun modèle entraîné pour le site
+        """
+        champion = LoggerManager(self.db_manager.session).repository.get_best_model(location_id)
+        if champion is None:
+            raise RuntimeError(f"Aucun modèle entraîné pour le site {location_id}")
+
+        xgb = XGBoostManager(
+            fast_path=trained.fast_path,
+            n_jobs=trained.n_jobs,
+            registry=self.registry,
+            location_id=location_id
+        )
+        xgb.model_id = champion.model_id + '_' + run_id
+        xgb.params = champion.params
+        xgb.champion_id = champion.model_id
+        if trained.model is not None and trained.model_id == champion.model_id:
+            xgb.model = trained.model
+        return xgb
+
+    def predict(self, frames: dict, trained: dict) -> dict:
+        """
+        Prédictions de chaque site entraîné avec son champion, gardé en mémoire s'il vient d'être entraîné.
+        :param trained: dictionnaire location_id -> gestionnaire du modèle entraîné (PipelineRunner.train) ;
+                        un site dont l'entraînement a échoué n'est pas prédit et garde son exception
+        :return: dictionnaire location_id -> identifiant du modèle de prédiction ou exception
+        """
+        latest_prediction_repository = LatestPredictionRepository(self.db_manager.session)
+        if latest_prediction_repository.is_empty():
+            latest_prediction_repository.rebuild_from_history()
+
+        # Un même run_id pour tous les sites : les prédictions d'un run restent regroupées
+        run_id = str(uuid.uuid4())
+        results = {}
+        for location_id, model_manager in trained.items():
+            if isinstance(model_manager, Exception):
+                results[location_id] = model_manager
+                continue
+            try:
+                xgb = self.champion(location_id, model_manager, run_id)
+                PipelineBatchPredictor(
+                    data_manager=DataManager(self.db_manager, location_id=location_id, step_cache=self.step_cache),
+                    model_manager=xgb,
+                    feature_manager=FeatureManager(xgb),
+                    logger_database=LoggerManager(self.db_manager.session),
+                    champion_id=xgb.champion_id,
+                    run_id=run_id,
+                    strategy=self.strategy,
+                    step_cache=self.step_cache
+                ).run(frames[location_id])
+                results[location_id] = xgb.model_id
+            except Exception as e:
+                logging.error(f"Site {location_id} en échec : {e}")
+                self.db_manager.session.rollback()
+                results[location_id] = e
+        return results
+
+
+if __name__ == '__main__':
+    db_manager = DatabaseManager()
+    db_manager.init_connection()
+    db_manager.upgrade_schema()
+
+    try:
+        results = PipelineRunner(
+            db_manager,
+            fetch=os.getenv('RUNNER_FETCH', 'true').lower() in ('1', 'true', 'yes'),
+            strategy=os.getenv('FORECAST_STRATEGY', 'recursive'),
+            step_cache=StepCache.from_env()
+        ).run()
+    finally:
+        db_manager.close()
+
+    failed = sorted(location_id for location_id, result in results.items() if isinstance(result, Exception))
+    if failed:
+        logging.error(f"Sites en échec : {', '.join(failed)}")
+    if not results or len(failed) == len(results):
+        sys.exit(1)
@@ -15,13 +15,14 @@ class DataManagerInterface(ABC):
     """
 
     @abstractmethod
-    def loadData(self) -> pd.DataFrame:
+    def loadData(self, start_date=None, end_date=None) -> pd.DataFrame:
         """
         Méthode abstraite pour le chargement des données.
 
         Notes
         -----
-        Cette méthode doit être implémentée pour charger les données à partir d'une source.
+        Cette méthode doit être implémentée pour charger les données à partir d'une source,
+        éventuellement restreintes à une fenêtre de temps [start_date, end_date].
         """
         pass
 
@@ -58,14 +59,40 @@ class DataManagerInterface(ABC):
         """
         pass
 
+    @abstractmethod
+    def prepareData(self) -> pd.DataFrame:
+        """
+        Méthode abstraite enchaînant chargement, nettoyage, transformation et sauvegarde des données.
+
+        Notes
+        -----
+        Peut relire un résultat précédent lorsque les données n'ont pas changé.
+        """
+        pass
+
     @abstractmethod
     def splitData(self, df: pd.DataFrame) -> (pd.DataFrame, pd.DataFrame):
         pass
 
+    @abstractmethod
+    def futureDates(self, df: pd.DataFrame) -> pd.DatetimeIndex:
+        """
+        Méthode abstraite retournant les dates de la période à prédire, après la dernière date de df.
+        """
+        pass
+
     @abstractmethod
     def loadFutureData(self, df: pd.DataFrame) -> pd.DataFrame:
         pass
 
     @abstractmethod
-    def savePredict(self, predict: pd.DataFrame, model_id: str) -> None:
+    def savePredict(self, predict: pd.DataFrame, model_id: str, champion_id: str = None, run_id: str = None) -> None:
+        """
+        Méthode abstraite pour la sauvegarde des prédictions d'un run batch.
+
+        Notes
+        -----
+        Doit conserver l'historique des prédictions et tenir à jour la dernière
+        prédiction de chaque timestamp (modèle champion et run associés).
+        """
         pass
\ No newline at end of file
@@ -45,7 +45,25 @@ class ModelManagerInterface(ABC):
         pass
 
     @abstractmethod
-    def eval(self, X_test: pd.DataFrame, y_test: pd.DataFrame) -> pd.DataFrame:
+    def trainIncremental(self, X_new: pd.DataFrame, y_new: pd.DataFrame, base_model_id: str, n_rounds: int):
+        """
+        Poursuit l'entraînement d'un modèle existant sur les nouvelles données uniquement.
+
+        Parameters
+        ----------
+        base_model_id : str
+            Identifiant du modèle à poursuivre (champion actuel)
+        n_rounds : int
+            Quantité d'entraînement supplémentaire (ex: tours de boosting)
+
+        Notes
+        -----
+        Les hyperparamètres (self.params) sont ceux du modèle poursuivi ; aucun tuning n'est relancé.
+        """
+        pass
+
+    @abstractmethod
+    def eval(self, X_test: pd.DataFrame, y_test: pd.DataFrame, plot: bool = True) -> pd.DataFrame:
         """
         Évalue les performances du modèle sur un jeu de données de test.
 
@@ -53,6 +71,8 @@ class ModelManagerInterface(ABC):
         ----------
         data : pd.DataFrame
             Données de test pré-traitées avec les features nécessaires
+        plot : bool
+            Enregistre le graphique d'évaluation du modèle (False pour les prédictions batch)
 
         Returns
         -------
@@ -65,6 +85,25 @@ class ModelManagerInterface(ABC):
         """
         pass
 
+    @abstractmethod
+    def forecast(self, y: pd.Series, dates: pd.DatetimeIndex) -> pd.DataFrame:
+        """
+        Prévision récursive : chaque prédiction sert d'entrée aux pas suivants.
+
+        Parameters
+        ----------
+        y : pd.Series
+            Historique de la cible, trié par date
+        dates : pd.DatetimeIndex
+            Dates à prédire, à la suite de l'historique
+
+        Returns
+        -------
+        pd.DataFrame
+            Prédictions (colonnes ds, y)
+        """
+        pass
+
     @abstractmethod
     def save(self) -> pd.DataFrame:
         """
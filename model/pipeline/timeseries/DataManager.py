@@ -2,22 +2,77 @@ import logging
 
 import pandas as pd
 
-from model.helpers.dataset_helper import extract_object_to_dataframe, nan_interpolation_linear
+from model.entity.location import DEFAULT_LOCATION
+from model.helpers.dataset_helper import nan_interpolation_linear
 from model.pipeline.interface.DataManagerInterface import DataManagerInterface
 from model.repository.data_predict_timeseries_repository import DataPredictTimeseriesRepository
 from model.repository.data_process_timeseries_repository import DataProcessTimeSeriesRepository
 from model.repository.data_reel_timeseries_repository import DataReelTimeseriesRepository
+from model.repository.latest_prediction_repository import LatestPredictionRepository
+from model.repository.pipeline_watermark_repository import PipelineWatermarkRepository
 from model.services.database_manager import DatabaseManager
+from model.services.step_cache import StepCache, code_version
 
 
 class DataManager(DataManagerInterface):
 
-    def __init__(self, db_manager: DatabaseManager):
+    # Nom du point de reprise des données transformées (suffixé par le site)
+    PROCESS_WATERMARK = 'data_process_timeseries'
+    RESAMPLE_FREQUENCY = '3h'
+    FORECAST_HORIZON = 120  # nombre de créneaux prédits par le batch
+
+    def __init__(self, db_manager: DatabaseManager, incremental: bool = True, location_id: str = DEFAULT_LOCATION,
+                 step_cache: StepCache = None):
+        """
+        :param incremental: saveData ne réécrit que les créneaux touchés par les nouvelles données brutes
+        :param location_id: site traité (chargement, sauvegarde et prédictions)
+        :param step_cache: cache des étapes ; prepareData relit les données transformées si rien n'a changé
+        """
         self.db_manager = db_manager
-
-    def loadData(self) -> pd.DataFrame:
+        self.incremental = incremental
+        self.location_id = location_id
+        self.step_cache = step_cache
+        self.loaded_until = None  # dernière date brute chargée par loadData
+        self.changes = None  # (plus ancienne mesure modifiée, date de mise à jour du point de reprise) lus par readChanges
+
+    @property
+    def watermark_name(self) -> str:
+        return f"{self.PROCESS_WATERMARK}:{self.location_id}"
+
+    @property
+    def changed_from_name(self) -> str:
+        return f"{DataReelTimeseriesRepository.CHANGED_FROM_WATERMARK}:{self.location_id}"
+
+    def readChanges(self) -> pd.Timestamp | None:
+        """
+        Plus ancienne mesure brute écrite depuis le dernier traitement (point de reprise
+        data_reel_timeseries_changed_from), mémorisée jusqu'à la sauvegarde.
+        Sans ce point de reprise, les mesures postérieures au point de reprise du traitement
+        (écrites sans passer par DataReelTimeseriesRepository).
+        :return: None si aucune mesure n'a changé
+        """
+        session = self.db_manager.session
+        watermark = PipelineWatermarkRepository(session).get(self.changed_from_name)
+        if watermark is not None:
+            self.changes = (pd.Timestamp(watermark.value), watermark.updated_at)
+            return self.changes[0]
+
+        self.changes = (None, None)
+        processed_until = PipelineWatermarkRepository(session).get_value(self.watermark_name)
+        _, last_time = DataReelTimeseriesRepository(session).summary(self.location_id)
+        if processed_until is not None and last_time is not None and last_time > processed_until:
+            self.changes = (pd.Timestamp(processed_until), None)
+        return self.changes[0]
+
+    def loadData(self, start_date=None, end_date=None) -> pd.DataFrame:
+        """
+        Charge les données brutes du site (optionnellement sur une fenêtre de temps),
+        en colonnes typées datetime64 / float32, sans passer par des objets ORM.
+        """
         data_reel_repository = DataReelTimeseriesRepository(self.db_manager.session)
-        return extract_object_to_dataframe(data_reel_repository.getAll(), ['time', 'temperature_2m', 'relative_humidity_2m'])
+        df = data_reel_repository.load_columns(start_date, end_date, location_id=self.location_id)
+        self.loaded_until = df['time'].max() if not df.empty else None
+        return df
 
     def cleanData(self, df: pd.DataFrame) -> pd.DataFrame :
         df = nan_interpolation_linear(df, 'time')
@@ -26,15 +81,121 @@ class DataManager(DataManagerInterface):
     def transformData(self, df: pd.DataFrame) -> pd.DataFrame :
         df = df.rename(columns={'time': 'ds', 'temperature_2m': 'y'})
         df.set_index('ds', inplace=True)
-        df = df.resample('3h').mean()
+        df = df.resample(self.RESAMPLE_FREQUENCY).mean()
         df = df.reset_index()
         return df
 
     def saveData(self, df: pd.DataFrame) -> None:
+        """
+        Sauvegarde les données transformées dans une seule transaction :
+        les lecteurs voient l'ancienne ou la nouvelle version de la table, jamais un état partiel.
+
+        En mode incrémental, seuls les créneaux à partir de celui de la plus ancienne mesure brute
+        modifiée depuis le dernier traitement (readChanges) sont insérés ou mis à jour :
+        df peut ne couvrir que ces créneaux.
+        """
+        session = self.db_manager.session
+        data_process_repository = DataProcessTimeSeriesRepository(session)
+        watermark_repository = PipelineWatermarkRepository(session)
+        watermark = watermark_repository.get_value(self.watermark_name)
+        if self.changes is None:
+            self.readChanges()
+        changed_from, changes_updated_at = self.changes
+
+        try:
+            if self.incremental and watermark is not None:
+                if changed_from is None:
+                    changed = df.iloc[:0]
+                else:
+                    # Chaque créneau est la moyenne des seules mesures qu'il contient
+                    first_bucket = changed_from.floor(self.RESAMPLE_FREQUENCY)
+                    changed = df[df['ds'] >= first_bucket]
+                data_process_repository.upsert_from_dataframe(changed, self.location_id)
+                logging.info(f"Sauvegarde incrémentale : {len(changed)} créneaux depuis {changed_from}")
+            else:
+                data_process_repository.delete_location(self.location_id)
+                data_process_repository.insert_from_dataframe(df, self.location_id, commit=False)
+                logging.info(f"Sauvegarde complète : {len(df)} créneaux")
+
+            if self.loaded_until is not None:
+                watermark_repository.set_value(self.watermark_name, pd.Timestamp(self.loaded_until).to_pydatetime())
+            if changes_updated_at is not None:
+                # Mesures écrites depuis la lecture du point de reprise : retraitées au prochain passage
+                watermark_repository.delete_value(self.changed_from_name, changes_updated_at)
+            session.commit()
+            self.changes = None
+        except Exception:
+            session.rollback()
+            raise
+
+    def fingerprint(self) -> str:
+        """
+        Empreinte des données du site : volume et dernière date des mesures brutes,
+        date de leur dernière écriture, point de reprise du traitement et version du code.
+        """
+        session = self.db_manager.session
+        rows, last_time = DataReelTimeseriesRepository(session).summary(self.location_id)
+        watermark_repository = PipelineWatermarkRepository(session)
+        return StepCache.fingerprint(
+            location_id=self.location_id,
+            rows=rows,
+            last_time=last_time,
+            changed_at=watermark_repository.get_value(
+                f"{DataReelTimeseriesRepository.CHANGE_WATERMARK}:{self.location_id}"),
+            processed_until=watermark_repository.get_value(self.watermark_name),
+            frequency=self.RESAMPLE_FREQUENCY,
+            code=code_version(DataManager, nan_interpolation_linear),
+        )
+
+    def prepareData(self) -> pd.DataFrame:
+        """
+        Chargement, nettoyage, rééchantillonnage et sauvegarde des données du site.
+        Avec un cache des étapes, des données inchangées depuis la dernière préparation
+        sont relues depuis le cache, sans chargement ni sauvegarde.
+        """
+        step = f"prepare_{self.location_id}"
+        if self.step_cache is not None:
+            df = self.step_cache.load(step, self.fingerprint())
+            if df is not None:
+                return df
+
+        processed = PipelineWatermarkRepository(self.db_manager.session).get_value(self.watermark_name)
+        if self.incremental and processed is not None:
+            df = self.prepareIncremental()
+        else:
+            self.readChanges()
+            df = self.loadData()
+            df = self.cleanData(df)
+            df = self.transformData(df)
+            self.saveData(df)
+
+        if self.step_cache is not None:
+            # Empreinte après sauvegarde : le point de reprise du traitement a avancé
+            self.step_cache.save(step, self.fingerprint(), df)
+        return df
+
+    def prepareIncremental(self) -> pd.DataFrame:
+        """
+        Préparation incrémentale : seules les mesures brutes à partir du créneau de la plus ancienne
+        mesure modifiée sont chargées, nettoyées, rééchantillonnées et sauvegardées ; les créneaux
+        antérieurs, inchangés, sont relus depuis data_process_timeseries.
+        Le résultat est identique à une préparation complète.
+        """
+        changed_from = self.readChanges()
         data_process_repository = DataProcessTimeSeriesRepository(self.db_manager.session)
-        data_process_repository.delete_all()
-        data_process_repository.session.commit()
-        data_process_repository.insert_from_dataframe(df)
+        if changed_from is None:
+            logging.info("Aucune mesure modifiée depuis le dernier traitement")
+            self.changes = None
+            return data_process_repository.load_columns(self.location_id)
+
+        first_bucket = changed_from.floor(self.RESAMPLE_FREQUENCY)
+        df = self.transformData(self.cleanData(self.loadData(start_date=first_bucket)))
+        self.saveData(df)
+
+        history = data_process_repository.load_columns(self.location_id, before=first_bucket)
+        if df.empty:
+            return history
+        return pd.concat([history.astype(df.dtypes.to_dict()), df], ignore_index=True)
 
     def splitData(self, df: pd.DataFrame, train_size=0.9) -> (pd.DataFrame, pd.DataFrame):
         train_size = int(len(df) * train_size)
@@ -43,11 +204,17 @@ class DataManager(DataManagerInterface):
         test = df[train_size:]
         return train, test
 
-    def loadFutureData(self, df: pd.DataFrame) -> pd.DataFrame:
-        last_date = df['ds'].max() # Dernière date du dataframe
+    def futureDates(self, df: pd.DataFrame) -> pd.DatetimeIndex:
+        step = pd.Timedelta(self.RESAMPLE_FREQUENCY)
+        return pd.date_range(start=df['ds'].max() + step, periods=self.FORECAST_HORIZON, freq=step)
 
+    def loadFutureData(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Stratégie « proxy » : la cible des créneaux futurs est remplacée par les valeurs
+        observées un an plus tôt, dont sont ensuite tirés les lags.
+        """
         # Génère les dates de la future période et crée le Dataframe
-        dates_futures = pd.date_range(start=last_date + pd.Timedelta(hours=3), periods=120, freq='3h')
+        dates_futures = self.futureDates(df)
         X_future = pd.DataFrame({'ds': dates_futures})
 
         # Calcule les bornes à prédire
@@ -70,7 +237,12 @@ class DataManager(DataManagerInterface):
         logging.info(f"Historical data: {len(temp_last_year)} vs Future: {len(dates_futures)}")
         return X_future
 
-    def savePredict(self, predict: pd.DataFrame, model_id: str) -> None:
+    def savePredict(self, predict: pd.DataFrame, model_id: str, champion_id: str = None, run_id: str = None) -> None:
         data_predict_repository = DataPredictTimeseriesRepository(self.db_manager.session)
-        data_predict_repository.insert_from_dataframe(predict, model_id)
+        data_predict_repository.insert_from_dataframe(predict, model_id, self.location_id)
+
+        # Table compacte lue par l'API : une seule ligne par timestamp
+        latest_prediction_repository = LatestPredictionRepository(self.db_manager.session)
+        latest_prediction_repository.upsert_from_dataframe(predict, champion_id or model_id, run_id or model_id,
+                                                           self.location_id)
 
@@ -1,10 +1,10 @@
 from typing import Any
 
 import pandas as pd
-from feature_engine.timeseries.forecasting import LagFeatures
 
 from model.pipeline.interface import ModelManagerInterface
 from model.pipeline.interface.FeatureManagerInterface import FeatureManagerInterface
+from model.pipeline.timeseries.classes.LagMatrix import LagMatrix
 
 
 class FeatureManager(FeatureManagerInterface):
@@ -33,18 +33,19 @@ class FeatureManager(FeatureManagerInterface):
         return train, test
 
     def lagger(self, train: pd.DataFrame, test: pd.DataFrame, best_n_lags: int) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+        """
+        Construit les lags de la cible pour train et test à partir d'une seule matrice
+        de lags calculée sur la série complète : les lags de test s'appuient sur
+        les dernières valeurs de train.
+        """
+        lag_matrix = LagMatrix(pd.concat([train, test]), best_n_lags)
 
-        lagger = LagFeatures(
-            variables=['y'],
-            periods=list(range(1, best_n_lags + 1)),
-            sort_index=False
-        )
+        train_lagger = lag_matrix.frame(best_n_lags, 0, len(train))[list(train.columns) + lag_matrix.lag_names(best_n_lags)]
 
-        train_lagger = lagger.fit_transform(train).dropna()
-        last_n_lags = train.tail(best_n_lags)
-
-        test_lagger = pd.concat([last_n_lags, test])
-        test_lagger = lagger.transform(test_lagger).iloc[best_n_lags:].dropna()
+        # Comme tail(best_n_lags) + iloc[best_n_lags:] : si train est plus court que
+        # best_n_lags, les premières lignes de test sont écartées
+        context = min(best_n_lags, len(train))
+        test_lagger = lag_matrix.frame(best_n_lags, len(train) + best_n_lags - context)
 
         X_train = train_lagger.drop(columns=['y'])
         y_train = train_lagger['y']
@@ -52,4 +53,4 @@ class FeatureManager(FeatureManagerInterface):
         X_test = test_lagger.drop(columns=['y'])
         y_test = test_lagger['y']
 
-        return X_train, y_train, X_test, y_test
\ No newline at end of file
+        return X_train, y_train, X_test, y_test
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+class LagMatrix:
+    """
+    Matrice des retards (lags) de la cible, construite une seule fois pour `max_lags`
+    à partir d'une vue glissante numpy : la colonne k-1 contient y décalé de k pas.
+
+    Les sous-ensembles utilisés par le tuning (nombre de lags d'un essai, plis de
+    validation croisée) sont des tranches de cette matrice, sans nouveau calcul.
+    Le résultat est identique à celui de feature_engine.LagFeatures suivi de dropna().
+    """
+
+    def __init__(self, df: pd.DataFrame, max_lags: int, target: str = 'y'):
+        """
+        :param df: DataFrame trié par date, contenant la cible et d'éventuelles variables exogènes
+        :param max_lags: nombre maximal de lags disponibles
+        :param target: nom de la colonne cible
+        """
+        self.df = df
+        self.max_lags = max_lags
+        self.target = target
+
+        values = df[target].to_numpy()
+        if not np.issubdtype(values.dtype, np.floating):
+            values = values.astype(np.float64)
+        self.y = values
+
+        # padded[i:i + max_lags] = y[i - max_lags:i] -> colonnes inversées pour avoir lag_1 en premier
+        padded = np.concatenate([np.full(max_lags, np.nan, dtype=values.dtype), values])
+        self.lags = sliding_window_view(padded, max_lags)[:len(values), ::-1]
+
+        self.exogenous = [column for column in df.columns if column != target]
+        self._exogenous_values = df[self.exogenous].to_numpy(dtype=np.float64) if self.exogenous else None
+
+    def lag_names(self, n_lags: int) -> list[str]:
+        return [f"{self.target}_lag_{k}" for k in range(1, n_lags + 1)]
+
+    def _rows(self, n_lags: int, start: int, stop: int):
+        """
+        Lignes conservées après dropna : tranche si aucune valeur manquante (vue),
+        masque booléen sinon.
+        """
+        if n_lags > self.max_lags:
+            raise ValueError(f"n_lags={n_lags} supérieur au maximum construit ({self.max_lags})")
+
+        stop = len(self.y) if stop is None else stop
+        # Les n_lags premières lignes ont toujours au moins un lag manquant
+        start = min(max(start, n_lags), max(stop, start))
+        rows = slice(start, stop)
+
+        missing = np.isnan(self.y[rows]) | np.isnan(self.lags[rows, :n_lags]).any(axis=1)
+        if self._exogenous_values is not None:
+            missing |= np.isnan(self._exogenous_values[rows]).any(axis=1)
+
+        if missing.any():
+            return np.arange(start, stop)[~missing]
+        return rows
+
+    def arrays(self, n_lags: int, start: int = 0, stop: int = None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Matrice de features et cible sur les lignes [start, stop), pour n_lags lags.
+        Sans variable exogène ni valeur manquante, X et y sont des vues de la matrice.
+        :return: (X, y) avec X = [variables exogènes..., y_lag_1..y_lag_n]
+        """
+        rows = self._rows(n_lags, start, stop)
+        lags = self.lags[rows, :n_lags]
+        if self._exogenous_values is not None:
+            lags = np.hstack([self._exogenous_values[rows], lags])
+        return lags, self.y[rows]
+
+    def frame(self, n_lags: int, start: int = 0, stop: int = None) -> pd.DataFrame:
+        """
+        Équivalent DataFrame de LagFeatures(periods=1..n_lags).transform(df).dropna()
+        restreint aux lignes [start, stop).
+        """
+        rows = self._rows(n_lags, start, stop)
+        result = self.df.iloc[rows].copy()
+        lags = pd.DataFrame(self.lags[rows, :n_lags], index=result.index, columns=self.lag_names(n_lags))
+        return pd.concat([result, lags], axis=1)
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import xgboost
+
+
+class RecursiveForecaster:
+    """
+    Prévision récursive multi-pas : chaque prédiction devient le lag 1 du pas suivant.
+
+    Les dernières valeurs de chaque série sont rangées dans un tampon préalloué, de la plus
+    récente à la plus ancienne, et les prédictions sont écrites devant elles : la fenêtre
+    des n_lags derniers points est à chaque pas une vue du tampon (aucun décalage ni copie).
+    Plusieurs séries ou scénarios sont prédits ensemble, en un seul appel
+    inplace_predict par pas : horizon appels au total, quel que soit le nombre de séries.
+    """
+
+    def __init__(self, booster: xgboost.Booster, n_lags: int):
+        """
+        :param booster: booster entraîné sur les seules features y_lag_1..y_lag_n
+        :param n_lags: nombre de lags du modèle
+        """
+        feature_names = getattr(booster, 'feature_names', None)
+        if feature_names is not None and len(feature_names) != n_lags:
+            raise ValueError(f"Le modèle attend {len(feature_names)} features, "
+                             f"la prévision récursive n'utilise que {n_lags} lags")
+        self.booster = booster
+        self.n_lags = n_lags
+
+    def forecast(self, lags: np.ndarray, horizon: int) -> np.ndarray:
+        """
+        :param lags: matrice (séries, n_lags), colonne 0 = valeur la plus récente
+        :param horizon: nombre de pas à prédire
+        :return: matrice (séries, horizon) des prédictions
+        """
+        lags = np.atleast_2d(np.asarray(lags, dtype=np.float32))
+        if lags.shape[1] != self.n_lags:
+            raise ValueError(f"{lags.shape[1]} lags fournis, {self.n_lags} attendus")
+
+        # buffer[:, horizon - step:horizon - step + n_lags] = fenêtre du pas step (lag 1 en premier)
+        buffer = np.empty((len(lags), horizon + self.n_lags), dtype=np.float32)
+        buffer[:, horizon:] = lags
+        for step in range(horizon):
+            position = horizon - step
+            buffer[:, position - 1] = self.booster.inplace_predict(buffer[:, position:position + self.n_lags])
+        return np.ascontiguousarray(buffer[:, :horizon][:, ::-1])
+
+    def last_lags(self, y: pd.Series) -> np.ndarray:
+        """Vecteur de lags (lag 1 en premier) à partir de la fin d'une série"""
+        values = y.to_numpy(dtype=np.float32)[-self.n_lags:]
+        if len(values) < self.n_lags or np.isnan(values).any():
+            raise ValueError(f"Historique insuffisant : {self.n_lags} dernières valeurs complètes attendues")
+        return values[::-1].copy()
@@ -1,92 +1,369 @@
 import datetime
 import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 
 from pathlib import Path
-import joblib
 
 import numpy as np
 import optuna
+from optuna.study import MaxTrialsCallback
+from optuna.trial import TrialState
 import pandas as pd
-from feature_engine.timeseries.forecasting import LagFeatures
 from sklearn.metrics import mean_squared_error
 from sklearn.model_selection import TimeSeriesSplit
+import xgboost as xgb
 from xgboost import XGBRegressor
 
+from model.entity.location import DEFAULT_LOCATION
 from model.helpers.open_meteo_helper import metrics_result
 from model.pipeline.interface.ModelManagerInterface import ModelManagerInterface
+from model.pipeline.timeseries.classes.LagMatrix import LagMatrix
+from model.pipeline.timeseries.classes.RecursiveForecaster import RecursiveForecaster
+from model.services.registry_manager import RegistryManager
 from visualizations.monitoring.monitoring import match_val_predict
 
 optuna.logging.set_verbosity(optuna.logging.WARNING)
 
+class TuningObjective:
+    """
+    Objectif Optuna : MSE moyenne sur les plis TimeSeriesSplit.
+    Classe (et non fonction locale) pour pouvoir être envoyée aux processus de tuning.
+    """
+
+    def __init__(self, train: pd.DataFrame, max_lags: int, n_jobs: int = None, early_stopping_rounds: int = None,
+                 fast_path: bool = True):
+        """
+        :param train: données d'entraînement (colonnes numériques utilisées)
+        :param max_lags: borne haute de n_lags
+        :param n_jobs: nombre de threads XGBoost par essai (None : tous les cœurs)
+        :param early_stopping_rounds: arrêt du boosting si la MSE de validation ne s'améliore plus
+                                      pendant ce nombre de tours (None : n_estimators complet)
+        :param fast_path: API native XGBoost (hist, QuantileDMatrix float32 réutilisées entre
+                          les essais de même n_lags, inplace_predict) au lieu de XGBRegressor
+        """
+        train_numeric = train.select_dtypes(include=['number'])
+
+        # Matrice des lags construite une seule fois : chaque essai et chaque pli en prend une tranche
+        self.lag_matrix = LagMatrix(train_numeric, max_lags)
+        self.folds = [(train_idx[0], train_idx[-1] + 1, val_idx[0], val_idx[-1] + 1)
+                      for train_idx, val_idx in TimeSeriesSplit(n_splits=3).split(train_numeric)]
+        self.max_lags = max_lags
+        self.n_jobs = n_jobs
+        self.early_stopping_rounds = early_stopping_rounds
+        self.fast_path = fast_path
+        self._matrices = {}  # (pli, n_lags) -> QuantileDMatrix train/validation
+
+    def __getstate__(self):
+        # Les DMatrix ne sont pas sérialisables : chaque processus reconstruit son cache
+        state = self.__dict__.copy()
+        state['_matrices'] = {}
+        return state
+
+    def matrices(self, fold: int, n_lags: int):
+        """
+        QuantileDMatrix du pli pour n_lags, construites au premier essai qui en a besoin
+        puis réutilisées par tous les essais de même n_lags.
+        :return: (dtrain, dval, X_val float32, y_val) ou None si le pli est vide
+        """
+        key = (fold, n_lags)
+        if key not in self._matrices:
+            train_start, train_stop, val_start, val_stop = self.folds[fold]
+            X_train, y_train = self.lag_matrix.arrays(n_lags, train_start, train_stop)
+            X_val, y_val = self.lag_matrix.arrays(n_lags, val_start, val_stop)
+            if len(y_train) == 0 or len(y_val) == 0:
+                self._matrices[key] = None
+            else:
+                X_train = np.ascontiguousarray(X_train, dtype=np.float32)
+                X_val = np.ascontiguousarray(X_val, dtype=np.float32)
+                dtrain = xgb.QuantileDMatrix(X_train, y_train, nthread=self.n_jobs or -1)
+                dval = xgb.QuantileDMatrix(X_val, y_val, ref=dtrain, nthread=self.n_jobs or -1)
+                self._matrices[key] = (dtrain, dval, X_val, y_val)
+        return self._matrices[key]
+
+    def fitNative(self, fold: int, n_lags: int, params: dict, n_estimators: int):
+        """
+        Entraîne un pli avec l'API native et renvoie (MSE de validation, tours utiles),
+        ou None si le pli est vide.
+        """
+        matrices = self.matrices(fold, n_lags)
+        if matrices is None:
+            return None
+        dtrain, dval, X_val, y_val = matrices
+
+        booster = xgb.train(
+            params,
+            dtrain,
+            num_boost_round=n_estimators,
+            evals=[(dval, 'validation')] if self.early_stopping_rounds else (),
+            early_stopping_rounds=self.early_stopping_rounds,
+            verbose_eval=False
+        )
+        n_rounds = booster.best_iteration + 1 if self.early_stopping_rounds else n_estimators
+        y_pred = booster.inplace_predict(X_val, iteration_range=(0, n_rounds))
+        return mean_squared_error(y_val, y_pred), n_rounds
+
+    def __call__(self, trial: optuna.Trial) -> float:
+        mse_scores = []
+        trial.set_user_attr('heartbeat', time.time())
+
+        # Paramètres des lag features
+        n_lags = trial.suggest_int('n_lags', 1, self.max_lags)
+
+        # Paramètres XGBoost
+        n_estimators = trial.suggest_int('n_estimators', *XGBoostManager.N_ESTIMATORS_RANGE)
+        max_depth = trial.suggest_int('max_depth', 3, 8)
+        learning_rate = trial.suggest_float('learning_rate', 0.01, 0.3)
+        subsample = trial.suggest_float('subsample', 0.6, 1.0)
+
+        native_params = {
+            'objective': 'reg:squarederror',
+            'tree_method': 'hist',
+            'max_depth': max_depth,
+            'learning_rate': learning_rate,
+            'subsample': subsample,
+            'seed': 42,
+        }
+        if self.n_jobs:
+            native_params['nthread'] = self.n_jobs
+
+        rounds = []
+        for step, (train_start, train_stop, val_start, val_stop) in enumerate(self.folds):
+            if self.fast_path:
+                fitted = self.fitNative(step, n_lags, native_params, n_estimators)
+                if fitted is None:
+                    continue
+                mse, n_rounds = fitted
+                mse_scores.append(mse)
+                rounds.append(n_rounds)
+                self.reportFold(trial, mse_scores, rounds, step)
+                continue
+
+            # Les lags de validation s'appuient sur la fin du pli d'entraînement (plis contigus)
+            X_train, y_train = self.lag_matrix.arrays(n_lags, train_start, train_stop)
+            X_val, y_val = self.lag_matrix.arrays(n_lags, val_start, val_stop)
+
+            if len(y_train) == 0 or len(y_val) == 0:
+                continue
+
+            # Entraînement
+            model = XGBRegressor(
+                n_estimators=n_estimators,
+                max_depth=max_depth,
+                learning_rate=learning_rate,
+                subsample=subsample,
+                random_state=42,
+                n_jobs=self.n_jobs,
+                early_stopping_rounds=self.early_stopping_rounds
+            )
+
+            if self.early_stopping_rounds:
+                model.fit(X_train, y_train, eval_set=[(X_val, y_val)], verbose=False)
+                rounds.append(model.best_iteration + 1)
+            else:
+                model.fit(X_train, y_train)
+                rounds.append(n_estimators)
+
+            # Prédiction (limitée au meilleur tour en cas d'arrêt anticipé)
+            y_pred = model.predict(X_val)
+            mse_scores.append(mean_squared_error(y_val, y_pred))
+            self.reportFold(trial, mse_scores, rounds, step)
+
+        # Nombre de tours de boosting réellement utiles, repris pour l'entraînement final
+        trial.set_user_attr('n_rounds', rounds)
+        if rounds:
+            trial.set_user_attr('best_n_estimators', int(np.ceil(np.mean(rounds))))
+
+        return np.mean(mse_scores)
+
+    @staticmethod
+    def reportFold(trial: optuna.Trial, mse_scores: list, rounds: list, step: int):
+        """
+        Abandon de l'essai s'il est nettement moins bon que les précédents sur ce pli.
+        L'heure du pli est enregistrée (heartbeat) : un essai sans nouvelle trace est celui d'un processus arrêté.
+        """
+        trial.set_user_attr('heartbeat', time.time())
+        trial.report(mse_scores[-1], step)
+        if trial.should_prune():
+            trial.set_user_attr('n_rounds', rounds)
+            raise optuna.TrialPruned()
+
+
+def study_pruner(pruner: str = None) -> optuna.pruners.BasePruner:
+    """
+    Pruner Optuna : 'median' (MedianPruner), 'halving' (SuccessiveHalvingPruner)
+    ou None (aucun abandon d'essai).
+    """
+    if pruner == 'median':
+        return optuna.pruners.MedianPruner(n_startup_trials=5, n_warmup_steps=0)
+    if pruner == 'halving':
+        return optuna.pruners.SuccessiveHalvingPruner()
+    if pruner is None:
+        return optuna.pruners.NopPruner()
+    raise ValueError(f"Pruner inconnu : {pruner}")
+
+
+def study_storage(storage: str):
+    """
+    Stockage Optuna à partir d'une URL RDB (sqlite:///..., postgresql://...)
+    ou d'un chemin de fichier journal (JournalFileStorage, adapté au multi-processus).
+    """
+    if '://' in storage:
+        return optuna.storages.RDBStorage(storage)
+    Path(storage).parent.mkdir(parents=True, exist_ok=True)
+    return optuna.storages.JournalStorage(optuna.storages.journal.JournalFileBackend(storage))
+
+
+def optimize_worker(storage: str, study_name: str, objective: TuningObjective, n_trials: int,
+                    timeout: float = None, pruner: str = None) -> None:
+    """
+    Processus de tuning : recharge l'étude partagée et exécute des essais
+    jusqu'à ce que l'étude atteigne n_trials essais terminés (tous processus confondus).
+    """
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    study = optuna.load_study(study_name=study_name, storage=study_storage(storage), pruner=study_pruner(pruner))
+    study.optimize(
+        objective,
+        timeout=timeout,
+        callbacks=[MaxTrialsCallback(n_trials, states=(TrialState.COMPLETE, TrialState.PRUNED))]
+    )
+
+
 class XGBoostManager(ModelManagerInterface):
 
-    def __init__(self):
+    MAX_LAGS = 10  # borne haute de n_lags explorée par le tuning
+    TUNED_PARAMS = ('n_lags', 'n_estimators', 'max_depth', 'learning_rate', 'subsample')
+    N_ESTIMATORS_RANGE = (50, 300)  # tours de boosting explorés par le tuning
+
+    def __init__(self, n_trials: int = 30, n_workers: int = 1, timeout: float = None,
+                 storage: str = None, study_name: str = None,
+                 pruner: str = 'median', early_stopping_rounds: int = 20,
+                 fast_path: bool = True, n_jobs: int = None, registry: RegistryManager = None,
+                 location_id: str = DEFAULT_LOCATION, grace_period: float = 600):
+        """
+        :param n_trials: nombre total d'essais Optuna
+        :param n_workers: nombre de processus de tuning en parallèle
+        :param timeout: budget de temps du tuning en secondes (None : illimité)
+        :param storage: URL RDB ou fichier journal de l'étude ; par défaut, étude en mémoire
+                        si n_workers == 1, journal dans model/registry/studies sinon
+        :param study_name: nom de l'étude (tune_<site> par défaut) ; une étude interrompue du même nom est reprise,
+                           une étude terminée est recommencée au tuning suivant
+        :param pruner: abandon des essais peu prometteurs après chaque pli ('median', 'halving' ou None)
+        :param early_stopping_rounds: arrêt anticipé XGBoost sur le pli de validation (None : désactivé)
+        :param fast_path: méthode hist, QuantileDMatrix float32 et inplace_predict (False : chemin XGBRegressor historique)
+        :param n_jobs: threads XGBoost (None : tous les cœurs, répartis entre les processus de tuning)
+        :param registry: registre des modèles (par défaut model/registry, sans index en base)
+        :param location_id: site des données d'entraînement
+        :param grace_period: délai (secondes) sans nouveau pli au-delà duquel un essai "en cours"
+                             est considéré comme abandonné par un processus arrêté
+        """
         self.model = None
         self.params = None
-        timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
+        self.warm_start_params = None  # paramètres du champion, essayés en premier par le tuning
+        self.training_window = None  # (première, dernière) date des lignes d'entraînement
+        self.metrics = None  # métriques de la dernière évaluation
+        self.champion_id = None  # modèle chargé par loadBestModel
+        self.registry = registry or RegistryManager()
+        # Microsecondes : les modèles des sites entraînés à la suite dans un même cycle restent distincts
+        timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S%f")
         self.model_id = f"XGBRegressor_{timestamp}"
+        self.n_trials = n_trials
+        self.n_workers = max(1, n_workers)
+        self.timeout = timeout
+        self.pruner = pruner
+        self.early_stopping_rounds = early_stopping_rounds
+        self.fast_path = fast_path
+        self.n_jobs = n_jobs
+        self.location_id = location_id
+        self.grace_period = grace_period
+        self.study_name = study_name or f"tune_{location_id}"
+        self.storage = storage
+        if self.storage is None and (self.n_workers > 1 or study_name):
+            root = Path(__file__).resolve().parents[3]
+            self.storage = str(root / "registry" / "studies" / f"{self.study_name}.log")
 
 
     def tune(self, train: pd.DataFrame):
-        def objective(trial):
-            mse_scores = []
-            tscv = TimeSeriesSplit(n_splits=3)
-
-            # Paramètres des lag features
-            n_lags = trial.suggest_int('n_lags', 1, 10)
-
-            # Paramètres XGBoost
-            n_estimators = trial.suggest_int('n_estimators', 50, 300)
-            max_depth = trial.suggest_int('max_depth', 3, 8)
-            learning_rate = trial.suggest_float('learning_rate', 0.01, 0.3)
-            subsample = trial.suggest_float('subsample', 0.6, 1.0)
-
-            train_numeric = train.select_dtypes(include=['number'])
-
-            for train_idx, val_idx in tscv.split(train_numeric):
-                train_tss = train_numeric.iloc[train_idx].copy()
-                val_tss = train_numeric.iloc[val_idx].copy()
-
-                # Créer les lag features
-                lag_transformer = LagFeatures(
-                    variables=['y'],
-                    periods=list(range(1, n_lags + 1))
-                )
-
-                # Appliquer les transformations
-                train_transformed = lag_transformer.fit_transform(train_tss).dropna()
-                last_n_lags = train_tss.tail(n_lags)
-                val_init = pd.concat([last_n_lags, val_tss])
-
-                val_transformed = lag_transformer.transform(val_init).iloc[n_lags:].dropna()
-
-                if train_transformed.empty or val_transformed.empty:
-                    continue
-
-                X_train = train_transformed.drop(columns=['y'])
-                y_train = train_transformed['y']
-                X_val = val_transformed.drop(columns=['y'])
-                y_val = val_transformed['y']
-
-                # Entraînement
-                model = XGBRegressor(
-                    n_estimators=n_estimators,
-                    max_depth=max_depth,
-                    learning_rate=learning_rate,
-                    subsample=subsample,
-                    random_state=42
-                )
-
-                model.fit(X_train, y_train)
-
-                # Prédiction
-                y_pred = model.predict(X_val)
-                mse_scores.append(mean_squared_error(y_val, y_pred))
-
-            return np.mean(mse_scores)
-
-        self.params = optuna.create_study(direction='minimize')
-        self.params.optimize(objective, n_trials=30, show_progress_bar=True)
+        if self.storage is None:
+            objective = TuningObjective(train, self.MAX_LAGS, n_jobs=self.n_jobs,
+                                        early_stopping_rounds=self.early_stopping_rounds, fast_path=self.fast_path)
+            self.params = optuna.create_study(direction='minimize', pruner=study_pruner(self.pruner))
+            self.enqueueWarmStart(self.params)
+            self.params.optimize(objective, n_trials=self.n_trials, timeout=self.timeout, show_progress_bar=True)
+            return
+
+        # Threads XGBoost répartis entre les processus pour ne pas sursouscrire les cœurs
+        n_jobs = self.n_jobs or max(1, (os.cpu_count() or 1) // self.n_workers)
+        objective = TuningObjective(train, self.MAX_LAGS, n_jobs=n_jobs,
+                                    early_stopping_rounds=self.early_stopping_rounds, fast_path=self.fast_path)
+
+        storage = study_storage(self.storage)
+        study = self.createStudy(storage)
+        if study.user_attrs.get('completed'):
+            # Étude d'un tuning précédent, allé à son terme : nouveau tuning sur les données actuelles
+            optuna.delete_study(study_name=self.study_name, storage=storage)
+            study = self.createStudy(storage)
+        self.enqueueWarmStart(study)
+        self.failStaleTrials(study, storage)
+
+        done = len(study.get_trials(deepcopy=False, states=(TrialState.COMPLETE, TrialState.PRUNED)))
+        logging.info(f"Tuning '{self.study_name}' : {done}/{self.n_trials} essais déjà terminés, "
+                     f"{self.n_workers} processus x {n_jobs} threads")
+
+        if self.n_workers == 1:
+            optimize_worker(self.storage, self.study_name, objective, self.n_trials, self.timeout, self.pruner)
+        else:
+            with ProcessPoolExecutor(max_workers=self.n_workers) as executor:
+                futures = [
+                    executor.submit(optimize_worker, self.storage, self.study_name, objective,
+                                    self.n_trials, self.timeout, self.pruner)
+                    for _ in range(self.n_workers)
+                ]
+                for future in futures:
+                    future.result()
+
+        self.params = optuna.load_study(study_name=self.study_name, storage=storage, pruner=study_pruner(self.pruner))
+        self.params.set_user_attr('completed', True)
+
+    def createStudy(self, storage) -> optuna.Study:
+        """Crée l'étude persistée, ou la charge si elle existe (reprise après interruption)"""
+        return optuna.create_study(
+            study_name=self.study_name,
+            storage=storage,
+            direction='minimize',
+            pruner=study_pruner(self.pruner),
+            load_if_exists=True
+        )
+
+    def failStaleTrials(self, study: optuna.Study, storage):
+        """
+        Passe en échec les essais "en cours" sans nouveau pli depuis grace_period secondes : leur processus
+        s'est arrêté et ils ne se termineront jamais. Les essais des autres processus actifs sur l'étude
+        (autres workers, autre runner sur le même journal) sont conservés.
+        """
+        now = time.time()
+        for trial in study.get_trials(deepcopy=False, states=(TrialState.RUNNING,)):
+            heartbeat = trial.user_attrs.get('heartbeat', trial.datetime_start.timestamp())
+            if now - heartbeat <= self.grace_period:
+                continue
+            try:
+                storage.set_trial_state_values(trial._trial_id, TrialState.FAIL)
+            except optuna.exceptions.UpdateFinishedTrialError:
+                pass  # terminé entre-temps par son processus
+
+    def enqueueWarmStart(self, study: optuna.Study):
+        """
+        Premier essai de l'étude : les hyperparamètres du champion actuel. Les tours d'un champion
+        poursuivi en incrémental sont ramenés dans l'intervalle du tuning (remise à zéro du booster).
+        """
+        if not self.warm_start_params:
+            return
+        params = {name: value for name, value in self.warm_start_params.items() if name in self.TUNED_PARAMS}
+        if 'n_estimators' in params:
+            low, high = self.N_ESTIMATORS_RANGE
+            params['n_estimators'] = min(max(params['n_estimators'], low), high)
+        study.enqueue_trial(params, skip_if_exists=True)
 
     def train(self, X_train: pd.DataFrame, y_train: pd.DataFrame):
 
@@ -94,36 +371,97 @@ class XGBoostManager(ModelManagerInterface):
         params = dict(best_params)
         params.pop('n_lags', None)
 
-        self.model = XGBRegressor(**params, random_state=42)
-        self.model.fit(X_train, y_train)
-
-    def eval(self, X_test: pd.DataFrame, y_test: pd.DataFrame):
-        root = Path(__file__).resolve().parents[4]  # racine du projet
-        img_path = root / "monitoring" / "output" / f"{self.model_id}.png"
-
+        # Arrêt anticipé pendant le tuning : on réentraîne avec le nombre de tours réellement utile
+        params['n_estimators'] = self.params.best_trial.user_attrs.get('best_n_estimators', params['n_estimators'])
+
+        self.model = XGBRegressor(**params, **self.regressorOptions())
+        self.model.fit(self.features(X_train), y_train)
+        self.training_window = (X_train.index.min(), X_train.index.max())
+
+    def regressorOptions(self) -> dict:
+        """Options communes des XGBRegressor entraînés (threads, méthode d'arbre)"""
+        options = {'random_state': 42, 'n_jobs': self.n_jobs}
+        if self.fast_path:
+            options['tree_method'] = 'hist'
+        return options
+
+    def features(self, X: pd.DataFrame) -> pd.DataFrame:
+        """Features en float32 sur le chemin rapide (format interne d'XGBoost)"""
+        return X.astype(np.float32) if self.fast_path else X
+
+    def trainIncremental(self, X_new: pd.DataFrame, y_new: pd.DataFrame, base_model_id: str, n_rounds: int):
+        """
+        Poursuit le boosting du modèle base_model_id sur les nouvelles lignes uniquement
+        (continuation XGBoost via xgb_model), sans nouveau tuning.
+        :param X_new: features des lignes arrivées depuis le dernier entraînement
+        :param y_new: cible correspondante
+        :param base_model_id: identifiant du modèle à poursuivre (registre)
+        :param n_rounds: nombre de tours de boosting ajoutés
+        """
+        self.loadModel(base_model_id)
+        base = self.model
+
+        params = {name: value for name, value in self.params.items()
+                  if name in ('max_depth', 'learning_rate', 'subsample')}
+        self.model = XGBRegressor(**params, n_estimators=n_rounds, **self.regressorOptions())
+        self.model.fit(self.features(X_new), y_new, xgb_model=base.get_booster())
+        self.training_window = (X_new.index.min(), X_new.index.max())
+
+        # Paramètres journalisés : nombre total de tours du booster poursuivi
+        self.params = dict(self.params, n_estimators=self.model.get_booster().num_boosted_rounds())
+
+    def eval(self, X_test: pd.DataFrame, y_test: pd.DataFrame, plot: bool = True):
+        """
+        :param plot: enregistre le graphique réel / prédit dans monitoring/output/<model_id>.png
+                     (évaluation d'un modèle entraîné ; inutile pour les prédictions batch)
+        """
         predict = self.predict(X_test)
 
-        match_val_predict(predict['y'].values, y_test, 'XGBRegressor').savefig(img_path)
+        if plot:
+            root = Path(__file__).resolve().parents[4]  # racine du projet
+            img_path = root / "monitoring" / "output" / f"{self.model_id}.png"
+            match_val_predict(predict['y'].values, y_test, 'XGBRegressor').savefig(img_path)
 
-        return metrics_result(predict['y'].values, y_test), predict
+        self.metrics = metrics_result(predict['y'].values, y_test)
+        return self.metrics, predict
 
     def predict(self, predict: pd.DataFrame):
 
         dates = predict.index.copy()
-        p = self.model.predict(predict)
+        if self.fast_path:
+            # Prédiction directe sur le booster, sans DMatrix intermédiaire
+            p = self.model.get_booster().inplace_predict(self.features(predict))
+        else:
+            p = self.model.predict(predict)
         return pd.DataFrame({'ds': dates, 'y': p})
 
+    def forecast(self, y: pd.Series, dates: pd.DatetimeIndex) -> pd.DataFrame:
+        """
+        Prévision récursive des dates à partir des dernières valeurs de y :
+        les prédictions alimentent les lags des pas suivants.
+        """
+        booster = self.model.get_booster()
+        forecaster = RecursiveForecaster(booster, booster.num_features())
+        p = forecaster.forecast(forecaster.last_lags(y), len(dates))[0]
+        return pd.DataFrame({'ds': dates, 'y': p})
 
     def save(self):
-        root = Path(__file__).resolve().parents[3]
-        registry = root / "registry" / f"{self.model_id}.joblib"
-
-        joblib.dump(self.model, registry)
-        logging.info(f"Modèle sauvegardé : {registry}")
-
+        params = self.params.best_params if isinstance(self.params, optuna.Study) else dict(self.params or {})
+        trained_from, trained_until = self.training_window or (None, None)
+        self.registry.save(self.model, self.model_id, {
+            'n_lags': params.get('n_lags'),
+            'params': params,
+            'trained_from': trained_from,
+            'trained_until': trained_until,
+            'metrics': self.metrics,
+        }, location_id=self.location_id)
+
+    def loadModel(self, model_id: str):
+        self.model = self.registry.load(model_id)
 
     def loadBestModel(self):
-        root = Path(__file__).resolve().parents[3]
-        model_id = self.model_id.split('_')
-        registry = root / "registry" / f"{model_id[0]}_{model_id[1]}.joblib"
-        self.model = joblib.load(registry)
\ No newline at end of file
+        if self.champion_id is None:
+            # Convention historique : model_id = <champion>_<run_id>
+            model_id = self.model_id.split('_')
+            self.champion_id = f"{model_id[0]}_{model_id[1]}"
+        self.loadModel(self.champion_id)
\ No newline at end of file
@@ -0,0 +1,32 @@
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+class AsyncBaseRepository:
+    """Équivalent asynchrone de BaseRepository, utilisé par l'API (AsyncSession)."""
+
+    def __init__(self, session: AsyncSession, model):
+        self.session = session
+        self.model = model
+
+    async def get(self, id):
+        return await self.session.get(self.model, id)
+
+    async def getAll(self):
+        result = await self.session.execute(select(self.model))
+        return result.scalars().all()
+
+    def add(self, entity):
+        self.session.add(entity)
+
+    async def update(self, entity):
+        await self.session.merge(entity)
+
+    async def delete(self, entity):
+        await self.session.delete(entity)
+
+    async def delete_all(self):
+        await self.session.execute(delete(self.model))
+
+    async def filter(self, **kwargs):
+        result = await self.session.execute(select(self.model).filter_by(**kwargs))
+        return result.scalars().all()
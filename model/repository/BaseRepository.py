@@ -1,6 +1,15 @@
+import io
+import os
+
+import numpy as np
+import pandas as pd
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
 
 class BaseRepository:
+    # Nombre de lignes écrites par lot lors des insertions en masse
+    bulk_chunk_size = int(os.getenv("DB_BULK_CHUNK_SIZE", "50000"))
+
     def __init__(self, session: Session, model):
         self.session = session
         self.model = model
@@ -28,3 +37,154 @@ class BaseRepository:
 
     def get_last_row(self):
         return self.session.query(self.model).order_by(self.model.time.desc()).first()
+
+    def upsert(self, data: list[dict], index_elements: list[str], update_columns: list[str] = None):
+        """
+        INSERT ... ON CONFLICT DO UPDATE (PostgreSQL et SQLite), sans commit.
+        :param data: liste de dictionnaires à écrire
+        :param index_elements: colonnes de la contrainte d'unicité
+        :param update_columns: colonnes mises à jour en cas de conflit (toutes les autres par défaut),
+                               liste vide pour ON CONFLICT DO NOTHING
+        """
+        if not data:
+            return
+        dialect = self.session.get_bind().dialect.name
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+
+        stmt = insert(self.model.__table__)
+        if update_columns is None:
+            update_columns = [c for c in data[0].keys() if c not in index_elements]
+
+        if update_columns:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=index_elements,
+                set_={column: stmt.excluded[column] for column in update_columns}
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=index_elements)
+
+        self.session.execute(stmt, data)
+
+    def upsert_dataframe(self, df: pd.DataFrame, columns: dict, index_elements: list[str],
+                         chunk_size: int = None, constants: dict = None, update_columns: list[str] = None) -> int:
+        """
+        Upsert en masse d'un DataFrame par lots (ON CONFLICT sur index_elements), sans commit.
+        PostgreSQL : COPY dans une table temporaire puis INSERT ... SELECT ... ON CONFLICT ;
+        SQLite : executemany d'un INSERT ... ON CONFLICT.
+        Une ligne déjà présente avec les mêmes valeurs n'est pas réécrite : rejouer un lot ne coûte qu'une lecture d'index.
+        :param columns: correspondance colonne du DataFrame -> colonne de la table
+        :param constants: valeurs identiques pour toutes les lignes (ex: location_id)
+        :param update_columns: colonnes mises à jour en cas de conflit (toutes les autres par défaut),
+                               liste vide pour ON CONFLICT DO NOTHING
+        :return: nombre de lignes insérées ou modifiées
+        """
+        chunk_size = chunk_size or self.bulk_chunk_size
+        frame = df[list(columns.keys())].rename(columns=columns).assign(**(constants or {}))
+        # Une clé en double dans un même INSERT ... ON CONFLICT DO UPDATE est refusée par PostgreSQL
+        frame = frame.drop_duplicates(index_elements, keep='last')
+        if frame.empty:
+            return 0
+
+        dialect = self.session.get_bind().dialect.name
+        conflict = self._conflict_clause(list(frame.columns), index_elements, update_columns, dialect)
+        if dialect != "postgresql":
+            return sum(self._executemany_chunk(frame.iloc[start:start + chunk_size], conflict)
+                       for start in range(0, len(frame), chunk_size))
+
+        table = self.model.__table__.name
+        staging = f"{table}_staging"
+        column_list = ", ".join(frame.columns)
+        written = 0
+        cursor = self.session.connection().connection.dbapi_connection.cursor()
+        try:
+            cursor.execute(f"CREATE TEMP TABLE {staging} ON COMMIT DROP AS "
+                           f"SELECT {column_list} FROM {table} WITH NO DATA")
+            for start in range(0, len(frame), chunk_size):
+                self._copy_chunk(frame.iloc[start:start + chunk_size], staging)
+                cursor.execute(f"INSERT INTO {table} ({column_list}) SELECT {column_list} FROM {staging} {conflict}")
+                written += cursor.rowcount
+                cursor.execute(f"TRUNCATE {staging}")
+            cursor.execute(f"DROP TABLE {staging}")
+        finally:
+            cursor.close()
+        return written
+
+    def _conflict_clause(self, columns: list[str], index_elements: list[str], update_columns: list[str],
+                         dialect: str) -> str:
+        """Clause ON CONFLICT : mise à jour des seules lignes dont une valeur change"""
+        target = ", ".join(index_elements)
+        if update_columns is None:
+            update_columns = [column for column in columns if column not in index_elements]
+        if not update_columns:
+            return f"ON CONFLICT ({target}) DO NOTHING"
+
+        table = self.model.__table__.name
+        distinct = "IS DISTINCT FROM" if dialect == "postgresql" else "IS NOT"
+        assignments = ", ".join(f"{column} = excluded.{column}" for column in update_columns)
+        changed = " OR ".join(f"{table}.{column} {distinct} excluded.{column}" for column in update_columns)
+        return f"ON CONFLICT ({target}) DO UPDATE SET {assignments} WHERE {changed}"
+
+    def bulk_insert(self, df: pd.DataFrame, columns: dict, constants: dict = None, chunk_size: int = None,
+                    commit: bool = True):
+        """
+        Insertion en masse d'un DataFrame, par lots de chunk_size lignes, dans une seule transaction.
+        PostgreSQL : COPY FROM STDIN ; autres bases (SQLite) : executemany du driver.
+        :param df: données à insérer
+        :param columns: correspondance colonne du DataFrame -> colonne de la table
+        :param constants: valeurs identiques pour toutes les lignes (ex: model_id)
+        :param chunk_size: taille des lots (DB_BULK_CHUNK_SIZE par défaut)
+        :param commit: valide la transaction à la fin
+        """
+        chunk_size = chunk_size or self.bulk_chunk_size
+        constants = constants or {}
+        dialect = self.session.get_bind().dialect.name
+        write_chunk = self._copy_chunk if dialect == "postgresql" else self._executemany_chunk
+
+        for start in range(0, len(df), chunk_size):
+            frame = df.iloc[start:start + chunk_size][list(columns.keys())].rename(columns=columns)
+            write_chunk(frame.assign(**constants))
+
+        if commit:
+            self.session.commit()
+
+    def _executemany_chunk(self, frame: pd.DataFrame, conflict: str = "") -> int:
+        """
+        Écrit un lot via executemany sur la connexion de la session (SQLite).
+        :param conflict: clause ON CONFLICT éventuelle
+        :return: nombre de lignes insérées ou modifiées
+        """
+        values = []
+        for column in frame.columns:
+            series = frame[column]
+            if pd.api.types.is_datetime64_any_dtype(series):
+                # Même format de stockage que le type DateTime de SQLAlchemy pour SQLite
+                iso = np.datetime_as_string(series.to_numpy(dtype='datetime64[us]'), unit='us').tolist()
+                values.append([None if value == 'NaT' else value.replace('T', ' ') for value in iso])
+            else:
+                values.append(series.tolist())
+
+        table = self.model.__table__.name
+        placeholders = ", ".join("?" for _ in frame.columns)
+        cursor = self.session.connection().connection.dbapi_connection.cursor()
+        try:
+            cursor.executemany(
+                f"INSERT INTO {table} ({', '.join(frame.columns)}) VALUES ({placeholders}) {conflict}".rstrip(),
+                list(zip(*values))
+            )
+            return cursor.rowcount
+        finally:
+            cursor.close()
+
+    def _copy_chunk(self, frame: pd.DataFrame, table: str = None):
+        """Écrit un lot via COPY FROM STDIN (format CSV) sur la connexion de la session (PostgreSQL)."""
+        buffer = io.StringIO()
+        frame.to_csv(buffer, header=False, index=False, date_format="%Y-%m-%d %H:%M:%S.%f")
+        buffer.seek(0)
+
+        table = table or self.model.__table__.name
+        column_list = ", ".join(frame.columns)
+        cursor = self.session.connection().connection.dbapi_connection.cursor()
+        try:
+            cursor.copy_expert(f"COPY {table} ({column_list}) FROM STDIN WITH (FORMAT csv)", buffer)
+        finally:
+            cursor.close()
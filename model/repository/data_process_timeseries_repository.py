@@ -1,7 +1,13 @@
-from sqlalchemy import insert
+import numpy as np
+import pandas as pd
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from model.entity.data_process_timeseries import DataProcessTimeseries
+from model.entity.latest_prediction import LatestPrediction
+from model.entity.location import DEFAULT_LOCATION
+from model.repository.AsyncBaseRepository import AsyncBaseRepository
 from model.repository.BaseRepository import BaseRepository
 
 class DataProcessTimeSeriesRepository(BaseRepository):
@@ -9,18 +15,87 @@ class DataProcessTimeSeriesRepository(BaseRepository):
     def __init__(self, session: Session):
         super().__init__(session, DataProcessTimeseries)
 
-    def insert_from_dataframe(self, df):
-        """Version optimisée avec SQLAlchemy Core"""
-        data = [
-            {
-                "ds": row['ds'],
-                "y": row['y'],
-                "relative_humidity_2m": row['relative_humidity_2m'],
-            }
-            for _, row in df.iterrows()
-        ]
-
-        stmt = insert(DataProcessTimeseries.__table__)
-
-        self.session.execute(stmt, data)
-        self.session.commit()
\ No newline at end of file
+    columns = {'ds': 'ds', 'y': 'y', 'relative_humidity_2m': 'relative_humidity_2m'}
+
+    def insert_from_dataframe(self, df, location_id: str = DEFAULT_LOCATION, commit=True):
+        """Insertion en masse (COPY / executemany par lots) des créneaux d'un site"""
+        self.bulk_insert(df, self.columns, constants={'location_id': location_id}, commit=commit)
+
+    def upsert_from_dataframe(self, df, location_id: str = DEFAULT_LOCATION) -> int:
+        """Insère ou met à jour les créneaux d'un site (ON CONFLICT sur (location_id, ds)), sans commit"""
+        return self.upsert_dataframe(df, self.columns, index_elements=['location_id', 'ds'],
+                                     constants={'location_id': location_id})
+
+    def load_columns(self, location_id: str = DEFAULT_LOCATION, before=None) -> pd.DataFrame:
+        """
+        Créneaux enregistrés d'un site, sans objets ORM.
+        :param before: date de fin (exclue), optionnelle
+        :return: DataFrame (ds, y, relative_humidity_2m) trié par date
+        """
+        conditions = [self.model.location_id == location_id]
+        if before is not None:
+            conditions.append(self.model.ds < before)
+        stmt = (
+            select(self.model.ds, self.model.y, self.model.relative_humidity_2m)
+            .where(*conditions)
+            .order_by(self.model.ds)
+        )
+        rows = self.session.execute(stmt).all()
+        # float32 comme les créneaux calculés par DataManager (valeurs stockées issues de float32)
+        return pd.DataFrame(rows, columns=list(self.columns)).astype({'ds': 'datetime64[ns]', 'y': np.float32,
+                                                                      'relative_humidity_2m': np.float32})
+
+    def delete_location(self, location_id: str):
+        """Supprime les créneaux d'un site, sans commit"""
+        self.session.query(self.model).filter(self.model.location_id == location_id).delete()
+
+
+class AsyncDataProcessTimeSeriesRepository(AsyncBaseRepository):
+
+    def __init__(self, session: AsyncSession):
+        super().__init__(session, DataProcessTimeseries)
+
+    async def get_combined_between_dates(self, start_date, end_date, location_id: str = DEFAULT_LOCATION):
+        """
+        Récupère en une seule requête les données observées d'un site sur la période, alignées
+        avec la dernière prédiction de chaque timestamp (LEFT JOIN sur latest_prediction).
+        :param start_date: datetime, date de début
+        :param end_date: datetime, date de fin
+        :param location_id: site
+        :return: Liste de lignes (ds, y, y_pred), y_pred valant None sans prédiction
+        """
+        stmt = (
+            select(
+                DataProcessTimeseries.ds,
+                DataProcessTimeseries.y,
+                LatestPrediction.y.label("y_pred")
+            )
+            .outerjoin(LatestPrediction, and_(
+                LatestPrediction.location_id == DataProcessTimeseries.location_id,
+                LatestPrediction.ds == DataProcessTimeseries.ds
+            ))
+            .where(
+                DataProcessTimeseries.location_id == location_id,
+                DataProcessTimeseries.ds >= start_date,
+                DataProcessTimeseries.ds <= end_date
+            )
+            .order_by(DataProcessTimeseries.ds)
+        )
+        result = await self.session.execute(stmt)
+        return result.all()
+
+    async def get_last_values(self, count: int, location_id: str = DEFAULT_LOCATION):
+        """
+        Récupère les count dernières valeurs transformées d'un site, de la plus récente à la plus ancienne.
+        :param count: nombre de lignes
+        :param location_id: site
+        :return: Liste de lignes (ds, y)
+        """
+        stmt = (
+            select(DataProcessTimeseries.ds, DataProcessTimeseries.y)
+            .where(DataProcessTimeseries.location_id == location_id)
+            .order_by(DataProcessTimeseries.ds.desc())
+            .limit(count)
+        )
+        result = await self.session.execute(stmt)
+        return result.all()
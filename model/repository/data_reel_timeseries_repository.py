@@ -1,29 +1,67 @@
-from sqlalchemy import insert, and_
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import and_, select, func, type_coerce, String
 from sqlalchemy.orm import Session
 
 from model.entity.data_reel_timeseries import DataReelTimeseries
+from model.entity.location import DEFAULT_LOCATION
 from model.repository.BaseRepository import BaseRepository
+from model.repository.pipeline_watermark_repository import PipelineWatermarkRepository
 
 class DataReelTimeseriesRepository(BaseRepository):
 
     def __init__(self, session: Session):
         super().__init__(session, DataReelTimeseries)
 
-    def insert_from_dataframe(self, df):
-        """Version optimisée avec SQLAlchemy Core"""
-        data = [
-            {
-                "time": row['time'],
-                "temperature_2m": row['temperature_2m'],
-                "relative_humidity_2m": row['relative_humidity_2m']
-            }
-            for _, row in df.iterrows()
-        ]
+    columns = {'time': 'time', 'temperature_2m': 'temperature_2m', 'relative_humidity_2m': 'relative_humidity_2m'}
+
+    # Point de reprise daté de la dernière écriture des mesures d'un site (suffixé par le site)
+    CHANGE_WATERMARK = 'data_reel_timeseries'
+    # Plus ancienne mesure écrite depuis le dernier traitement du site (suffixé par le site)
+    CHANGED_FROM_WATERMARK = 'data_reel_timeseries_changed_from'
+
+    def insert_from_dataframe(self, df, location_id: str = DEFAULT_LOCATION):
+        """Insertion en masse (COPY / executemany par lots) des mesures d'un site"""
+        self.mark_changed(df, location_id)
+        self.bulk_insert(df, self.columns, constants={'location_id': location_id})
+
+    def upsert_from_dataframe(self, df, location_id: str = DEFAULT_LOCATION) -> int:
+        """Insère ou met à jour les mesures d'un site (ON CONFLICT sur (location_id, time)), sans commit"""
+        written = self.upsert_dataframe(df, self.columns, index_elements=['location_id', 'time'],
+                                        constants={'location_id': location_id})
+        if written:
+            self.mark_changed(df, location_id)
+        return written
+
+    def mark_changed(self, df, location_id: str):
+        """
+        Date la dernière écriture des mesures du site (invalide les étapes mises en cache) et recule le point
+        de reprise des mesures modifiées jusqu'à la plus ancienne date écrite, sans commit : les mesures
+        arrivées dans le désordre ou corrigées sous le point de reprise du traitement sont retraitées.
+        """
+        if df.empty:
+            return
+        watermark_repository = PipelineWatermarkRepository(self.session)
+        watermark_repository.set_value(f"{self.CHANGE_WATERMARK}:{location_id}", datetime.now())
+        watermark_repository.move_back(f"{self.CHANGED_FROM_WATERMARK}:{location_id}",
+                                       pd.Timestamp(df['time'].min()).to_pydatetime())
 
-        stmt = insert(DataReelTimeseries.__table__)
+    def get_last_row(self, location_id: str = DEFAULT_LOCATION):
+        """Dernière mesure enregistrée pour un site (parcours de l'index (location_id, time))"""
+        return (
+            self.session.query(self.model)
+            .filter(self.model.location_id == location_id)
+            .order_by(self.model.time.desc())
+            .first()
+        )
 
-        self.session.execute(stmt, data)
-        self.session.commit()
+    def summary(self, location_id: str = DEFAULT_LOCATION) -> tuple:
+        """Nombre de mesures et dernière date d'un site (lecture de l'index (location_id, time))"""
+        return self.session.execute(
+            select(func.count(), func.max(self.model.time)).where(self.model.location_id == location_id)
+        ).one()
 
     def get_between_dates(self, start_date, end_date):
         """
@@ -40,3 +78,61 @@ class DataReelTimeseriesRepository(BaseRepository):
             ))
             .all()
         )
+
+    def load_columns(self, start_date=None, end_date=None, chunk_size: int = None,
+                     location_id: str = None) -> pd.DataFrame:
+        """
+        Charge les colonnes utiles sans matérialiser d'objets ORM : les lignes sont lues
+        par lots (curseur côté serveur sur PostgreSQL) et copiées directement dans des
+        tableaux numpy préalloués (datetime64 / float32).
+        :param start_date: datetime, date de début (incluse), optionnelle
+        :param end_date: datetime, date de fin (incluse), optionnelle
+        :param chunk_size: nombre de lignes lues par lot
+        :param location_id: site à charger (tous les sites si None)
+        :return: DataFrame (time, temperature_2m, relative_humidity_2m) trié par date
+        """
+        chunk_size = chunk_size or self.bulk_chunk_size
+        conditions = []
+        if location_id is not None:
+            conditions.append(self.model.location_id == location_id)
+        if start_date is not None:
+            conditions.append(self.model.time >= start_date)
+        if end_date is not None:
+            conditions.append(self.model.time <= end_date)
+
+        size = self.session.execute(select(func.count()).select_from(self.model).where(*conditions)).scalar_one()
+        time = np.empty(size, dtype='datetime64[ns]')
+        temperature = np.empty(size, dtype=np.float32)
+        humidity = np.empty(size, dtype=np.float32)
+
+        # SQLite stocke les dates en texte : on récupère la chaîne brute et numpy la convertit
+        # par lot, au lieu d'un objet datetime analysé ligne par ligne par SQLAlchemy
+        time_column = self.model.time
+        if self.session.get_bind().dialect.name == 'sqlite':
+            time_column = type_coerce(time_column, String)
+
+        stmt = (
+            select(time_column, self.model.temperature_2m, self.model.relative_humidity_2m)
+            .where(*conditions)
+            .order_by(self.model.time)
+            .execution_options(yield_per=chunk_size)
+        )
+
+        filled = 0
+        # Exécution Core sur la connexion de la session : pas de couche ORM par ligne
+        for rows in self.session.connection().execute(stmt).partitions():
+            end = filled + len(rows)
+            if end > len(time):
+                # Lignes insérées entre le comptage et la lecture
+                time, temperature, humidity = (np.resize(array, end) for array in (time, temperature, humidity))
+            chunk_time, chunk_temperature, chunk_humidity = zip(*rows)
+            time[filled:end] = np.array(chunk_time, dtype='datetime64[ns]')
+            temperature[filled:end] = np.array(chunk_temperature, dtype=np.float64)
+            humidity[filled:end] = np.array(chunk_humidity, dtype=np.float64)
+            filled = end
+
+        return pd.DataFrame({
+            'time': time[:filled],
+            'temperature_2m': temperature[:filled],
+            'relative_humidity_2m': humidity[:filled],
+        })
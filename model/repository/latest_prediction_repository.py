@@ -0,0 +1,99 @@
+from datetime import datetime
+
+import pandas as pd
+from sqlalchemy import select, func, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from model.entity.data_predict_timeseries import DataPredictTimeseries
+from model.entity.latest_prediction import LatestPrediction
+from model.entity.location import DEFAULT_LOCATION
+from model.repository.AsyncBaseRepository import AsyncBaseRepository
+from model.repository.BaseRepository import BaseRepository
+
+class LatestPredictionRepository(BaseRepository):
+
+    def __init__(self, session: Session):
+        super().__init__(session, LatestPrediction)
+
+    def upsert_from_dataframe(self, df: pd.DataFrame, model_id: str, run_id: str, location_id: str = DEFAULT_LOCATION):
+        """Remplace, timestamp par timestamp, la dernière prédiction connue du site par celle du run."""
+        now = datetime.now()
+        data = [
+            {
+                "location_id": location_id,
+                "ds": ds,
+                "y": y,
+                "model_id": model_id,
+                "run_id": run_id,
+                "updated_at": now,
+            }
+            for ds, y in zip(pd.to_datetime(df['ds']).tolist(), df['y'].astype(float).tolist())
+        ]
+
+        self.upsert(data, index_elements=['location_id', 'ds'])
+        self.session.commit()
+
+    def is_empty(self) -> bool:
+        return self.session.execute(select(LatestPrediction.ds).limit(1)).first() is None
+
+    def rebuild_from_history(self):
+        """
+        Reconstruit la table depuis l'historique data_predict_timeseries
+        (prédiction la plus récente de chaque site et timestamp). Utile au premier déploiement.
+        """
+        ranked_pred = (
+            select(
+                DataPredictTimeseries.location_id,
+                DataPredictTimeseries.ds,
+                DataPredictTimeseries.y,
+                DataPredictTimeseries.model_id,
+                func.row_number().over(
+                    partition_by=(DataPredictTimeseries.location_id, DataPredictTimeseries.ds),
+                    order_by=(DataPredictTimeseries.created_at.desc(), DataPredictTimeseries.id.desc())
+                ).label("rank")
+            )
+            .subquery()
+        )
+        latest = (
+            select(
+                ranked_pred.c.location_id,
+                ranked_pred.c.ds,
+                ranked_pred.c.y,
+                ranked_pred.c.model_id,
+                ranked_pred.c.model_id.label("run_id")  # l'historique ne distingue pas le run
+            )
+            .where(ranked_pred.c.rank == 1)
+        )
+
+        self.delete_all()
+        self.session.execute(
+            insert(LatestPrediction.__table__).from_select(['location_id', 'ds', 'y', 'model_id', 'run_id'], latest)
+        )
+        self.session.commit()
+
+
+class AsyncLatestPredictionRepository(AsyncBaseRepository):
+
+    def __init__(self, session: AsyncSession):
+        super().__init__(session, LatestPrediction)
+
+    async def get_between_dates(self, start_date, end_date, location_id: str = DEFAULT_LOCATION):
+        """
+        Récupère les dernières prédictions d'un site entre deux dates (incluses), par parcours de la clé primaire.
+        :param start_date: datetime, date de début
+        :param end_date: datetime, date de fin
+        :param location_id: site
+        :return: Liste d'objets LatestPrediction
+        """
+        stmt = (
+            select(LatestPrediction)
+            .where(
+                LatestPrediction.location_id == location_id,
+                LatestPrediction.ds >= start_date,
+                LatestPrediction.ds <= end_date
+            )
+            .order_by(LatestPrediction.ds)
+        )
+        result = await self.session.execute(stmt)
+        return result.scalars().all()
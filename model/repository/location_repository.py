@@ -0,0 +1,27 @@
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from model.entity.location import Location
+from model.repository.BaseRepository import BaseRepository
+
+class LocationRepository(BaseRepository):
+
+    def __init__(self, session: Session):
+        super().__init__(session, Location)
+
+    def get_active(self) -> list[dict]:
+        """
+        Sites actifs, sous forme de dictionnaires (location_id, latitude, longitude)
+        transmissibles aux processus du pool.
+        """
+        stmt = (
+            select(Location.location_id, Location.latitude, Location.longitude)
+            .where(Location.is_active.is_(True))
+            .order_by(Location.location_id)
+        )
+        return [dict(row._mapping) for row in self.session.execute(stmt)]
+
+    def upsert_locations(self, locations: list[dict]):
+        """Ajoute ou met à jour des sites (location_id, name, latitude, longitude), avec commit."""
+        self.upsert(locations, index_elements=['location_id'])
+        self.session.commit()
@@ -1,7 +1,10 @@
-from sqlalchemy import insert, select, func
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from model.entity.location import DEFAULT_LOCATION
 from model.entity.logging_timeseries import LoggingTimeseries
+from model.repository.AsyncBaseRepository import AsyncBaseRepository
 from model.repository.BaseRepository import BaseRepository
 
 class LoggingTimeseriesRepository(BaseRepository):
@@ -9,44 +12,49 @@ class LoggingTimeseriesRepository(BaseRepository):
     def __init__(self, session: Session):
         super().__init__(session, LoggingTimeseries)
 
-    def insert_from_dataframe(self, df):
-        """Version optimisée avec SQLAlchemy Core"""
-        data = [
-            {
-                "ds": row['ds'],
-                "relative_humidity_2m": row['relative_humidity_2m'],  # Nom exact de la colonne
-            }
-            for _, row in df.iterrows()
-        ]
-
-        stmt = insert(LoggingTimeseries.__table__)
-
-        self.session.execute(stmt, data)
-        self.session.commit()
-
-    def get_best_model(self)->LoggingTimeseries:
-        """Retourne le LoggingTimeseries avec le score le plus bas,
-        en excluant les model_id vides ou contenant 'notebook'."""
-        subquery = (
-            select(func.min(LoggingTimeseries.score))
-            .where(
-                LoggingTimeseries.model_id.isnot(None),
-                LoggingTimeseries.model_id != "",
-                LoggingTimeseries.model_id.notlike("%notebook%")
-            )
-            .scalar_subquery()
+    def get_best_model(self, location_id: str = DEFAULT_LOCATION)->LoggingTimeseries:
+        """Retourne le LoggingTimeseries du site avec le score le plus bas,
+        en excluant les model_id vides et les runs de notebook."""
+        result = self.session.execute(best_model_statement(location_id)).scalar_one_or_none()
+        return result
+
+
+class AsyncLoggingTimeseriesRepository(AsyncBaseRepository):
+
+    def __init__(self, session: AsyncSession):
+        super().__init__(session, LoggingTimeseries)
+
+    async def get_best_model(self, location_id: str = DEFAULT_LOCATION)->LoggingTimeseries:
+        """Version asynchrone de LoggingTimeseriesRepository.get_best_model"""
+        result = await self.session.execute(best_model_statement(location_id))
+        return result.scalar_one_or_none()
+
+
+def best_model_statement(location_id: str = DEFAULT_LOCATION):
+    """Requête du modèle champion d'un site : score le plus bas hors model_id vides et runs de notebook."""
+    subquery = (
+        select(func.min(LoggingTimeseries.score))
+        .where(
+            LoggingTimeseries.location_id == location_id,
+            LoggingTimeseries.is_notebook.is_(False),
+            LoggingTimeseries.model_id.isnot(None),
+            LoggingTimeseries.model_id != ""
         )
-        stmt = (
-            select(LoggingTimeseries)
-            .where(
-                LoggingTimeseries.score == subquery,
-                LoggingTimeseries.model_id.isnot(None),
-                LoggingTimeseries.model_id != "",
-                LoggingTimeseries.model_id.notlike("%notebook%")
-            )
-            .limit(1)
+        .scalar_subquery()
+    )
+    stmt = (
+        select(LoggingTimeseries)
+        .where(
+            LoggingTimeseries.location_id == location_id,
+            LoggingTimeseries.is_notebook.is_(False),
+            LoggingTimeseries.score == subquery,
+            LoggingTimeseries.model_id.isnot(None),
+            LoggingTimeseries.model_id != ""
         )
-        result = self.session.execute(stmt).scalar_one_or_none()
-        return result
+        # À score égal (modèle poursuivi en incrémental), le plus récent l'emporte
+        .order_by(LoggingTimeseries.timestamp.desc())
+        .limit(1)
+    )
+    return stmt
 
 
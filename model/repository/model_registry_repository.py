@@ -0,0 +1,37 @@
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from model.entity.location import DEFAULT_LOCATION
+from model.entity.model_registry import ModelRegistry
+from model.repository.BaseRepository import BaseRepository
+
+class ModelRegistryRepository(BaseRepository):
+
+    def __init__(self, session: Session):
+        super().__init__(session, ModelRegistry)
+
+    def register(self, entry: dict):
+        """Ajoute ou met à jour l'entrée d'un modèle, sans commit."""
+        self.upsert([entry], index_elements=['model_id'])
+
+    def set_champion(self, model_id: str, location_id: str = DEFAULT_LOCATION):
+        """Marque model_id comme champion du site et repasse l'ancien champion du site en challenger, sans commit."""
+        self.session.execute(
+            update(ModelRegistry)
+            .where(ModelRegistry.location_id == location_id, ModelRegistry.status == 'champion',
+                   ModelRegistry.model_id != model_id)
+            .values(status='challenger')
+        )
+        self.session.execute(
+            update(ModelRegistry).where(ModelRegistry.model_id == model_id).values(status='champion')
+        )
+
+    def get_expired(self, keep_challengers: int, location_id: str = DEFAULT_LOCATION) -> list[ModelRegistry]:
+        """Challengers du site au-delà des keep_challengers plus récents (le champion n'est jamais concerné)."""
+        stmt = (
+            select(ModelRegistry)
+            .where(ModelRegistry.location_id == location_id, ModelRegistry.status == 'challenger')
+            .order_by(ModelRegistry.created_at.desc())
+            .offset(keep_challengers)
+        )
+        return self.session.execute(stmt).scalars().all()
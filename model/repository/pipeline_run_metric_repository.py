@@ -0,0 +1,24 @@
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from model.entity.pipeline_run_metric import PipelineRunMetric
+from model.repository.BaseRepository import BaseRepository
+
+class PipelineRunMetricRepository(BaseRepository):
+
+    def __init__(self, session: Session):
+        super().__init__(session, PipelineRunMetric)
+
+    def add_records(self, records: list[dict]):
+        """Ajoute les mesures des étapes d'un run, sans commit."""
+        if records:
+            self.session.execute(insert(PipelineRunMetric), records)
+
+    def get_by_model(self, model_id: str) -> list[PipelineRunMetric]:
+        """Mesures des runs rattachés à un modèle, dans l'ordre d'exécution des étapes."""
+        stmt = (
+            select(PipelineRunMetric)
+            .where(PipelineRunMetric.model_id == model_id)
+            .order_by(PipelineRunMetric.started_at, PipelineRunMetric.id)
+        )
+        return self.session.execute(stmt).scalars().all()
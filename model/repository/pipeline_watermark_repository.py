@@ -0,0 +1,52 @@
+from datetime import datetime
+
+from sqlalchemy import case
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from model.entity.pipeline_watermark import PipelineWatermark
+from model.repository.BaseRepository import BaseRepository
+
+class PipelineWatermarkRepository(BaseRepository):
+
+    def __init__(self, session: Session):
+        super().__init__(session, PipelineWatermark)
+
+    def get_value(self, name: str) -> datetime | None:
+        """Retourne la dernière date traitée pour ce traitement, None s'il n'a jamais tourné."""
+        watermark = self.get(name)
+        return watermark.value if watermark is not None else None
+
+    def set_value(self, name: str, value: datetime):
+        """Enregistre la dernière date traitée, sans commit (à valider avec les données associées)."""
+        self.upsert(
+            [{"name": name, "value": value, "updated_at": datetime.now()}],
+            index_elements=['name']
+        )
+
+    def move_back(self, name: str, value: datetime):
+        """
+        Recule le point de reprise jusqu'à value s'il est plus récent (ou absent), sans commit.
+        Une seule requête (INSERT ... ON CONFLICT), sans lecture préalable : sûr face aux écritures concurrentes.
+        """
+        dialect = self.session.get_bind().dialect.name
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        stmt = insert(self.model.__table__).values(name=name, value=value, updated_at=datetime.now())
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['name'],
+            set_={
+                'value': case((stmt.excluded.value < self.model.value, stmt.excluded.value), else_=self.model.value),
+                'updated_at': stmt.excluded.updated_at,
+            }
+        )
+        self.session.execute(stmt)
+
+    def delete_value(self, name: str, updated_at: datetime = None):
+        """
+        Supprime le point de reprise, sans commit.
+        :param updated_at: date de mise à jour lue avec la valeur ; le point de reprise modifié depuis est conservé
+        """
+        query = self.session.query(self.model).filter(self.model.name == name)
+        if updated_at is not None:
+            query = query.filter(self.model.updated_at == updated_at)
+        query.delete(synchronize_session=False)
@@ -5,12 +5,17 @@ from pathlib import Path
 import dotenv
 from sqlalchemy import create_engine
 from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
 
 dotenv.load_dotenv()
 
 class DatabaseManager:
 
+    # Engine asynchrone et fabrique de sessions partagés par tout le processus (API)
+    _shared_async_engine = None
+    _shared_async_session_factory = None
+
     def __init__(self):
         self.engine = None
         self.session = None
@@ -27,10 +32,7 @@ class DatabaseManager:
                     database=os.getenv('POSTGRES_DB')
                 )
             else:
-                root = Path(__file__).resolve().parents[2]  # racine du projet
-                sqlite_path = root / "data" / "open_meteo.db"
-
-                self.connect_sqlite(str(sqlite_path))
+                self.connect_sqlite(str(self.sqlite_path()))
         except OperationalError as e:
             logging.error(f"Erreur de connexion à la base de données : {e}")
             raise
@@ -38,6 +40,48 @@ class DatabaseManager:
             logging.error(f"Erreur inattendue lors de l'initialisation de la connexion : {e}")
             raise
 
+    @staticmethod
+    def sqlite_path() -> Path:
+        """Chemin de la base SQLite de développement (SQLITE_PATH pour le remplacer)"""
+        if os.getenv("SQLITE_PATH"):
+            return Path(os.getenv("SQLITE_PATH"))
+        root = Path(__file__).resolve().parents[2]  # racine du projet
+        return root / "data" / "open_meteo.db"
+
+    @staticmethod
+    def postgres_url(user, password, host, database, driver="postgresql") -> str:
+        return f"{driver}://{user}:{password}@{host}:5432/{database}"
+
+    def database_url(self, asynchronous=False) -> str:
+        """
+        URL de connexion selon l'environnement.
+        En mode asynchrone : asyncpg (prod) ou aiosqlite (dev).
+        """
+        if self.app_env == "prod":
+            return self.postgres_url(
+                user=os.getenv('POSTGRES_USER'),
+                password=os.getenv('POSTGRES_PASSWORD'),
+                host=os.getenv('POSTGRES_HOST'),
+                database=os.getenv('POSTGRES_DB'),
+                driver="postgresql+asyncpg" if asynchronous else "postgresql"
+            )
+        driver = "sqlite+aiosqlite" if asynchronous else "sqlite"
+        return f"{driver}:///{self.sqlite_path()}"
+
+    @staticmethod
+    def pool_options() -> dict:
+        """
+        Paramètres du pool de connexions, configurables par variables d'environnement :
+        DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE, DB_POOL_PRE_PING.
+        """
+        return {
+            "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+            "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+            "pool_timeout": int(os.getenv("DB_POOL_TIMEOUT", "30")),
+            "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+            "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes"),
+        }
+
     def connect_sqlite(self, db_path="open_meteo.db"):
         """Connexion SQLite"""
         self.engine = create_engine(f"sqlite:///{db_path}")
@@ -46,7 +90,7 @@ class DatabaseManager:
 
     def connect_postgres(self, user, password, host, database):
         """Connexion PostgreSQL"""
-        url = f"postgresql://{user}:{password}@{host}:5432/{database}"
+        url = self.postgres_url(user, password, host, database)
         self.engine = create_engine(url)
         self.session = sessionmaker(bind=self.engine)()
         return self.session
@@ -54,4 +98,59 @@ class DatabaseManager:
     def close(self):
         """Fermer la connexion"""
         if self.session:
-            self.session.close()
\ No newline at end of file
+            self.session.close()
+
+    def upgrade_schema(self, revision="head"):
+        """
+        Applique les migrations Alembic (model/migrations) sur la base connectée.
+        Remplace Base.metadata.create_all : une base existante est mise à niveau sur place.
+        """
+        from alembic import command
+        from alembic.config import Config
+
+        root = Path(__file__).resolve().parents[2]  # racine du projet
+        config = Config()
+        config.set_main_option("script_location", str(root / "model" / "migrations"))
+
+        with self.engine.begin() as connection:
+            config.attributes['connection'] = connection
+            command.upgrade(config, revision)
+
+    @classmethod
+    def init_shared_async_engine(cls):
+        """
+        Crée une seule fois l'engine asynchrone partagé du processus,
+        utilisé par les endpoints async de l'API sans bloquer la boucle d'événements.
+        """
+        if cls._shared_async_engine is None:
+            url = cls().database_url(asynchronous=True)
+            cls._shared_async_engine = create_async_engine(url, **cls.pool_options())
+            cls._shared_async_session_factory = async_sessionmaker(
+                bind=cls._shared_async_engine,
+                expire_on_commit=False
+            )
+        return cls._shared_async_engine
+
+    @classmethod
+    async def dispose_shared_async_engine(cls):
+        """Ferme les connexions du pool asynchrone partagé"""
+        if cls._shared_async_engine is not None:
+            await cls._shared_async_engine.dispose()
+        cls._shared_async_engine = None
+        cls._shared_async_session_factory = None
+
+    @classmethod
+    def shared_async_session(cls):
+        """Ouvre une session asynchrone sur l'engine partagé, en l'initialisant si besoin"""
+        if cls._shared_async_session_factory is None:
+            cls.init_shared_async_engine()
+        return cls._shared_async_session_factory()
+
+
+async def get_async_session():
+    """
+    Dépendance FastAPI : fournit une session asynchrone issue du pool partagé,
+    fermée à la fin de la requête.
+    """
+    async with DatabaseManager.shared_async_session() as session:
+        yield session
@@ -0,0 +1,157 @@
+import asyncio
+import logging
+import os
+
+import numpy as np
+import xgboost
+
+from model.entity.location import DEFAULT_LOCATION
+from model.pipeline.timeseries.classes.RecursiveForecaster import RecursiveForecaster
+from model.repository.logging_timeseries_repository import AsyncLoggingTimeseriesRepository
+from model.services.registry_manager import RegistryManager
+
+
+def recursive_forecast(booster: xgboost.Booster, lags: np.ndarray, horizon: int) -> np.ndarray:
+    """
+    Prévision récursive multi-pas de toutes les séries du lot (voir RecursiveForecaster).
+    :param booster: booster entraîné sur les features y_lag_1..y_lag_n
+    :param lags: matrice (séries, n_lags), colonne 0 = valeur la plus récente
+    :param horizon: nombre de pas à prédire
+    :return: matrice (séries, horizon) des prédictions
+    """
+    lags = np.atleast_2d(lags)
+    return RecursiveForecaster(booster, lags.shape[1]).forecast(lags, horizon)
+
+
+class ForecastService:
+    """
+    Inférence à la demande avec le modèle champion de chaque site gardé en mémoire.
+
+    Le champion d'un site est chargé à sa première demande (au démarrage de l'API pour le site
+    par défaut) puis rechargé lorsqu'il change.
+    Les requêtes concurrentes sont regroupées (micro-batching) : un seul appel
+    inplace_predict par pas de prévision pour l'ensemble des requêtes du lot.
+    """
+
+    def __init__(self, registry: RegistryManager = None, max_batch: int = None, max_wait: float = None,
+                 reload_interval: float = None):
+        """
+        :param registry: registre des modèles
+        :param max_batch: nombre maximal de requêtes regroupées
+        :param max_wait: attente maximale (secondes) pour compléter un lot
+        :param reload_interval: intervalle (secondes) de vérification des champions
+        """
+        self.registry = registry or RegistryManager()
+        self.max_batch = max_batch or int(os.getenv("FORECAST_MAX_BATCH", "64"))
+        self.max_wait = max_wait if max_wait is not None else float(os.getenv("FORECAST_MAX_WAIT", "0.001"))
+        self.reload_interval = reload_interval or float(os.getenv("FORECAST_RELOAD_INTERVAL", "60"))
+
+        self.models = {}  # location_id -> (model_id, booster, n_lags)
+
+        self._queue = None
+        self._worker = None
+        self._loop = None
+
+    def set_model(self, model_id: str, booster: xgboost.Booster, n_lags: int, location_id: str = DEFAULT_LOCATION):
+        """Remplace le modèle servi pour un site ; les lots en cours terminent avec l'ancien"""
+        self.models[location_id] = (model_id, booster, n_lags)
+        logging.info(f"Modèle de prévision du site {location_id} : {model_id} ({n_lags} lags)")
+
+    def model(self, location_id: str = DEFAULT_LOCATION) -> tuple:
+        """
+        :return: (model_id, booster, n_lags) du champion chargé pour le site, None s'il n'est pas chargé
+        """
+        return self.models.get(location_id)
+
+    async def reload(self, session, location_id: str = DEFAULT_LOCATION) -> bool:
+        """
+        Charge le champion courant du site s'il a changé.
+        :return: True si un nouveau modèle a été chargé
+        """
+        champion = await AsyncLoggingTimeseriesRepository(session).get_best_model(location_id)
+        current = self.models.get(location_id)
+        if champion is None or (current is not None and champion.model_id == current[0]):
+            return False
+        model = await asyncio.to_thread(self.registry.load, champion.model_id)
+        self.set_model(champion.model_id, model.get_booster(), int(champion.params['n_lags']), location_id)
+        return True
+
+    async def watch(self, session_factory):
+        """Tâche de fond : recharge à intervalle régulier le champion de chaque site servi"""
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            for location_id in list(self.models):
+                try:
+                    async with session_factory() as session:
+                        await self.reload(session, location_id)
+                except Exception as e:
+                    logging.error(f"Rechargement du champion du site {location_id} impossible : {e}")
+
+    async def forecast(self, lags: np.ndarray, horizon: int, booster: xgboost.Booster = None) -> np.ndarray:
+        """
+        Prévision récursive de horizon pas pour un vecteur de lags (lag 1 en premier),
+        regroupée avec les requêtes concurrentes.
+        :param booster: modèle dont les lags ont été construits (par défaut le champion du site par défaut)
+        """
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        booster = booster or self.models[DEFAULT_LOCATION][1]
+        await self._queue.put((booster, np.asarray(lags, dtype=np.float32), horizon, future))
+        return await future
+
+    def _ensure_worker(self):
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run_batches())
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        self._worker = None
+
+    async def _collect(self) -> list:
+        """Attend une requête puis complète le lot pendant au plus max_wait secondes"""
+        batch = [await self._queue.get()]
+        deadline = self._loop.time() + self.max_wait
+        while len(batch) < self.max_batch:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - self._loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run_batches(self):
+        while True:
+            batch = await self._collect()
+
+            # Un lot par booster : une requête reçue avant un rechargement garde son modèle
+            groups = {}
+            for item in batch:
+                groups.setdefault(id(item[0]), []).append(item)
+
+            for items in groups.values():
+                booster = items[0][0]
+                lags = np.vstack([item[1] for item in items])
+                horizon = max(item[2] for item in items)
+                try:
+                    predictions = await asyncio.to_thread(recursive_forecast, booster, lags, horizon)
+                except Exception as e:
+                    for item in items:
+                        if not item[3].done():
+                            item[3].set_exception(e)
+                    continue
+                for row, item in enumerate(items):
+                    if not item[3].done():
+                        item[3].set_result(predictions[row, :item[2]])
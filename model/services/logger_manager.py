@@ -1,6 +1,7 @@
 import logging
 from datetime import datetime
 
+from model.entity.location import DEFAULT_LOCATION
 from model.entity.logging_timeseries import LoggingTimeseries
 from model.repository.logging_timeseries_repository import LoggingTimeseriesRepository
 
@@ -9,15 +10,22 @@ class LoggerManager:
     def __init__(self, session):
         self.repository = LoggingTimeseriesRepository(session)
 
-    def log_training(self, model_name, score, params, results, model_id):
-        """Log les paramètres d'entraînement d'un modèle"""
+    def log_training(self, model_name, score, params, results, model_id, is_notebook=None,
+                     location_id=DEFAULT_LOCATION):
+        """Log les paramètres d'entraînement d'un modèle, rattaché à son site d'entraînement"""
+        if is_notebook is None:
+            # Les notebooks versionnent leurs modèles via generate_version ('notebook_...')
+            is_notebook = model_id is not None and 'notebook' in model_id
+
         tuner_logging = LoggingTimeseries(
             timestamp=datetime.now(),
             model=model_name,
             model_id=model_id,
+            location_id=location_id,
             score=score,
             params=params,
-            results=results
+            results=results,
+            is_notebook=is_notebook
         )
 
         self.repository.add(tuner_logging)
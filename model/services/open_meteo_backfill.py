@@ -0,0 +1,239 @@
+import asyncio
+import logging
+import os
+import time
+from datetime import date, datetime, timedelta
+
+import aiohttp
+import pandas as pd
+from openmeteo_sdk.WeatherApiResponse import WeatherApiResponse
+from sqlalchemy.orm import Session
+
+from model.repository.data_reel_timeseries_repository import DataReelTimeseriesRepository
+from model.repository.pipeline_watermark_repository import PipelineWatermarkRepository
+from model.services.open_meteo_cache import OpenMeteoDayCache
+from model.services.open_meteo_service import OpenMeteoService
+
+
+class RateLimiter:
+    """Limite le nombre de requêtes lancées par seconde (départs espacés de 1 / rate secondes)"""
+
+    def __init__(self, rate: float):
+        self.interval = 1 / rate if rate else 0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class OpenMeteoBackfill:
+    """
+    Récupération de l'historique Open-Meteo d'un site par tranches de dates,
+    téléchargées en parallèle (asyncio) avec limite de débit et nouvelles tentatives.
+
+    Les jours déjà présents dans le cache local (OpenMeteoDayCache) ne sont pas redemandés :
+    seuls les jours manquants ou expirés d'une tranche partent sur le réseau.
+    Chaque tranche est écrite en base dès sa réception (upsert sur (location_id, time)),
+    puis le point de reprise open_meteo_backfill:<site> avance jusqu'à la dernière date
+    couverte sans trou : une récupération interrompue reprend là où elle s'est arrêtée.
+    Les écritures (session synchrone) passent une à une par un thread : les téléchargements
+    en cours continuent pendant l'upsert d'une tranche.
+
+    À utiliser comme gestionnaire de contexte : le cache ouvert par la récupération est fermé à la sortie.
+    """
+
+    WATERMARK = 'open_meteo_backfill'
+    START_DATE = date(2023, 1, 1)
+
+    def __init__(self, session: Session, location: dict, chunk_days: int = None, concurrency: int = None,
+                 rate_limit: float = None, retries: int = None, backoff: float = 0.2, base_url: str = None,
+                 cache: OpenMeteoDayCache = None):
+        """
+        :param session: session SQLAlchemy (écriture des tranches et du point de reprise)
+        :param location: site (location_id, latitude, longitude)
+        :param chunk_days: nombre de jours par requête (OPEN_METEO_CHUNK_DAYS)
+        :param concurrency: requêtes simultanées au plus (OPEN_METEO_CONCURRENCY)
+        :param rate_limit: requêtes lancées par seconde au plus (OPEN_METEO_RATE_LIMIT)
+        :param retries: nouvelles tentatives par tranche en cas d'erreur réseau, 429 ou 5xx (OPEN_METEO_RETRIES)
+        :param backoff: attente initiale (secondes) entre deux tentatives, doublée à chaque échec
+        :param base_url: URL de l'API d'archive (OPEN_METEO_URL)
+        :param cache: cache journalier des réponses (OPEN_METEO_CACHE_PATH par défaut)
+        """
+        self.session = session
+        self.location = location
+        self.chunk_days = chunk_days or int(os.getenv("OPEN_METEO_CHUNK_DAYS", "365"))
+        self.concurrency = concurrency or int(os.getenv("OPEN_METEO_CONCURRENCY", "4"))
+        self.rate_limit = rate_limit if rate_limit is not None else float(os.getenv("OPEN_METEO_RATE_LIMIT", "10"))
+        self.retries = retries if retries is not None else int(os.getenv("OPEN_METEO_RETRIES", "5"))
+        self.backoff = backoff
+        self.base_url = base_url or os.getenv("OPEN_METEO_URL") or OpenMeteoService.ARCHIVE_URL
+        self.owns_cache = cache is None
+        self.cache = cache or OpenMeteoDayCache()
+
+        self.data_reel_repository = DataReelTimeseriesRepository(session)
+        self.watermark_repository = PipelineWatermarkRepository(session)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Ferme le cache journalier s'il a été ouvert par la récupération"""
+        if self.owns_cache:
+            self.cache.close()
+
+    @property
+    def watermark_name(self) -> str:
+        return f"{self.WATERMARK}:{self.location['location_id']}"
+
+    def resume_date(self, start_date: date) -> date:
+        """
+        Premier jour restant à récupérer : lendemain du point de reprise s'il dépasse start_date.
+        Sans point de reprise (base alimentée avant son introduction), la reprise part du jour de la dernière mesure.
+        """
+        watermark = self.watermark_repository.get_value(self.watermark_name)
+        if watermark is not None:
+            return max(start_date, watermark.date() + timedelta(days=1))
+        last_row = self.data_reel_repository.get_last_row(self.location['location_id'])
+        if last_row is not None:
+            # Le jour de la dernière mesure peut être incomplet : il est redemandé, l'upsert absorbe le recouvrement
+            return max(start_date, last_row.time.date())
+        return start_date
+
+    def chunks(self, start_date: date, end_date: date) -> list[tuple[date, date]]:
+        """Découpe [start_date, end_date] en tranches consécutives de chunk_days jours"""
+        chunks = []
+        while start_date <= end_date:
+            chunk_end = min(start_date + timedelta(days=self.chunk_days - 1), end_date)
+            chunks.append((start_date, chunk_end))
+            start_date = chunk_end + timedelta(days=1)
+        return chunks
+
+    async def fetch_chunk(self, http: aiohttp.ClientSession, limiter: RateLimiter,
+                          start_date: date, end_date: date) -> pd.DataFrame:
+        """
+        Télécharge une tranche (réponse FlatBuffers, comme openmeteo_requests).
+        :raise aiohttp.ClientError: après épuisement des tentatives
+        :raise ValueError: erreur 4xx (hors 429), sans nouvelle tentative
+        """
+        params = {
+            "latitude": self.location['latitude'],
+            "longitude": self.location['longitude'],
+            "hourly": ",".join(OpenMeteoService.HOURLY),
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat(),
+            "format": "flatbuffers",
+        }
+        for attempt in range(self.retries + 1):
+            await limiter.acquire()
+            try:
+                async with http.get(self.base_url, params=params) as response:
+                    if 400 <= response.status < 500 and response.status != 429:
+                        # Requête invalide : inutile de réessayer
+                        raise ValueError(f"Open-Meteo {response.status} : {await response.text()}")
+                    response.raise_for_status()  # 429 et 5xx : nouvelle tentative
+                    data = await response.read()
+                return OpenMeteoService.response_frame(WeatherApiResponse.GetRootAs(data, 4))
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt == self.retries:
+                    raise
+                delay = self.backoff * 2 ** attempt
+                logging.warning(f"Site {self.location['location_id']}, tranche {start_date} : {e} "
+                                f"(nouvelle tentative dans {delay:.1f}s)")
+                await asyncio.sleep(delay)
+
+    async def fetch_cached(self, http: aiohttp.ClientSession, limiter: RateLimiter,
+                           start_date: date, end_date: date) -> pd.DataFrame:
+        """Tranche reconstituée depuis le cache, après téléchargement de ses seuls jours manquants"""
+        latitude, longitude = self.location['latitude'], self.location['longitude']
+        for missing_start, missing_end in self.cache.missing_ranges(latitude, longitude, OpenMeteoService.HOURLY,
+                                                                    start_date, end_date):
+            df = await self.fetch_chunk(http, limiter, missing_start, missing_end)
+            self.cache.store(latitude, longitude, df)
+        return self.cache.load(latitude, longitude, OpenMeteoService.HOURLY, start_date, end_date)
+
+    @staticmethod
+    def covered_until(df: pd.DataFrame, start_date: date) -> date:
+        """
+        Dernier jour complet d'une tranche : les derniers jours sans valeur (pas encore publiés
+        par l'archive) sont écrits, mais restent à redemander au prochain passage.
+        """
+        complete = df.drop(columns='time').notna().all(axis=1).groupby(df['time'].dt.date).all()
+        complete_days = complete.index[complete.to_numpy()]
+        return max(complete_days) if len(complete_days) else start_date - timedelta(days=1)
+
+    def write_chunk(self, df: pd.DataFrame, chunks: list, covered: dict, index: int) -> int:
+        """
+        Écrit une tranche (upsert idempotent) et fait avancer le point de reprise sur les tranches
+        contiguës terminées et complètes, dans une seule transaction.
+        :param covered: index de tranche -> dernier jour complet, pour les tranches déjà écrites
+        :return: nombre de lignes insérées ou modifiées
+        """
+        try:
+            # Lignes modifiées : l'upsert date l'écriture et recule le point de reprise du traitement
+            written = self.data_reel_repository.upsert_from_dataframe(df, self.location['location_id'])
+            covered[index] = self.covered_until(df, chunks[index][0])
+            watermark = None
+            for position, (chunk_start, chunk_end) in enumerate(chunks):
+                if position not in covered or covered[position] < chunk_start:
+                    break
+                watermark = covered[position]
+                if watermark < chunk_end:
+                    break
+            if watermark is not None:
+                self.watermark_repository.set_value(self.watermark_name,
+                                                    datetime.combine(watermark, datetime.min.time()))
+            self.session.commit()
+        except Exception:
+            covered.pop(index, None)
+            self.session.rollback()
+            raise
+        return written
+
+    async def run(self, start_date: date, end_date: date) -> int:
+        """
+        Récupère [start_date, end_date] à partir du point de reprise.
+        Les tranches réussies sont conservées même si d'autres échouent.
+        :return: nombre de lignes insérées ou modifiées
+        :raise Exception: première erreur d'une tranche, après écriture des autres
+        """
+        chunks = self.chunks(self.resume_date(start_date), end_date)
+        if not chunks:
+            return 0
+
+        covered = {}
+        semaphore = asyncio.Semaphore(self.concurrency)
+        limiter = RateLimiter(self.rate_limit)
+        # Un seul écrivain : la session n'est jamais utilisée par deux threads à la fois
+        writer = asyncio.Lock()
+
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=300)) as http:
+            async def process(index: int) -> int:
+                async with semaphore:
+                    df = await self.fetch_cached(http, limiter, *chunks[index])
+                # Écriture dès réception, hors de la boucle d'événements : seule la tranche courante est en mémoire
+                async with writer:
+                    return await asyncio.to_thread(self.write_chunk, df, chunks, covered, index)
+
+            results = await asyncio.gather(*(process(index) for index in range(len(chunks))),
+                                           return_exceptions=True)
+
+        errors = [result for result in results if isinstance(result, BaseException)]
+        rows = sum(result for result in results if not isinstance(result, BaseException))
+        logging.info(f"Site {self.location['location_id']} : {len(chunks) - len(errors)}/{len(chunks)} tranches, "
+                     f"{rows} lignes")
+        if errors:
+            raise errors[0]
+        return rows
+
+    def backfill(self, start_date: date, end_date: date) -> int:
+        """Version synchrone de run (processus du pool de sites)"""
+        return asyncio.run(self.run(start_date, end_date))
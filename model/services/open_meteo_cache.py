@@ -0,0 +1,134 @@
+import os
+import sqlite3
+import time
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+
+class OpenMeteoDayCache:
+    """
+    Cache local des réponses de l'API d'archive Open-Meteo, par bloc (site, variable, jour UTC).
+
+    Les jours antérieurs de plus de recent_days à leur date de récupération ne changent plus :
+    leurs blocs n'expirent jamais. Les jours récents (données encore provisoires côté Open-Meteo)
+    suivent un TTL court. Une période demandée est reconstituée à partir des blocs en cache,
+    seuls les jours manquants ou expirés sont à télécharger.
+
+    Stockage : une base SQLite (WAL, partagée par les processus du pool de sites),
+    un bloc = 24 valeurs float32.
+    """
+
+    DEFAULT_PATH = ".open_meteo_cache.sqlite"
+    HOURS = 24
+
+    def __init__(self, path: str = None, ttl: float = None, recent_days: int = None):
+        """
+        :param path: fichier SQLite du cache (OPEN_METEO_CACHE_PATH)
+        :param ttl: durée de validité (secondes) des blocs des jours récents (OPEN_METEO_CACHE_TTL)
+        :param recent_days: nombre de jours, avant la date de récupération, considérés comme provisoires
+                            (OPEN_METEO_CACHE_RECENT_DAYS)
+        """
+        self.path = path or os.getenv("OPEN_METEO_CACHE_PATH") or self.DEFAULT_PATH
+        self.ttl = ttl if ttl is not None else float(os.getenv("OPEN_METEO_CACHE_TTL", "3600"))
+        self.recent_days = recent_days if recent_days is not None else int(
+            os.getenv("OPEN_METEO_CACHE_RECENT_DAYS", "7"))
+
+        self.connection = sqlite3.connect(self.path, timeout=30)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS day_block ("
+            "location TEXT NOT NULL, variable TEXT NOT NULL, day TEXT NOT NULL, "
+            "hourly_values BLOB NOT NULL, fetched_at REAL NOT NULL, "
+            "PRIMARY KEY (location, variable, day))"
+        )
+        self.connection.commit()
+
+    @staticmethod
+    def location_key(latitude: float, longitude: float) -> str:
+        return f"{float(latitude):.4f},{float(longitude):.4f}"
+
+    def _is_valid(self, day: str, fetched_at: float, now: float) -> bool:
+        """Bloc définitif (jour ancien lors de sa récupération) ou encore dans son TTL"""
+        settled_until = datetime.fromtimestamp(fetched_at, timezone.utc).date() - timedelta(days=self.recent_days)
+        return date.fromisoformat(day) < settled_until or now - fetched_at < self.ttl
+
+    def _blocks(self, latitude: float, longitude: float, variables: list[str],
+                start_date: date, end_date: date) -> dict:
+        """Blocs valides de la période : (variable, jour ISO) -> valeurs"""
+        placeholders = ", ".join("?" for _ in variables)
+        rows = self.connection.execute(
+            f"SELECT variable, day, hourly_values, fetched_at FROM day_block "
+            f"WHERE location = ? AND variable IN ({placeholders}) AND day BETWEEN ? AND ?",
+            [self.location_key(latitude, longitude), *variables, start_date.isoformat(), end_date.isoformat()]
+        ).fetchall()
+        now = time.time()
+        return {(variable, day): values for variable, day, values, fetched_at in rows
+                if self._is_valid(day, fetched_at, now)}
+
+    def missing_ranges(self, latitude: float, longitude: float, variables: list[str],
+                       start_date: date, end_date: date) -> list[tuple[date, date]]:
+        """
+        Périodes contiguës de jours à télécharger (bloc absent ou expiré pour au moins une variable).
+        :return: liste de (premier jour, dernier jour)
+        """
+        blocks = self._blocks(latitude, longitude, variables, start_date, end_date)
+        ranges = []
+        for offset in range((end_date - start_date).days + 1):
+            day = start_date + timedelta(days=offset)
+            if all((variable, day.isoformat()) in blocks for variable in variables):
+                continue
+            if ranges and ranges[-1][1] == day - timedelta(days=1):
+                ranges[-1] = (ranges[-1][0], day)
+            else:
+                ranges.append((day, day))
+        return ranges
+
+    def store(self, latitude: float, longitude: float, df: pd.DataFrame):
+        """
+        Découpe une réponse horaire (colonne time + une colonne par variable) en blocs journaliers.
+        Seuls les jours complets (24 heures) sont mis en cache.
+        """
+        times = df['time'].to_numpy(dtype='datetime64[h]')
+        days = times.astype('datetime64[D]')
+        hours = (times - days).astype(np.int64)
+        unique_days = np.unique(days)
+        rows = np.searchsorted(unique_days, days)
+
+        fetched_at = time.time()
+        location = self.location_key(latitude, longitude)
+        complete = np.bincount(rows, minlength=len(unique_days)) == self.HOURS
+
+        records = []
+        for variable in df.columns.drop('time'):
+            grid = np.full((len(unique_days), self.HOURS), np.nan, dtype=np.float32)
+            grid[rows, hours] = df[variable].to_numpy(dtype=np.float32)
+            for index in np.flatnonzero(complete):
+                records.append((location, variable, str(unique_days[index]), grid[index].tobytes(), fetched_at))
+
+        with self.connection:
+            self.connection.executemany("INSERT OR REPLACE INTO day_block VALUES (?, ?, ?, ?, ?)", records)
+
+    def load(self, latitude: float, longitude: float, variables: list[str],
+             start_date: date, end_date: date) -> pd.DataFrame:
+        """
+        Reconstitue la période à partir des blocs en cache (heures manquantes à NaN).
+        :return: DataFrame (time, variables...)
+        """
+        blocks = self._blocks(latitude, longitude, variables, start_date, end_date)
+        n_days = (end_date - start_date).days + 1
+        start = np.datetime64(start_date, 'h')
+        frame = {'time': (start + np.arange(n_days * self.HOURS)).astype('datetime64[ns]')}
+
+        for variable in variables:
+            grid = np.full((n_days, self.HOURS), np.nan, dtype=np.float32)
+            for offset in range(n_days):
+                values = blocks.get((variable, (start_date + timedelta(days=offset)).isoformat()))
+                if values is not None:
+                    grid[offset] = np.frombuffer(values, dtype=np.float32)
+            frame[variable] = grid.ravel()
+        return pd.DataFrame(frame)
+
+    def close(self):
+        self.connection.close()
@@ -1,14 +1,23 @@
-from datetime import datetime, timedelta
+import logging
+import os
+from datetime import date, datetime, timedelta
 
 import openmeteo_requests
-import requests_cache
 from retry_requests import retry
 
+import numpy as np
 import pandas as pd
 
+from model.services.open_meteo_cache import OpenMeteoDayCache
+
 class OpenMeteoService:
 
-    def __init__(self, start_date=None, end_date=None):
+    # API d'archive Open-Meteo (OPEN_METEO_URL pour la remplacer, ex: serveur local de test)
+    ARCHIVE_URL = "https://archive-api.open-meteo.com/v1/archive"
+
+    HOURLY = ["temperature_2m", "relative_humidity_2m"]
+
+    def __init__(self, start_date=None, end_date=None, latitude: float = 52.52, longitude: float = 13.41):
         # Définir start_date avec valeur par défaut
         if start_date is None:
             start_date = "2023-01-01"
@@ -17,36 +26,54 @@ class OpenMeteoService:
         if end_date is None:
             end_date = (datetime.today() - timedelta(days=2)).strftime("%Y-%m-%d")
 
-        # Construction dynamique de l'URL
-        self.url = f"https://archive-api.open-meteo.com/v1/archive?latitude=52.52&longitude=13.41&hourly=temperature_2m,relative_humidity_2m&start_date={start_date}&end_date={end_date}"
+        self.start_date = date.fromisoformat(start_date)
+        self.end_date = date.fromisoformat(end_date)
+        self.latitude = latitude
+        self.longitude = longitude
+        self.base_url = os.getenv("OPEN_METEO_URL") or self.ARCHIVE_URL
 
-        # Configuration client API
-        cache_session = requests_cache.CachedSession('.cache', expire_after=3600)
-        retry_session = retry(cache_session, retries=5, backoff_factor=0.2)
+        # Configuration client API (le cache est géré par jour, voir OpenMeteoDayCache)
+        retry_session = retry(retries=5, backoff_factor=0.2)
         self.openmeteo = openmeteo_requests.Client(session=retry_session)
 
-    def get_meteo(self):
+    def url(self, start_date: date, end_date: date) -> str:
+        return (f"{self.base_url}?latitude={self.latitude}&longitude={self.longitude}"
+                f"&hourly={','.join(self.HOURLY)}&start_date={start_date}&end_date={end_date}")
+
+    @staticmethod
+    def response_frame(response) -> pd.DataFrame:
+        """
+        Convertit une réponse WeatherApiResponse en DataFrame (time, temperature_2m, relative_humidity_2m).
+        Les timestamps (UTC, sans fuseau) sont générés en un seul calcul datetime64.
+        """
+        hourly_data = response.Hourly()
+        temperature_np = hourly_data.Variables(0).ValuesAsNumpy()
+        humidity_np = hourly_data.Variables(1).ValuesAsNumpy()
+
+        start = np.datetime64(hourly_data.Time(), 's')
+        dates = start + np.arange(len(temperature_np)) * np.timedelta64(hourly_data.Interval(), 's')
+
+        return pd.DataFrame({
+            'time': dates.astype('datetime64[ns]'),
+            'temperature_2m': temperature_np,
+            'relative_humidity_2m': humidity_np
+        })
+
+    def get_meteo(self) -> pd.DataFrame:
+        """
+        Récupère la période demandée : les jours absents du cache local sont téléchargés,
+        puis la période est reconstituée à partir des blocs journaliers du cache.
+        :raise Exception: erreur de l'API, journalisée puis propagée
+        """
+        cache = OpenMeteoDayCache()
         try:
-            response = self.openmeteo.weather_api(self.url, params={})
-
-            hourly_data = response[0].Hourly()
-            temperature_np = hourly_data.Variables(0).ValuesAsNumpy()
-            humidity_np = hourly_data.Variables(1).ValuesAsNumpy()
-
-            # Génération des timestamps
-            start_time = hourly_data.Time()
-            interval = hourly_data.Interval()
-            time_stamps = [start_time + i * interval for i in range(len(temperature_np))]
-
-            # Conversion en datetime
-            base_date = datetime(1970, 1, 1)
-            dates = [base_date + timedelta(seconds=ts) for ts in time_stamps]
-
-            return pd.DataFrame({
-                'time': dates,
-                'temperature_2m': temperature_np,
-                'relative_humidity_2m': humidity_np
-            })
+            for start_date, end_date in cache.missing_ranges(self.latitude, self.longitude, self.HOURLY,
+                                                             self.start_date, self.end_date):
+                response = self.openmeteo.weather_api(self.url(start_date, end_date), params={})
+                cache.store(self.latitude, self.longitude, self.response_frame(response[0]))
+            return cache.load(self.latitude, self.longitude, self.HOURLY, self.start_date, self.end_date)
         except Exception as e:
-            print(f"Erreur API : {e}")
-            return None
+            logging.error(f"Erreur API : {e}")
+            raise
+        finally:
+            cache.close()
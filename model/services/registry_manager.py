@@ -0,0 +1,220 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+
+import joblib
+import xgboost
+from sqlalchemy.orm import Session
+from xgboost import XGBRegressor
+
+from model.entity.location import DEFAULT_LOCATION
+from model.repository.model_registry_repository import ModelRegistryRepository
+
+
+class RegistryManager:
+    """
+    Registre des modèles (model/registry) : booster XGBoost au format natif UBJSON
+    accompagné d'un fichier de métadonnées JSON (features, n_lags, empreinte, fenêtre d'entraînement).
+
+    Les modèles chargés sont conservés dans un cache LRU partagé par tout le processus,
+    indexé par chemin d'artefact et revalidé si le fichier change sur disque.
+
+    Avec une session, chaque artefact est aussi indexé dans la table model_registry
+    (recherche par clé primaire, statut champion/challenger et rétention par site).
+    """
+
+    MODEL_SUFFIX = ".ubj"
+    METADATA_SUFFIX = ".json"
+    LEGACY_SUFFIX = ".joblib"
+
+    # Cache LRU du processus : chemin -> (signature du fichier, modèle)
+    _cache = OrderedDict()
+    _cache_lock = threading.Lock()
+    _cache_hits = 0
+    _cache_misses = 0
+    cache_size = int(os.getenv("MODEL_CACHE_SIZE", "4"))
+
+    def __init__(self, directory: Path = None, session: Session = None, image_directory: Path = None):
+        """
+        :param directory: dossier des artefacts (model/registry par défaut)
+        :param session: session SQLAlchemy pour l'index model_registry (optionnelle)
+        :param image_directory: dossier des graphiques d'évaluation (monitoring/output par défaut)
+        """
+        self.root = Path(__file__).resolve().parents[2]  # racine du projet
+        self.directory = Path(directory) if directory else self.root / "model" / "registry"
+        self.image_directory = Path(image_directory) if image_directory else self.root / "monitoring" / "output"
+        self.repository = ModelRegistryRepository(session) if session is not None else None
+
+    def model_path(self, model_id: str) -> Path:
+        return self.directory / f"{model_id}{self.MODEL_SUFFIX}"
+
+    def metadata_path(self, model_id: str) -> Path:
+        return self.directory / f"{model_id}{self.METADATA_SUFFIX}"
+
+    def legacy_path(self, model_id: str) -> Path:
+        return self.directory / f"{model_id}{self.LEGACY_SUFFIX}"
+
+    def image_path(self, model_id: str) -> Path:
+        return self.image_directory / f"{model_id}.png"
+
+    def stored_path(self, path: Path) -> str:
+        """Chemin enregistré dans l'index : relatif à la racine du projet quand c'est possible"""
+        path = Path(path).resolve()
+        return str(path.relative_to(self.root)) if path.is_relative_to(self.root) else str(path)
+
+    def resolve(self, model_id: str) -> Path:
+        """
+        Chemin de l'artefact d'un modèle : lecture de l'index par clé primaire,
+        sinon convention de nommage du dossier (artefact UBJSON, puis joblib historique).
+        """
+        if self.repository is not None:
+            entry = self.repository.get(model_id)
+            if entry is not None and entry.status != 'deleted':
+                return self.root / entry.artifact_path
+        path = self.model_path(model_id)
+        return path if path.exists() else self.legacy_path(model_id)
+
+    @staticmethod
+    def checksum(path: Path) -> str:
+        """Empreinte SHA-256 d'un artefact"""
+        digest = hashlib.sha256()
+        with open(path, "rb") as file:
+            for block in iter(lambda: file.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def save(self, model: XGBRegressor, model_id: str, metadata: dict = None,
+             location_id: str = DEFAULT_LOCATION) -> dict:
+        """
+        Sauvegarde le booster (UBJSON) puis ses métadonnées.
+        :param model: modèle entraîné
+        :param model_id: identifiant du modèle
+        :param metadata: métadonnées complémentaires (n_lags, params, fenêtre d'entraînement...)
+        :param location_id: site des données d'entraînement
+        :return: métadonnées écrites
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.model_path(model_id)
+        booster = model.get_booster()
+        booster.save_model(path)
+
+        metadata = dict(metadata or {})
+        metadata.update({
+            "model_id": model_id,
+            "location_id": location_id,
+            "format": "ubj",
+            "xgboost_version": xgboost.__version__,
+            "feature_names": booster.feature_names,
+            "num_boosted_rounds": booster.num_boosted_rounds(),
+            "checksum": self.checksum(path),
+            "size": path.stat().st_size,
+            "saved_at": datetime.now().isoformat(),
+        })
+        self.metadata_path(model_id).write_text(json.dumps(metadata, indent=2, default=str), encoding="utf-8")
+        logging.info(f"Modèle sauvegardé : {path}")
+
+        if self.repository is not None:
+            image = self.image_path(model_id)
+            self.repository.register({
+                "model_id": model_id,
+                "location_id": location_id,
+                "artifact_path": self.stored_path(path),
+                "metadata_path": self.stored_path(self.metadata_path(model_id)),
+                "image_path": self.stored_path(image) if image.exists() else None,
+                "size": metadata["size"],
+                "checksum": metadata["checksum"],
+                "metrics": metadata.get("metrics"),
+                "status": "challenger",
+                "created_at": datetime.now(),
+            })
+            self.repository.session.commit()
+        return metadata
+
+    def metadata(self, model_id: str) -> dict:
+        return json.loads(self.metadata_path(model_id).read_text(encoding="utf-8"))
+
+    def load(self, model_id: str) -> XGBRegressor:
+        """
+        Charge un modèle, depuis le cache si l'artefact n'a pas changé.
+        Les modèles historiques (.joblib) restent lisibles en l'absence d'artefact UBJSON.
+        :raise ValueError: si l'empreinte de l'artefact ne correspond pas à ses métadonnées
+        :raise FileNotFoundError: si aucun artefact n'existe pour model_id
+        """
+        path = self.resolve(model_id)
+        stat = path.stat()
+        signature = (stat.st_mtime_ns, stat.st_size)
+        key = str(path)
+
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] == signature:
+                self._cache.move_to_end(key)
+                RegistryManager._cache_hits += 1
+                return cached[1]
+            RegistryManager._cache_misses += 1
+
+        if path.suffix == self.LEGACY_SUFFIX:
+            model = joblib.load(path)
+        else:
+            expected = json.loads(path.with_suffix(self.METADATA_SUFFIX).read_text(encoding="utf-8")).get("checksum")
+            if expected != self.checksum(path):
+                raise ValueError(f"Empreinte invalide pour le modèle {model_id} : artefact corrompu ou modifié")
+            model = XGBRegressor()
+            model.load_model(path)
+
+        with self._cache_lock:
+            self._cache[key] = (signature, model)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return model
+
+    def apply_retention(self, champion_id: str, keep_challengers: int,
+                        location_id: str = DEFAULT_LOCATION) -> list[str]:
+        """
+        Conserve le champion du site et ses keep_challengers challengers les plus récents ;
+        les artefacts, métadonnées et graphiques des autres modèles du site sont supprimés.
+        Les modèles des autres sites ne sont pas concernés.
+        :return: identifiants des modèles supprimés
+        """
+        if self.repository is None:
+            raise ValueError("La rétention nécessite l'index model_registry (session)")
+
+        if champion_id is not None:
+            self.repository.set_champion(champion_id, location_id)
+        self.repository.session.flush()
+
+        deleted = []
+        for entry in self.repository.get_expired(keep_challengers, location_id):
+            for stored in (entry.artifact_path, entry.metadata_path, entry.image_path):
+                if stored:
+                    (self.root / stored).unlink(missing_ok=True)
+            self.legacy_path(entry.model_id).unlink(missing_ok=True)
+            with self._cache_lock:
+                self._cache.pop(str(self.root / entry.artifact_path), None)
+            entry.status = 'deleted'
+            entry.size = 0
+            deleted.append(entry.model_id)
+
+        self.repository.session.commit()
+        if deleted:
+            logging.info(f"Registre : {len(deleted)} modèle(s) supprimé(s)")
+        return deleted
+
+    @classmethod
+    def clear_cache(cls):
+        with cls._cache_lock:
+            cls._cache.clear()
+
+    @classmethod
+    def cache_stats(cls) -> tuple[int, int, int]:
+        """
+        :return: (succès, échecs, modèles en cache) du cache LRU depuis le démarrage du processus
+        """
+        with cls._cache_lock:
+            return cls._cache_hits, cls._cache_misses, len(cls._cache)
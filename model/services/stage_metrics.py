@@ -0,0 +1,189 @@
+import logging
+import os
+import resource
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from prometheus_client import CollectorRegistry, Gauge, write_to_textfile
+from sqlalchemy.orm import Session
+
+from model.entity.location import DEFAULT_LOCATION
+from model.repository.pipeline_run_metric_repository import PipelineRunMetricRepository
+
+# ru_maxrss est en kilo-octets sous Linux, en octets sous macOS
+MAXRSS_UNIT = 1 if sys.platform == 'darwin' else 1024
+PROC_STATUS = Path('/proc/self/status')
+PROC_CLEAR_REFS = Path('/proc/self/clear_refs')
+
+LABELS = ['pipeline', 'location_id', 'stage']
+
+
+def cpu_seconds() -> float:
+    """Temps CPU du processus (tous threads) et de ses sous-processus terminés"""
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return time.process_time() + children.ru_utime + children.ru_stime
+
+
+def proc_status_bytes(field: str) -> int | None:
+    """Valeur d'un champ mémoire de /proc/self/status (VmRSS, VmHWM), None hors Linux"""
+    try:
+        for line in PROC_STATUS.read_text().splitlines():
+            if line.startswith(f"{field}:"):
+                return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def reset_peak_rss() -> bool:
+    """Remet le pic de RSS (VmHWM) du processus à sa RSS courante (Linux >= 4.0)"""
+    try:
+        PROC_CLEAR_REFS.write_text('5')
+        return True
+    except OSError:
+        return False
+
+
+class StageMetrics:
+    """
+    Mesures des étapes d'un run de pipeline : durée, temps CPU, hausse du pic de mémoire (RSS)
+    et nombre de lignes traitées.
+
+    Le pic de RSS est remis à zéro au début de chaque étape (/proc/self/clear_refs) : la hausse mesurée
+    est propre à l'étape. Sans /proc, elle se réduit à la hausse du pic du processus (ru_maxrss).
+
+    Les mesures sont enregistrées dans pipeline_run_metric, rattachées au modèle du run
+    (logging_timeseries.model_id), et exportées au format texte Prometheus dans
+    <PIPELINE_METRICS_DIR>/<pipeline>_<site>.prom (textfile collector de node_exporter),
+    avec les succès / échecs des caches utilisés pendant le run (cache des étapes).
+    """
+
+    def __init__(self, pipeline: str, location_id: str = DEFAULT_LOCATION, run_id: str = None,
+                 directory: Path = None):
+        """
+        :param pipeline: nom du pipeline ('orchestrator', 'batch_predictor', 'runner')
+        :param run_id: identifiant du run (généré par défaut)
+        :param directory: dossier de l'export Prometheus (PIPELINE_METRICS_DIR, monitoring/metrics par défaut)
+        """
+        root = Path(__file__).resolve().parents[2]  # racine du projet
+        self.pipeline = pipeline
+        self.location_id = location_id
+        self.run_id = run_id or str(uuid.uuid4())
+        self.directory = Path(directory or os.getenv("PIPELINE_METRICS_DIR") or root / "monitoring" / "metrics")
+        self.model_id = None
+        self.records = []
+        self.caches = {}
+
+    @contextmanager
+    def stage(self, name: str, rows: int = None):
+        """
+        Mesure une étape ; le nombre de lignes peut être renseigné dans l'étape (record['rows']).
+        Une étape interrompue par une exception est enregistrée avec le statut 'error'.
+        """
+        record = {'stage': name, 'started_at': datetime.now(), 'rows': rows, 'status': 'ok'}
+        per_stage_peak = reset_peak_rss()
+        rss_start = proc_status_bytes('VmRSS') if per_stage_peak else None
+        maxrss_start = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        cpu_start, wall_start = cpu_seconds(), time.perf_counter()
+        try:
+            yield record
+        except BaseException:
+            record['status'] = 'error'
+            raise
+        finally:
+            record['wall_seconds'] = time.perf_counter() - wall_start
+            record['cpu_seconds'] = cpu_seconds() - cpu_start
+            peak = proc_status_bytes('VmHWM') if rss_start is not None else None
+            if peak is not None:
+                record['rss_peak_delta_bytes'] = max(0, peak - rss_start)
+            else:
+                maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+                record['rss_peak_delta_bytes'] = (maxrss - maxrss_start) * MAXRSS_UNIT
+            self.records.append(record)
+
+    def count_cache(self, name: str, hits: dict, misses: dict):
+        """
+        Succès et échecs d'un cache pendant le run, exportés avec les mesures des étapes.
+        :param hits: étape -> nombre de succès
+        :param misses: étape -> nombre d'échecs
+        """
+        self.caches[name] = (dict(hits), dict(misses))
+
+    def rows(self) -> list[dict]:
+        """Lignes de pipeline_run_metric du run"""
+        run = {'run_id': self.run_id, 'pipeline': self.pipeline, 'location_id': self.location_id,
+               'model_id': self.model_id}
+        return [dict(run, **record) for record in self.records]
+
+    def save(self, session: Session):
+        """Enregistre les mesures du run (avec commit)"""
+        PipelineRunMetricRepository(session).add_records(self.rows())
+        session.commit()
+
+    def export(self) -> Path:
+        """
+        Écrit les mesures du run au format texte Prometheus (écriture atomique).
+        :return: chemin du fichier .prom
+        """
+        registry = CollectorRegistry()
+        gauges = {
+            'wall_seconds': Gauge('pipeline_stage_wall_seconds', "Durée de l'étape (secondes)",
+                                  LABELS, registry=registry),
+            'cpu_seconds': Gauge('pipeline_stage_cpu_seconds', "Temps CPU de l'étape (secondes)",
+                                 LABELS, registry=registry),
+            'rss_peak_delta_bytes': Gauge('pipeline_stage_rss_peak_delta_bytes',
+                                          "Pic de RSS de l'étape moins la RSS à son début (octets)",
+                                          LABELS, registry=registry),
+            'rows': Gauge('pipeline_stage_rows', "Lignes traitées par l'étape", LABELS, registry=registry),
+        }
+        success = Gauge('pipeline_stage_success', "1 si l'étape s'est terminée sans erreur",
+                        LABELS, registry=registry)
+        for record in self.records:
+            labels = (self.pipeline, self.location_id, record['stage'])
+            for name, gauge in gauges.items():
+                if record[name] is not None:
+                    gauge.labels(*labels).set(record[name])
+            success.labels(*labels).set(record['status'] == 'ok')
+
+        cache_labels = ['pipeline', 'location_id', 'cache', 'step']
+        cache_gauges = (Gauge('pipeline_cache_hits', "Succès du cache pendant le run", cache_labels, registry=registry),
+                        Gauge('pipeline_cache_misses', "Échecs du cache pendant le run", cache_labels, registry=registry))
+        for name, counts in self.caches.items():
+            for gauge, by_step in zip(cache_gauges, counts):
+                for step, count in by_step.items():
+                    gauge.labels(self.pipeline, self.location_id, name, step).set(count)
+
+        Gauge('pipeline_run_info', "Run exporté et modèle associé",
+              ['pipeline', 'location_id', 'run_id', 'model_id'], registry=registry
+              ).labels(self.pipeline, self.location_id, self.run_id, self.model_id or '').set(1)
+        Gauge('pipeline_run_timestamp_seconds', "Fin du run exporté (epoch)",
+              ['pipeline', 'location_id'], registry=registry
+              ).labels(self.pipeline, self.location_id).set_to_current_time()
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"{self.pipeline}_{self.location_id}.prom"
+        write_to_textfile(str(path), registry)
+        return path
+
+    def publish(self, session: Session):
+        """
+        Journalise, enregistre et exporte les mesures du run.
+        Une erreur d'enregistrement ou d'export est journalisée sans interrompre le pipeline.
+        """
+        if not self.records:
+            return
+        logging.info(f"Mesures {self.pipeline} ({self.location_id}) : " + ", ".join(
+            f"{record['stage']} {record['wall_seconds']:.2f}s" for record in self.records))
+        try:
+            self.save(session)
+        except Exception as e:
+            session.rollback()
+            logging.warning(f"Mesures {self.pipeline} non enregistrées : {e}")
+        try:
+            self.export()
+        except OSError as e:
+            logging.warning(f"Mesures {self.pipeline} non exportées : {e}")
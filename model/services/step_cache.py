@@ -0,0 +1,97 @@
+import hashlib
+import inspect
+import json
+import logging
+import os
+from functools import lru_cache
+from pathlib import Path
+
+import pandas as pd
+
+
+@lru_cache(maxsize=None)
+def _source_digest(path: str) -> str:
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def code_version(*objects) -> str:
+    """Empreinte du code source des modules définissant les objets (classes, fonctions, modules)"""
+    digest = hashlib.sha256()
+    for path in sorted({inspect.getsourcefile(obj) for obj in objects}):
+        digest.update(_source_digest(path).encode())
+    return digest.hexdigest()[:16]
+
+
+class StepCache:
+    """
+    Cache des étapes du pipeline, indexé par l'empreinte de leurs entrées
+    (point de reprise des données, paramètres, version du code).
+
+    Une étape dont l'empreinte est inchangée n'est pas recalculée : sa sortie est relue
+    (DataFrame en Parquet, dictionnaire en JSON) depuis <directory>/<étape>/<empreinte>.
+    Seules les keep dernières sorties de chaque étape sont conservées.
+    """
+
+    def __init__(self, directory: Path = None, keep: int = 3):
+        """
+        :param directory: dossier du cache (PIPELINE_CACHE_DIR, cache/pipeline à la racine du projet par défaut)
+        :param keep: nombre de sorties conservées par étape
+        """
+        root = Path(__file__).resolve().parents[2]  # racine du projet
+        self.directory = Path(directory or os.getenv("PIPELINE_CACHE_DIR") or root / "cache" / "pipeline")
+        self.keep = keep
+        self.hits = {}
+        self.misses = {}
+
+    @classmethod
+    def from_env(cls):
+        """Cache des étapes, sauf si PIPELINE_CACHE=false"""
+        if os.getenv("PIPELINE_CACHE", "true").lower() in ('1', 'true', 'yes'):
+            return cls()
+        return None
+
+    @staticmethod
+    def fingerprint(**inputs) -> str:
+        """Empreinte d'entrées sérialisables en JSON (dates et autres objets via str)"""
+        payload = json.dumps(inputs, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()[:24]
+
+    def path(self, step: str, key: str, suffix: str) -> Path:
+        return self.directory / step / f"{key}{suffix}"
+
+    def load(self, step: str, key: str):
+        """
+        :return: sortie enregistrée pour cette empreinte (DataFrame ou dictionnaire), None sinon
+        """
+        for suffix in (".parquet", ".json"):
+            path = self.path(step, key, suffix)
+            if not path.exists():
+                continue
+            try:
+                output = pd.read_parquet(path) if suffix == ".parquet" else json.loads(path.read_text())
+            except Exception as e:
+                logging.warning(f"Cache {step} illisible ({path.name}) : {e}")
+                break
+            self.hits[step] = self.hits.get(step, 0) + 1
+            logging.info(f"Cache {step} : empreinte {key} inchangée, étape ignorée")
+            return output
+        self.misses[step] = self.misses.get(step, 0) + 1
+        return None
+
+    def save(self, step: str, key: str, output):
+        """Enregistre la sortie d'une étape (écriture atomique), puis purge les sorties les plus anciennes"""
+        suffix = ".parquet" if isinstance(output, pd.DataFrame) else ".json"
+        path = self.path(step, key, suffix)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        temporary = path.with_name(f".{path.name}.{os.getpid()}")
+        if isinstance(output, pd.DataFrame):
+            output.to_parquet(temporary, index=False)
+        else:
+            temporary.write_text(json.dumps(output, default=str))
+        os.replace(temporary, path)
+
+        outputs = sorted((entry for entry in path.parent.iterdir() if not entry.name.startswith('.')),
+                         key=lambda entry: entry.stat().st_mtime, reverse=True)
+        for entry in outputs[self.keep:]:
+            entry.unlink(missing_ok=True)
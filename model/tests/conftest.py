@@ -0,0 +1,42 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from model.entity.base import Base
+from model.entity.data_predict_timeseries import DataPredictTimeseries
+from model.entity.data_process_timeseries import DataProcessTimeseries
+from model.entity.data_reel_timeseries import DataReelTimeseries
+from model.entity.latest_prediction import LatestPrediction
+from model.entity.location import Location
+from model.entity.logging_timeseries import LoggingTimeseries
+from model.entity.model_registry import ModelRegistry
+from model.entity.pipeline_run_metric import PipelineRunMetric
+from model.entity.pipeline_watermark import PipelineWatermark
+
+@pytest.fixture
+def session(tmp_path):
+    """
+    Session sur une base SQLite temporaire contenant toutes les tables
+    """
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+@pytest.fixture(autouse=True)
+def open_meteo_cache(tmp_path, monkeypatch):
+    """
+    Cache Open-Meteo propre à chaque test
+    """
+    monkeypatch.setenv("OPEN_METEO_CACHE_PATH", str(tmp_path / 'open_meteo_cache.sqlite'))
+
+
+@pytest.fixture(autouse=True)
+def pipeline_metrics_dir(tmp_path, monkeypatch):
+    """
+    Export Prometheus des mesures des pipelines propre à chaque test
+    """
+    monkeypatch.setenv("PIPELINE_METRICS_DIR", str(tmp_path / 'metrics'))
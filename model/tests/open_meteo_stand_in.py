@@ -0,0 +1,120 @@
+"""
+Serveur HTTP local imitant l'API d'archive Open-Meteo (réponses FlatBuffers),
+utilisé par les tests d'ingestion et les benchmarks.
+"""
+import threading
+import time
+from collections import Counter
+from datetime import date, datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import flatbuffers
+import numpy as np
+
+
+def hourly_values(latitude: float, start: int, hours: int) -> tuple[np.ndarray, np.ndarray]:
+    """Température et humidité déterministes, fonction de l'heure absolue (reproductibles par tranche)"""
+    t = np.arange(hours) + start // 3600
+    temperature = (12 + 8 * np.sin(2 * np.pi * t / 24) + latitude / 10).astype(np.float32)
+    humidity = (60 + 20 * np.cos(2 * np.pi * t / 24)).astype(np.float32)
+    return temperature, humidity
+
+
+def encode_response(latitude: float, longitude: float, start: int, hours: int, published_hours: int = None) -> bytes:
+    """
+    Réponse WeatherApiResponse (hourly : temperature_2m, relative_humidity_2m) au format
+    lu par openmeteo_requests : taille du message sur 4 octets puis message FlatBuffers.
+    """
+    builder = flatbuffers.Builder(16 * hours + 1024)
+
+    variables = []
+    for values in hourly_values(latitude, start, hours):
+        if published_hours is not None:
+            values[published_hours:] = np.nan
+        vector = builder.CreateNumpyVector(values)
+        builder.StartObject(4)  # VariableWithValues : values = champ 3
+        builder.PrependUOffsetTRelativeSlot(3, vector, 0)
+        variables.append(builder.EndObject())
+    builder.StartVector(4, len(variables), 4)
+    for variable in reversed(variables):
+        builder.PrependUOffsetTRelative(variable)
+    variables = builder.EndVector()
+
+    builder.StartObject(4)  # VariablesWithTime : time, time_end, interval, variables
+    builder.PrependInt64Slot(0, start, 0)
+    builder.PrependInt64Slot(1, start + hours * 3600, 0)
+    builder.PrependInt32Slot(2, 3600, 0)
+    builder.PrependUOffsetTRelativeSlot(3, variables, 0)
+    hourly = builder.EndObject()
+
+    builder.StartObject(12)  # WeatherApiResponse : latitude, longitude, ..., hourly = champ 11
+    builder.PrependFloat32Slot(0, latitude, 0)
+    builder.PrependFloat32Slot(1, longitude, 0)
+    builder.PrependUOffsetTRelativeSlot(11, hourly, 0)
+    builder.Finish(builder.EndObject())
+
+    payload = bytes(builder.Output())
+    return len(payload).to_bytes(4, byteorder="little") + payload
+
+
+class OpenMeteoStandIn:
+    """
+    Serveur local (thread) : latence simulée, et pannes injectables par date de début de tranche.
+    :param latency: attente avant chaque réponse (secondes)
+    :param failures: start_date -> nombre de réponses 503 à renvoyer avant de répondre normalement
+    :param published_until: dernier jour publié, les heures suivantes sont renvoyées sans valeur (NaN)
+    """
+
+    def __init__(self, latency: float = 0.0, failures: dict = None, published_until: date = None):
+        self.latency = latency
+        self.published_until = published_until
+        self.failures = Counter(failures or {})
+        self.requests = []
+        self._lock = threading.Lock()
+
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                query = {key: values[0] for key, values in parse_qs(urlparse(self.path).query).items()}
+                with stand_in._lock:
+                    stand_in.requests.append(query)
+                    failing = stand_in.failures[query['start_date']] > 0
+                    if failing:
+                        stand_in.failures[query['start_date']] -= 1
+
+                time.sleep(stand_in.latency)
+                if failing:
+                    self.send_response(503)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                start = date.fromisoformat(query['start_date'])
+                end = date.fromisoformat(query['end_date'])
+                epoch = int(datetime.combine(start, datetime.min.time(), tzinfo=timezone.utc).timestamp())
+                published_hours = None
+                if stand_in.published_until is not None:
+                    published_hours = max((stand_in.published_until - start).days + 1, 0) * 24
+                body = encode_response(float(query['latitude']), float(query['longitude']), epoch,
+                                       ((end - start).days + 1) * 24, published_hours)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/octet-stream")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/v1/archive"
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *args):
+        self.server.shutdown()
+        self.server.server_close()
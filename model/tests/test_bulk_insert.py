@@ -0,0 +1,123 @@
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import numpy as np
+import pandas as pd
+
+from model.entity.data_predict_timeseries import DataPredictTimeseries
+from model.entity.data_reel_timeseries import DataReelTimeseries
+from model.repository.data_predict_timeseries_repository import DataPredictTimeseriesRepository
+from model.repository.data_reel_timeseries_repository import DataReelTimeseriesRepository
+
+
+def reel_frame(rows):
+    return pd.DataFrame({
+        'time': pd.date_range('2025-01-01', periods=rows, freq='h'),
+        'temperature_2m': np.arange(rows, dtype=np.float32),
+        'relative_humidity_2m': np.where(np.arange(rows) == 2, np.nan, 50.0),
+    })
+
+
+def test_bulk_insert_sqlite_by_chunks(session):
+    """
+    L'insertion par lots écrit toutes les lignes, lisibles et filtrables par l'ORM
+    """
+    repository = DataReelTimeseriesRepository(session)
+    repository.bulk_chunk_size = 3
+
+    repository.insert_from_dataframe(reel_frame(10))
+
+    rows = session.query(DataReelTimeseries).order_by(DataReelTimeseries.time).all()
+    assert len(rows) == 10
+    assert rows[9].temperature_2m == 9.0
+    assert rows[2].relative_humidity_2m is None
+
+    match = session.query(DataReelTimeseries).filter(DataReelTimeseries.time == datetime(2025, 1, 1, 4)).one()
+    assert match.temperature_2m == 4.0
+
+
+def test_bulk_insert_constants(session):
+    """
+    Les constantes (model_id) sont ajoutées à chaque ligne
+    """
+    predict = pd.DataFrame({'ds': pd.date_range('2025-01-01', periods=4, freq='3h'), 'y': [1.0, 2.0, 3.0, 4.0]})
+
+    DataPredictTimeseriesRepository(session).insert_from_dataframe(predict, 'XGBRegressor_1')
+
+    assert {row.model_id for row in session.query(DataPredictTimeseries).all()} == {'XGBRegressor_1'}
+
+
+def test_bulk_insert_postgres_uses_copy():
+    """
+    Sur PostgreSQL, chaque lot est envoyé via COPY FROM STDIN au format CSV
+    """
+    session = MagicMock()
+    session.get_bind.return_value.dialect.name = "postgresql"
+    cursor = session.connection.return_value.connection.dbapi_connection.cursor.return_value
+    payloads = []
+    cursor.copy_expert.side_effect = lambda sql, buffer: payloads.append((sql, buffer.read()))
+
+    repository = DataReelTimeseriesRepository(session)
+    repository.bulk_chunk_size = 2
+    repository.insert_from_dataframe(reel_frame(3))
+
+    assert len(payloads) == 2
+    sql, csv = payloads[0]
+    assert sql == ("COPY data_reel_timeseries (time, temperature_2m, relative_humidity_2m, location_id) "
+                   "FROM STDIN WITH (FORMAT csv)")
+    assert csv.splitlines()[0] == "2025-01-01 00:00:00.000000,0.0,50.0,berlin"
+    assert payloads[1][1].splitlines() == ["2025-01-01 02:00:00.000000,2.0,,berlin"]
+    session.commit.assert_called_once()
+
+
+def test_bulk_upsert_sqlite_is_idempotent(session):
+    """
+    L'upsert insère les nouvelles lignes, met à jour les lignes modifiées et ignore les lignes identiques
+    """
+    repository = DataReelTimeseriesRepository(session)
+    repository.bulk_chunk_size = 4
+
+    assert repository.upsert_from_dataframe(reel_frame(10)) == 10
+
+    overlap = reel_frame(15).iloc[5:].copy()
+    overlap.loc[6, 'temperature_2m'] = 60.0
+    assert repository.upsert_from_dataframe(overlap) == 5 + 1
+    assert repository.upsert_from_dataframe(overlap) == 0
+
+    rows = session.query(DataReelTimeseries).order_by(DataReelTimeseries.time).all()
+    assert len(rows) == 15
+    assert rows[6].temperature_2m == 60.0
+    assert rows[2].relative_humidity_2m is None
+
+
+def test_bulk_upsert_postgres_stages_with_copy():
+    """
+    Sur PostgreSQL, chaque lot est copié dans une table temporaire puis fusionné par INSERT ... ON CONFLICT
+    """
+    session = MagicMock()
+    session.get_bind.return_value.dialect.name = "postgresql"
+    cursor = session.connection.return_value.connection.dbapi_connection.cursor.return_value
+    cursor.rowcount = 2
+    statements = []
+    cursor.execute.side_effect = statements.append
+    cursor.copy_expert.side_effect = lambda sql, buffer: statements.append(sql)
+
+    repository = DataReelTimeseriesRepository(session)
+    repository.bulk_chunk_size = 2
+    assert repository.upsert_from_dataframe(reel_frame(3)) == 4
+
+    columns = "time, temperature_2m, relative_humidity_2m, location_id"
+    merge = (f"INSERT INTO data_reel_timeseries ({columns}) SELECT {columns} FROM data_reel_timeseries_staging "
+             "ON CONFLICT (location_id, time) DO UPDATE SET temperature_2m = excluded.temperature_2m, "
+             "relative_humidity_2m = excluded.relative_humidity_2m "
+             "WHERE data_reel_timeseries.temperature_2m IS DISTINCT FROM excluded.temperature_2m "
+             "OR data_reel_timeseries.relative_humidity_2m IS DISTINCT FROM excluded.relative_humidity_2m")
+    copy = f"COPY data_reel_timeseries_staging ({columns}) FROM STDIN WITH (FORMAT csv)"
+    assert statements == [
+        f"CREATE TEMP TABLE data_reel_timeseries_staging ON COMMIT DROP AS "
+        f"SELECT {columns} FROM data_reel_timeseries WITH NO DATA",
+        copy, merge, "TRUNCATE data_reel_timeseries_staging",
+        copy, merge, "TRUNCATE data_reel_timeseries_staging",
+        "DROP TABLE data_reel_timeseries_staging",
+    ]
+    session.commit.assert_not_called()
@@ -0,0 +1,136 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import func
+
+from model.entity.data_process_timeseries import DataProcessTimeseries
+from model.pipeline.timeseries.DataManager import DataManager
+from model.repository.data_process_timeseries_repository import DataProcessTimeSeriesRepository
+from model.repository.data_reel_timeseries_repository import DataReelTimeseriesRepository
+from model.repository.pipeline_watermark_repository import PipelineWatermarkRepository
+
+
+def ingest(session, start, hours, location_id='berlin'):
+    index = pd.date_range(start, periods=hours, freq='h')
+    DataReelTimeseriesRepository(session).insert_from_dataframe(pd.DataFrame({
+        'time': index,
+        'temperature_2m': np.arange(hours, dtype=float) + index.day.values * 100,
+        'relative_humidity_2m': np.full(hours, 50.0),
+    }), location_id)
+
+
+def run_save(session, incremental=True, location_id='berlin'):
+    data_manager = DataManager(SimpleNamespace(session=session), incremental=incremental, location_id=location_id)
+    df = data_manager.transformData(data_manager.cleanData(data_manager.loadData()))
+    data_manager.saveData(df)
+    return df
+
+
+def test_save_data_incremental_upserts_only_new_buckets(session):
+    """
+    Après une première sauvegarde complète, seuls les créneaux touchés par les nouvelles
+    données brutes sont réécrits, et le résultat est identique à une sauvegarde complète
+    """
+    ingest(session, '2025-01-01 00:00', 25)
+    run_save(session)
+    first_ids = {row.ds: row.id for row in session.query(DataProcessTimeseries).all()}
+
+    assert PipelineWatermarkRepository(session).get_value('data_process_timeseries:berlin') == pd.Timestamp('2025-01-02 00:00')
+
+    ingest(session, '2025-01-02 01:00', 10)
+    df = run_save(session)
+
+    rows = session.query(DataProcessTimeseries).order_by(DataProcessTimeseries.ds).all()
+    saved = pd.DataFrame({'ds': [row.ds for row in rows], 'y': [row.y for row in rows]})
+    pd.testing.assert_frame_equal(saved, df[['ds', 'y']], check_dtype=False)
+
+    # Les créneaux antérieurs au point de reprise n'ont pas été supprimés/réinsérés
+    untouched = [row for row in rows if row.ds < pd.Timestamp('2025-01-02 00:00')]
+    assert all(first_ids[row.ds] == row.id for row in untouched)
+
+
+def test_save_data_full_mode_rewrites_table(session):
+    """
+    En mode complet, la table est réécrite entièrement dans une seule transaction
+    """
+    ingest(session, '2025-01-01 00:00', 12)
+    run_save(session, incremental=False)
+    run_save(session, incremental=False)
+
+    assert session.query(DataProcessTimeseries).count() == 4
+
+
+def test_load_data_streams_typed_columns_within_window(session):
+    """
+    loadData renvoie des colonnes typées (datetime64 / float32), triées,
+    identiques aux valeurs stockées, et restreintes à la fenêtre demandée
+    """
+    ingest(session, '2025-01-01 00:00', 30)
+    repository = DataReelTimeseriesRepository(session)
+
+    df = repository.load_columns(chunk_size=7)
+    assert len(df) == 30
+    assert df['time'].dtype == 'datetime64[ns]'
+    assert df['temperature_2m'].dtype == np.float32
+    assert df['time'].is_monotonic_increasing
+    expected = [row.temperature_2m for row in repository.getAll()]
+    np.testing.assert_allclose(df['temperature_2m'], expected, rtol=1e-6)
+
+    data_manager = DataManager(SimpleNamespace(session=session))
+    window = data_manager.loadData(pd.Timestamp('2025-01-01 05:00'), pd.Timestamp('2025-01-01 09:00'))
+    assert window['time'].tolist() == list(pd.date_range('2025-01-01 05:00', periods=5, freq='h'))
+    assert data_manager.loaded_until == pd.Timestamp('2025-01-01 09:00')
+
+
+def test_locations_are_loaded_and_saved_independently(session):
+    """
+    Chaque site a ses propres créneaux et son propre point de reprise :
+    une réécriture complète d'un site ne touche pas les autres
+    """
+    ingest(session, '2025-01-01 00:00', 12, 'berlin')
+    ingest(session, '2025-01-01 00:00', 6, 'paris')
+
+    run_save(session, location_id='berlin')
+    paris = run_save(session, incremental=False, location_id='paris')
+
+    counts = dict(session.query(DataProcessTimeseries.location_id, func.count()).group_by(DataProcessTimeseries.location_id).all())
+    assert counts == {'berlin': 4, 'paris': 2}
+    assert len(paris) == 2
+
+    watermarks = PipelineWatermarkRepository(session)
+    assert watermarks.get_value('data_process_timeseries:berlin') == pd.Timestamp('2025-01-01 11:00')
+    assert watermarks.get_value('data_process_timeseries:paris') == pd.Timestamp('2025-01-01 05:00')
+
+
+def test_prepare_data_reprocesses_from_earliest_changed_row(session, monkeypatch):
+    """
+    Une mesure arrivée dans le désordre ou corrigée sous le point de reprise est retraitée :
+    seules les mesures à partir de son créneau sont rechargées, et le résultat est identique
+    à une préparation complète
+    """
+    ingest(session, '2025-01-01 00:00', 48)
+    DataManager(SimpleNamespace(session=session)).prepareData()
+    assert PipelineWatermarkRepository(session).get_value('data_reel_timeseries_changed_from:berlin') is None
+
+    # Tranche de rattrapage écrite après des mesures plus récentes, puis correction d'une mesure ancienne
+    ingest(session, '2025-01-03 00:00', 6)
+    repository = DataReelTimeseriesRepository(session)
+    repository.upsert_from_dataframe(pd.DataFrame({
+        'time': [pd.Timestamp('2025-01-01 07:00')], 'temperature_2m': [-40.0], 'relative_humidity_2m': [50.0]}))
+    session.commit()
+
+    windows = []
+    load_columns = DataReelTimeseriesRepository.load_columns
+    monkeypatch.setattr(DataReelTimeseriesRepository, 'load_columns',
+                        lambda self, start_date=None, *args, **kwargs:
+                        windows.append(start_date) or load_columns(self, start_date, *args, **kwargs))
+    incremental = DataManager(SimpleNamespace(session=session)).prepareData()
+    assert windows == [pd.Timestamp('2025-01-01 06:00')]
+
+    full = DataManager(SimpleNamespace(session=session), incremental=False)
+    expected = full.transformData(full.cleanData(full.loadData()))
+    pd.testing.assert_frame_equal(incremental, expected)
+    saved = DataProcessTimeSeriesRepository(session).load_columns('berlin')
+    pd.testing.assert_frame_equal(saved, expected)
+    assert PipelineWatermarkRepository(session).get_value('data_reel_timeseries_changed_from:berlin') is None
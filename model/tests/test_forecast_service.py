@@ -0,0 +1,45 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+from xgboost import XGBRegressor
+
+from model.services.forecast_service import ForecastService, recursive_forecast
+
+
+class CountingBooster:
+    """Booster instrumenté : compte les appels inplace_predict"""
+
+    def __init__(self, booster):
+        self.booster = booster
+        self.calls = 0
+
+    def inplace_predict(self, data):
+        self.calls += 1
+        return self.booster.inplace_predict(data)
+
+
+def test_concurrent_requests_share_predict_calls():
+    """
+    Les requêtes concurrentes sont regroupées : un appel inplace_predict par pas
+    pour tout le lot, et chaque requête reçoit la prévision qu'elle aurait eue seule
+    """
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(15, 5, size=(300, 4)), columns=[f'y_lag_{k}' for k in range(1, 5)])
+    model = XGBRegressor(n_estimators=30, max_depth=3).fit(X, X['y_lag_1'] * 0.8 + X['y_lag_2'] * 0.1)
+    booster = CountingBooster(model.get_booster())
+    histories = rng.normal(15, 5, size=(16, 4)).astype(np.float32)
+
+    service = ForecastService(max_wait=0.05)
+    service.set_model("XGBRegressor_1", booster, 4)
+
+    async def run():
+        results = await asyncio.gather(*(service.forecast(history, 12) for history in histories))
+        await service.stop()
+        return results
+
+    results = asyncio.run(run())
+
+    assert booster.calls == 12
+    expected = recursive_forecast(model.get_booster(), histories, 12)
+    np.testing.assert_allclose(np.vstack(results), expected, rtol=1e-6)
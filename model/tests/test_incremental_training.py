@@ -0,0 +1,155 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+import optuna
+import pandas as pd
+import pytest
+from xgboost import XGBRegressor
+
+from model.pipeline.PipelineOrchestrator import PipelineOrchestrator
+from model.pipeline.timeseries.DataManager import DataManager
+from model.pipeline.timeseries.FeatureManager import FeatureManager
+from model.pipeline.timeseries.classes.XGBoostManager import XGBoostManager
+from model.repository.data_reel_timeseries_repository import DataReelTimeseriesRepository
+from model.repository.pipeline_watermark_repository import PipelineWatermarkRepository
+from model.services.logger_manager import LoggerManager
+from model.services.registry_manager import RegistryManager
+
+
+def orchestrator(**kwargs):
+    return PipelineOrchestrator(None, None, None, None, **kwargs)
+
+
+def champion(last_full_tune=None, trained_until='2025-01-01T00:00:00'):
+    results = {'RMSE': 1.0}
+    if trained_until:
+        results['trained_until'] = trained_until
+    if last_full_tune:
+        results['last_full_tune'] = last_full_tune.isoformat()
+    return SimpleNamespace(results=results)
+
+
+def test_training_mode_follows_retune_schedule():
+    recent = champion(datetime.now() - timedelta(days=1))
+    old = champion(datetime.now() - timedelta(days=10))
+
+    assert orchestrator().trainingMode(None) == 'full'
+    assert orchestrator().trainingMode(champion(trained_until=None)) == 'full'
+    assert orchestrator().trainingMode(recent) == 'incremental'
+    assert orchestrator().trainingMode(old) == 'full'
+    assert orchestrator(training_mode='full').trainingMode(recent) == 'full'
+    assert orchestrator(training_mode='incremental').trainingMode(old) == 'incremental'
+    # Le point de reprise full_tune prime sur la date enregistrée avec le champion
+    assert orchestrator().trainingMode(old, datetime.now() - timedelta(days=1)) == 'incremental'
+    assert orchestrator().trainingMode(recent, datetime.now() - timedelta(days=10)) == 'full'
+
+
+def ingest(session, start, hours, location_id='berlin'):
+    index = pd.date_range(start, periods=hours, freq='h')
+    elapsed = (index - pd.Timestamp('2025-01-01')) / pd.Timedelta('1h')  # série continue d'un appel à l'autre
+    DataReelTimeseriesRepository(session).insert_from_dataframe(pd.DataFrame({
+        'time': index,
+        'temperature_2m': 15 + 5 * np.sin(elapsed.values / 24 * 2 * np.pi),
+        'relative_humidity_2m': np.full(hours, 50.0),
+    }), location_id)
+
+
+def run_orchestrator(session, registry, model_id, location_id='berlin', **kwargs):
+    xgb = XGBoostManager(n_trials=2, registry=registry, location_id=location_id)
+    xgb.model_id = model_id
+    orchestrator = PipelineOrchestrator(DataManager(SimpleNamespace(session=session), location_id=location_id),
+                                        LoggerManager(session), FeatureManager(xgb), xgb, registry=registry, **kwargs)
+    orchestrator.run()
+    return LoggerManager(session).repository.filter(model_id=model_id).one()
+
+
+def test_incremental_model_is_scored_on_the_test_window(session, tmp_path, monkeypatch):
+    """
+    Modèles tunés et poursuivis sont notés par leur MSE sur la fenêtre de test (et non par le score
+    du parent) ; le tuning complet est daté par le point de reprise full_tune et un booster
+    poursuivi au-delà de max_rounds déclenche un nouveau tuning
+    """
+    monkeypatch.setattr('model.pipeline.timeseries.classes.XGBoostManager.match_val_predict',
+                        lambda *args: SimpleNamespace(savefig=lambda path: None))
+    registry = RegistryManager(tmp_path / 'registry', session)
+    ingest(session, '2025-01-01', 400)
+
+    parent = run_orchestrator(session, registry, 'XGBRegressor_full')
+    watermark = PipelineWatermarkRepository(session).get_value('full_tune:berlin')
+    assert parent.score == pytest.approx(parent.results['RMSE'] ** 2)
+    assert 'cv_score' in parent.results
+    assert watermark == datetime.fromisoformat(parent.results['last_full_tune'])
+
+    ingest(session, '2025-01-17 16:00', 48)
+    logged = run_orchestrator(session, registry, 'XGBRegressor_incremental')
+    assert logged.results['training_mode'] == 'incremental'
+    assert logged.results['base_model_id'] == parent.model_id
+    assert logged.score == pytest.approx(logged.results['RMSE'] ** 2)
+    assert logged.score != parent.score
+    assert PipelineWatermarkRepository(session).get_value('full_tune:berlin') == watermark
+
+    ingest(session, '2025-01-19 16:00', 48)
+    retuned = run_orchestrator(session, registry, 'XGBRegressor_retuned', max_rounds=1)
+    assert retuned.results['training_mode'] == 'full'
+
+
+def test_each_site_has_its_own_champion(session, tmp_path, monkeypatch):
+    """
+    Le champion d'un site n'est choisi que parmi ses propres modèles : un site sans modèle
+    est tuné sur ses données, sans poursuivre le champion d'un autre site, et la rétention
+    du registre ne déclasse pas le champion des autres sites
+    """
+    monkeypatch.setattr('model.pipeline.timeseries.classes.XGBoostManager.match_val_predict',
+                        lambda *args: SimpleNamespace(savefig=lambda path: None))
+    registry = RegistryManager(tmp_path / 'registry', session)
+    ingest(session, '2025-01-01', 400)
+    ingest(session, '2025-01-01', 400, 'paris')
+
+    berlin = run_orchestrator(session, registry, 'XGBRegressor_berlin')
+    paris = run_orchestrator(session, registry, 'XGBRegressor_paris', 'paris')
+
+    assert (berlin.location_id, paris.location_id) == ('berlin', 'paris')
+    assert paris.results['training_mode'] == 'full'
+    repository = LoggerManager(session).repository
+    assert repository.get_best_model('berlin').model_id == 'XGBRegressor_berlin'
+    assert repository.get_best_model('paris').model_id == 'XGBRegressor_paris'
+    assert repository.get_best_model('lyon') is None
+    assert registry.repository.get('XGBRegressor_berlin').status == 'champion'
+    assert registry.repository.get('XGBRegressor_paris').location_id == 'paris'
+    assert registry.metadata('XGBRegressor_paris')['location_id'] == 'paris'
+
+
+def test_warm_start_resets_continued_rounds():
+    """Le tuning amorcé par un champion poursuivi repart dans l'intervalle de tours exploré"""
+    xgb = XGBoostManager()
+    xgb.warm_start_params = {'n_lags': 2, 'n_estimators': 900, 'max_depth': 3, 'learning_rate': 0.1,
+                             'subsample': 1.0}
+    study = optuna.create_study()
+    xgb.enqueueWarmStart(study)
+
+    assert study.ask().suggest_int('n_estimators', *XGBoostManager.N_ESTIMATORS_RANGE) == 300
+
+
+def test_train_incremental_continues_champion_booster(monkeypatch):
+    """
+    L'entraînement incrémental ajoute des tours au booster du champion
+    au lieu de repartir de zéro
+    """
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame({'y_lag_1': rng.normal(size=200), 'y_lag_2': rng.normal(size=200)})
+    y = pd.Series(X['y_lag_1'] * 2 + rng.normal(0, 0.1, 200))
+    base = XGBRegressor(n_estimators=30, max_depth=3, random_state=42).fit(X[:150], y[:150])
+
+    xgb = XGBoostManager()
+    xgb.params = {'n_lags': 2, 'n_estimators': 30, 'max_depth': 3, 'learning_rate': 0.1, 'subsample': 1.0}
+    monkeypatch.setattr(xgb, 'loadModel', lambda model_id: setattr(xgb, 'model', base))
+
+    xgb.trainIncremental(X[150:], y[150:], 'XGBRegressor_champion', n_rounds=10)
+
+    assert xgb.model.get_booster().num_boosted_rounds() == 40
+    assert xgb.params['n_estimators'] == 40
+    # Les 30 premiers tours sont ceux du champion
+    np.testing.assert_allclose(
+        xgb.model.predict(X, iteration_range=(0, 30)), base.predict(X), rtol=1e-6
+    )
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+from feature_engine.timeseries.forecasting import LagFeatures
+from sklearn.model_selection import TimeSeriesSplit
+
+from model.pipeline.timeseries.FeatureManager import FeatureManager
+from model.pipeline.timeseries.classes.LagMatrix import LagMatrix
+
+
+def series(rows, start='2025-01-01', exogenous=False):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({'y': rng.normal(10, 5, rows).astype(np.float32)},
+                      index=pd.date_range(start, periods=rows, freq='3h', name='ds'))
+    if exogenous:
+        df['relative_humidity_2m'] = rng.uniform(20, 100, rows)
+    return df
+
+
+def legacy_lagger(train, test, n_lags):
+    """Implémentation historique de FeatureManager.lagger (feature_engine)"""
+    lagger = LagFeatures(variables=['y'], periods=list(range(1, n_lags + 1)), sort_index=False)
+    train_lagger = lagger.fit_transform(train).dropna()
+    test_lagger = lagger.transform(pd.concat([train.tail(n_lags), test])).iloc[n_lags:].dropna()
+    return (train_lagger.drop(columns=['y']), train_lagger['y'],
+            test_lagger.drop(columns=['y']), test_lagger['y'])
+
+
+@pytest.mark.parametrize('n_lags', [1, 4, 10])
+def test_lagger_matches_lag_features(n_lags):
+    """
+    FeatureManager.lagger produit exactement la sortie de LagFeatures + dropna
+    """
+    full = series(200)
+    train, test = full.iloc[:150], full.iloc[150:]
+
+    for expected, result in zip(legacy_lagger(train, test, n_lags), FeatureManager(None).lagger(train, test, n_lags)):
+        if isinstance(expected, pd.DataFrame):
+            pd.testing.assert_frame_equal(result, expected)
+        else:
+            pd.testing.assert_series_equal(result, expected)
+
+
+def test_fold_slices_match_lag_features():
+    """
+    Les tranches utilisées par le tuning (plis TimeSeriesSplit, variables exogènes)
+    sont celles que LagFeatures calcule pli par pli
+    """
+    train = series(300, exogenous=True).reset_index(drop=True)
+    train.loc[120, 'relative_humidity_2m'] = np.nan
+    lag_matrix = LagMatrix(train, max_lags=10)
+
+    for n_lags in (2, 7):
+        for train_idx, val_idx in TimeSeriesSplit(n_splits=3).split(train):
+            train_tss, val_tss = train.iloc[train_idx], train.iloc[val_idx]
+            X_train, y_train, X_val, y_val = legacy_lagger(train_tss, val_tss, n_lags)
+
+            X, y = lag_matrix.arrays(n_lags, train_idx[0], train_idx[-1] + 1)
+            np.testing.assert_array_equal(X, X_train.to_numpy())
+            np.testing.assert_array_equal(y, y_train.to_numpy())
+
+            X, y = lag_matrix.arrays(n_lags, val_idx[0], val_idx[-1] + 1)
+            np.testing.assert_array_equal(X, X_val.to_numpy())
+            np.testing.assert_array_equal(y, y_val.to_numpy())
+
+
+def test_arrays_are_views_without_missing_values():
+    lag_matrix = LagMatrix(series(50), max_lags=5)
+    X, y = lag_matrix.arrays(3, 10, 40)
+    assert np.shares_memory(X, lag_matrix.lags)
+    assert np.shares_memory(y, lag_matrix.y)
@@ -0,0 +1,50 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from model.entity.data_predict_timeseries import DataPredictTimeseries
+from model.entity.latest_prediction import LatestPrediction
+from model.repository.latest_prediction_repository import LatestPredictionRepository
+
+
+def predict_frame(start, periods, value):
+    return pd.DataFrame({
+        'ds': pd.date_range(start, periods=periods, freq='3h'),
+        'y': np.full(periods, value, dtype=np.float32)
+    })
+
+
+def test_upsert_keeps_one_row_per_timestamp(session):
+    """
+    Un nouveau run remplace les prédictions des timestamps communs et ajoute les nouveaux
+    """
+    repository = LatestPredictionRepository(session)
+
+    repository.upsert_from_dataframe(predict_frame('2025-06-20', 8, 10.0), 'XGBRegressor_1', 'run-1')
+    repository.upsert_from_dataframe(predict_frame('2025-06-20 12:00', 8, 20.0), 'XGBRegressor_2', 'run-2')
+
+    rows = session.query(LatestPrediction).order_by(LatestPrediction.ds).all()
+
+    assert len(rows) == 12
+    assert rows[0].y == 10.0 and rows[0].run_id == 'run-1'
+    assert rows[4].y == 20.0 and rows[4].model_id == 'XGBRegressor_2'
+
+
+def test_rebuild_from_history(session):
+    """
+    La reconstruction retient la prédiction la plus récente de chaque timestamp
+    """
+    ds = datetime(2025, 6, 20)
+    session.add_all([
+        DataPredictTimeseries(ds=ds, y=1.0, model_id='old', created_at=datetime(2025, 6, 1)),
+        DataPredictTimeseries(ds=ds, y=2.0, model_id='new', created_at=datetime(2025, 6, 2)),
+    ])
+    session.commit()
+
+    repository = LatestPredictionRepository(session)
+    assert repository.is_empty()
+    repository.rebuild_from_history()
+
+    rows = session.query(LatestPrediction).all()
+    assert [(row.y, row.model_id) for row in rows] == [(2.0, 'new')]
@@ -0,0 +1,24 @@
+import os
+
+from model.helpers.location_helper import run_by_location
+
+
+def square_or_fail(location: dict) -> tuple:
+    if location['location_id'] == 'broken':
+        raise RuntimeError("API indisponible")
+    return location['value'] ** 2, os.getpid()
+
+
+def test_failures_are_isolated_per_location():
+    """
+    Les sites sont traités dans des processus séparés ; l'échec d'un site
+    est retourné à sa place sans interrompre les autres
+    """
+    locations = [{'location_id': f'site_{k}', 'value': k} for k in range(6)]
+    locations.insert(2, {'location_id': 'broken', 'value': 0})
+
+    results = run_by_location(square_or_fail, locations, max_workers=2)
+
+    assert isinstance(results.pop('broken'), RuntimeError)
+    assert {location_id: value for location_id, (value, _) in results.items()} == {f'site_{k}': k ** 2 for k in range(6)}
+    assert os.getpid() not in {pid for _, pid in results.values()}
@@ -0,0 +1,98 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import IntegrityError
+
+from model.repository.logging_timeseries_repository import LoggingTimeseriesRepository
+from model.services.database_manager import DatabaseManager
+
+
+def test_upgrade_fresh_database(tmp_path):
+    """
+    Les migrations créent toutes les tables et les index sur une base vide
+    """
+    db_manager = DatabaseManager()
+    db_manager.connect_sqlite(str(tmp_path / "fresh.db"))
+    db_manager.upgrade_schema()
+
+    inspector = inspect(db_manager.engine)
+    assert {'data_reel_timeseries', 'data_process_timeseries', 'data_predict_timeseries',
+            'logging_timeseries', 'latest_prediction', 'pipeline_watermark', 'model_registry',
+            'location', 'pipeline_run_metric'} <= set(inspector.get_table_names())
+
+    predict_indexes = {index['name'] for index in inspector.get_indexes('data_predict_timeseries')}
+    assert {'ix_data_predict_timeseries_location_id_ds_created_at', 'ix_data_predict_timeseries_model_id_ds'} <= predict_indexes
+    assert inspector.get_pk_constraint('latest_prediction')['constrained_columns'] == ['location_id', 'ds']
+    assert {'is_notebook', 'location_id'} <= {column['name'] for column in inspector.get_columns('logging_timeseries')}
+    assert 'ix_logging_timeseries_location_id_is_notebook_score' in \
+        {index['name'] for index in inspector.get_indexes('logging_timeseries')}
+    assert 'ix_model_registry_location_id_status_created_at' in \
+        {index['name'] for index in inspector.get_indexes('model_registry')}
+    db_manager.close()
+
+
+def test_upgrade_existing_database_in_place(tmp_path):
+    """
+    Une base créée par l'ancien create_all est mise à niveau sans perte,
+    et les runs de notebook sont marqués par la nouvelle colonne
+    """
+    db_path = tmp_path / "legacy.db"
+    with sqlite3.connect(db_path) as connection:
+        connection.execute(
+            "CREATE TABLE logging_timeseries (id INTEGER PRIMARY KEY, timestamp DATETIME, model VARCHAR, "
+            "model_id VARCHAR UNIQUE, score FLOAT, params JSON, results JSON)"
+        )
+        connection.execute(
+            "INSERT INTO logging_timeseries (model, model_id, score) VALUES "
+            "('XGBRegressor', 'notebook_XGBRegressor20250101', 0.5), "
+            "('XGBRegressor', 'XGBRegressor_20250101000000', 1.5)"
+        )
+
+    db_manager = DatabaseManager()
+    db_manager.connect_sqlite(str(db_path))
+    db_manager.upgrade_schema()
+
+    flags = dict(db_manager.session.execute(text("SELECT model_id, is_notebook FROM logging_timeseries")).all())
+    assert flags == {'notebook_XGBRegressor20250101': 1, 'XGBRegressor_20250101000000': 0}
+
+    # Modèles existants rattachés au site historique
+    champion = LoggingTimeseriesRepository(db_manager.session).get_best_model('berlin')
+    assert champion.model_id == 'XGBRegressor_20250101000000'
+    assert LoggingTimeseriesRepository(db_manager.session).get_best_model('paris') is None
+    db_manager.close()
+
+
+def test_location_upgrade_keeps_existing_series(tmp_path):
+    """
+    Les séries existantes sont rattachées au site historique et l'unicité
+    porte désormais sur (location_id, date) : deux sites peuvent partager un timestamp
+    """
+    db_manager = DatabaseManager()
+    db_manager.connect_sqlite(str(tmp_path / "sites.db"))
+    db_manager.upgrade_schema('0004')
+    db_manager.session.execute(text(
+        "INSERT INTO data_reel_timeseries (time, temperature_2m) VALUES ('2025-01-01 00:00:00.000000', 1.0)"
+    ))
+    db_manager.session.execute(text(
+        "INSERT INTO latest_prediction (ds, y, model_id, run_id) VALUES ('2025-01-02 00:00:00.000000', 2.0, 'm', 'r')"
+    ))
+    db_manager.session.commit()
+
+    db_manager.upgrade_schema()
+
+    session = db_manager.session
+    assert session.execute(text("SELECT location_id FROM data_reel_timeseries")).scalar_one() == 'berlin'
+    assert session.execute(text("SELECT location_id, y FROM latest_prediction")).one() == ('berlin', 2.0)
+    assert session.execute(text("SELECT latitude, longitude FROM location WHERE location_id = 'berlin'")).one() == (52.52, 13.41)
+
+    session.execute(text(
+        "INSERT INTO data_reel_timeseries (location_id, time, temperature_2m) "
+        "VALUES ('paris', '2025-01-01 00:00:00.000000', 5.0)"
+    ))
+    with pytest.raises(IntegrityError):
+        session.execute(text(
+            "INSERT INTO data_reel_timeseries (location_id, time, temperature_2m) "
+            "VALUES ('paris', '2025-01-01 00:00:00.000000', 6.0)"
+        ))
+    db_manager.close()
@@ -0,0 +1,109 @@
+import sqlite3
+import threading
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from model.entity.data_reel_timeseries import DataReelTimeseries
+from model.repository.pipeline_watermark_repository import PipelineWatermarkRepository
+from model.services.open_meteo_backfill import OpenMeteoBackfill
+from model.services.open_meteo_cache import OpenMeteoDayCache
+from model.tests.open_meteo_stand_in import OpenMeteoStandIn, hourly_values
+
+LOCATION = {'location_id': 'berlin', 'latitude': 52.52, 'longitude': 13.41}
+
+
+def stored_series(session) -> pd.DataFrame:
+    return pd.read_sql(session.query(DataReelTimeseries.time, DataReelTimeseries.temperature_2m)
+                       .order_by(DataReelTimeseries.time).statement, session.bind)
+
+
+def test_chunks_are_fetched_concurrently_and_retried(session):
+    """Toutes les heures de la période sont écrites une fois, malgré une tranche en erreur 503 à réessayer"""
+    with OpenMeteoStandIn(latency=0.05, failures={'2024-01-11': 2}) as stand_in:
+        backfill = OpenMeteoBackfill(session, LOCATION, chunk_days=10, concurrency=3, rate_limit=0,
+                                     backoff=0.01, base_url=stand_in.url)
+        rows = backfill.backfill(date(2024, 1, 1), date(2024, 1, 31))
+
+    assert rows == 31 * 24
+    assert len(stand_in.requests) == 4 + 2
+
+    df = stored_series(session)
+    expected = pd.date_range('2024-01-01', periods=31 * 24, freq='h')
+    assert (pd.to_datetime(df['time']).values == expected.values).all()
+    temperature, _ = hourly_values(LOCATION['latitude'], int(expected[0].timestamp()), len(expected))
+    np.testing.assert_allclose(df['temperature_2m'].values, temperature, rtol=1e-6)
+
+    watermark = PipelineWatermarkRepository(session).get_value(backfill.watermark_name)
+    assert watermark == datetime(2024, 1, 31)
+
+
+def test_interrupted_backfill_resumes_without_duplicates(session):
+    """Après une tranche en échec, la reprise repart du point de reprise sans doublon ni téléchargement déjà fait"""
+    with OpenMeteoStandIn(failures={'2024-01-11': 10}) as stand_in:
+        backfill = OpenMeteoBackfill(session, LOCATION, chunk_days=10, rate_limit=0, retries=1,
+                                     backoff=0.01, base_url=stand_in.url)
+        with pytest.raises(Exception):
+            backfill.backfill(date(2024, 1, 1), date(2024, 1, 31))
+
+        # Les tranches réussies sont conservées, le point de reprise s'arrête avant le trou
+        assert session.query(DataReelTimeseries).count() == (31 - 10) * 24
+        assert backfill.resume_date(date(2024, 1, 1)) == date(2024, 1, 11)
+
+        stand_in.failures.clear()
+        stand_in.requests.clear()
+        backfill.backfill(date(2024, 1, 1), date(2024, 1, 31))
+
+    # Tranches après le trou réécrites depuis le cache journalier : seule la tranche en échec est redemandée
+    assert [request['start_date'] for request in stand_in.requests] == ['2024-01-11']
+    assert session.query(DataReelTimeseries).count() == 31 * 24
+    assert backfill.backfill(date(2024, 1, 1), date(2024, 1, 31)) == 0
+
+
+def test_unpublished_days_are_fetched_again(session):
+    """
+    Les derniers jours sans valeur (pas encore publiés) sont écrits mais restent après le point de reprise :
+    le passage suivant ne redemande qu'eux et complète les lignes en place
+    """
+    # Cache traitant tous les jours comme récents
+    cache = OpenMeteoDayCache(ttl=60, recent_days=100000)
+    with OpenMeteoStandIn(published_until=date(2024, 1, 25)) as stand_in:
+        backfill = OpenMeteoBackfill(session, LOCATION, chunk_days=10, rate_limit=0, base_url=stand_in.url,
+                                     cache=cache)
+        assert backfill.backfill(date(2024, 1, 1), date(2024, 1, 31)) == 31 * 24
+        assert PipelineWatermarkRepository(session).get_value(backfill.watermark_name) == datetime(2024, 1, 25)
+
+        stand_in.published_until = None
+        stand_in.requests.clear()
+        cache.connection.execute("UPDATE day_block SET fetched_at = fetched_at - 120")
+        cache.connection.commit()
+        assert backfill.backfill(date(2024, 1, 1), date(2024, 1, 31)) == 6 * 24
+
+    assert [request['start_date'] for request in stand_in.requests] == ['2024-01-26']
+    assert PipelineWatermarkRepository(session).get_value(backfill.watermark_name) == datetime(2024, 1, 31)
+    assert session.query(DataReelTimeseries).count() == 31 * 24
+    assert session.query(DataReelTimeseries).filter(DataReelTimeseries.temperature_2m.is_(None)).count() == 0
+
+
+def test_writes_run_off_the_event_loop_and_cache_is_closed(session, monkeypatch):
+    """
+    Les tranches sont écrites dans un thread (la boucle d'événements continue les téléchargements),
+    et le cache ouvert par la récupération est fermé à la sortie du contexte
+    """
+    writers = []
+    write_chunk = OpenMeteoBackfill.write_chunk
+
+    def recording_write_chunk(self, *args):
+        writers.append(threading.get_ident())
+        return write_chunk(self, *args)
+
+    monkeypatch.setattr(OpenMeteoBackfill, 'write_chunk', recording_write_chunk)
+    with OpenMeteoStandIn() as stand_in:
+        with OpenMeteoBackfill(session, LOCATION, chunk_days=10, rate_limit=0, base_url=stand_in.url) as backfill:
+            assert backfill.backfill(date(2024, 1, 1), date(2024, 1, 31)) == 31 * 24
+
+    assert len(writers) == 4 and threading.get_ident() not in writers
+    with pytest.raises(sqlite3.ProgrammingError):
+        backfill.cache.connection.execute("SELECT 1")
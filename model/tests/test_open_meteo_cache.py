@@ -0,0 +1,45 @@
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from model.services.open_meteo_cache import OpenMeteoDayCache
+
+VARIABLES = ['temperature_2m', 'relative_humidity_2m']
+
+
+def hourly_frame(start: date, days: int) -> pd.DataFrame:
+    time_index = pd.date_range(start, periods=days * 24, freq='h')
+    return pd.DataFrame({'time': time_index,
+                         'temperature_2m': np.arange(len(time_index), dtype=np.float32),
+                         'relative_humidity_2m': np.full(len(time_index), 50, dtype=np.float32)})
+
+
+def test_overlapping_period_only_misses_uncached_days(tmp_path):
+    """Une période chevauchant des jours en cache n'a que ses jours absents à télécharger"""
+    cache = OpenMeteoDayCache(str(tmp_path / 'cache.sqlite'))
+    cache.store(52.52, 13.41, hourly_frame(date(2024, 1, 1), 10))
+
+    assert cache.missing_ranges(52.52, 13.41, VARIABLES, date(2024, 1, 3), date(2024, 1, 8)) == []
+    assert cache.missing_ranges(52.52, 13.41, VARIABLES, date(2023, 12, 30), date(2024, 1, 12)) == [
+        (date(2023, 12, 30), date(2023, 12, 31)), (date(2024, 1, 11), date(2024, 1, 12))]
+    # Autre site : rien en cache
+    assert cache.missing_ranges(48.85, 2.35, VARIABLES, date(2024, 1, 3), date(2024, 1, 3)) == [
+        (date(2024, 1, 3), date(2024, 1, 3))]
+
+    df = cache.load(52.52, 13.41, VARIABLES, date(2024, 1, 3), date(2024, 1, 4))
+    expected = hourly_frame(date(2024, 1, 1), 10).iloc[48:96].reset_index(drop=True)
+    pd.testing.assert_frame_equal(df, expected)
+
+
+def test_recent_days_expire_and_past_days_are_permanent(tmp_path):
+    """Les jours récents suivent le TTL, les jours anciens n'expirent jamais"""
+    cache = OpenMeteoDayCache(str(tmp_path / 'cache.sqlite'), ttl=3600, recent_days=7)
+    today = date.today()
+    cache.store(52.52, 13.41, hourly_frame(today - timedelta(days=20), 20))
+
+    # Récupération datée d'il y a deux heures : TTL dépassé
+    cache.connection.execute("UPDATE day_block SET fetched_at = ?", (time.time() - 7200,))
+    missing = cache.missing_ranges(52.52, 13.41, VARIABLES, today - timedelta(days=20), today - timedelta(days=1))
+    assert missing == [(today - timedelta(days=7), today - timedelta(days=1))]
@@ -0,0 +1,103 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+from xgboost import XGBRegressor
+
+from model.entity.latest_prediction import LatestPrediction
+from model.pipeline.PipelineRunner import PipelineRunner
+from model.pipeline.timeseries.DataManager import DataManager
+from model.pipeline.timeseries.classes.XGBoostManager import XGBoostManager
+from model.repository.data_reel_timeseries_repository import DataReelTimeseriesRepository
+from model.repository.pipeline_run_metric_repository import PipelineRunMetricRepository
+from model.services.logger_manager import LoggerManager
+from model.services.step_cache import StepCache
+
+
+def ingest(session, location_id, hours=400):
+    index = pd.date_range('2025-01-01', periods=hours, freq='h')
+    DataReelTimeseriesRepository(session).insert_from_dataframe(pd.DataFrame({
+        'time': index,
+        'temperature_2m': 15 + 5 * np.sin(np.arange(hours) / 24 * 2 * np.pi),
+        'relative_humidity_2m': np.full(hours, 50.0),
+    }), location_id)
+
+
+def fail(*args):
+    raise AssertionError(args)
+
+
+def trained_model(session, location_id, n_lags=3):
+    """Modèle tout juste entraîné sur un site et journalisé comme son champion"""
+    rng = np.random.default_rng(0)
+    columns = [f'y_lag_{k}' for k in range(1, n_lags + 1)]
+    X = pd.DataFrame(rng.normal(15, 5, size=(200, n_lags)), columns=columns)
+    trained = XGBoostManager(location_id=location_id)
+    trained.model = XGBRegressor(n_estimators=10, max_depth=2).fit(X, X['y_lag_1'])
+    LoggerManager(session).log_training('XGBRegressor', 1.0, {'n_lags': n_lags}, {}, trained.model_id,
+                                        location_id=location_id)
+    return trained
+
+
+def test_sites_are_predicted_with_their_own_champion_in_memory(session, monkeypatch):
+    """
+    Les données préparées une seule fois et le modèle tout juste entraîné sur chaque site (son champion)
+    alimentent les prédictions du site, sans relecture du registre ni nouvelle sauvegarde ;
+    un site sans champion ou dont l'entraînement a échoué est en échec sans bloquer les autres
+    """
+    locations = [{'location_id': location_id} for location_id in ('berlin', 'lyon', 'nice', 'paris')]
+    for location in locations:
+        ingest(session, location['location_id'])
+    berlin, paris = trained_model(session, 'berlin'), trained_model(session, 'paris', n_lags=2)
+
+    runner = PipelineRunner(SimpleNamespace(session=session), fetch=False)
+    frames = runner.prepareData(locations)
+    assert sorted(frames) == ['berlin', 'lyon', 'nice', 'paris']
+
+    monkeypatch.setattr(runner.registry, 'load', fail)
+    monkeypatch.setattr('model.pipeline.timeseries.DataManager.DataManager.saveData', fail)
+    failure = RuntimeError("tuning interrompu")
+    results = runner.predict(frames, {'berlin': berlin, 'lyon': XGBoostManager(location_id='lyon'),
+                                      'nice': failure, 'paris': paris})
+
+    assert results['berlin'].startswith(berlin.model_id + '_')
+    assert results['paris'].startswith(paris.model_id + '_')
+    assert isinstance(results['lyon'], RuntimeError) and 'lyon' in str(results['lyon'])
+    assert results['nice'] is failure
+    for location_id, model_id in (('berlin', berlin.model_id), ('paris', paris.model_id)):
+        rows = session.query(LatestPrediction).filter_by(location_id=location_id)
+        assert rows.count() == 120 and {row.model_id for row in rows} == {model_id}
+        # Mesures des prédictions, rattachées au champion du site
+        stages = [(row.location_id, row.stage) for row in PipelineRunMetricRepository(session).get_by_model(model_id)]
+        assert sorted(stages) == [(location_id, 'forecast'), (location_id, 'save')]
+    assert session.query(LatestPrediction).filter(LatestPrediction.location_id.in_(['lyon', 'nice'])).count() == 0
+
+
+def test_unchanged_cycle_skips_predictions(session, tmp_path, monkeypatch):
+    """Avec le cache des étapes, un second cycle sans nouvelle donnée ne recalcule aucune prédiction"""
+    ingest(session, 'berlin')
+    trained = {'berlin': trained_model(session, 'berlin')}
+
+    runner = PipelineRunner(SimpleNamespace(session=session), fetch=False, step_cache=StepCache(tmp_path))
+    runner.predict(runner.prepareData([{'location_id': 'berlin'}]), trained)
+
+    monkeypatch.setattr(XGBoostManager, 'forecast', fail)
+    monkeypatch.setattr(DataManager, 'loadData', fail)
+    results = runner.predict(runner.prepareData([{'location_id': 'berlin'}]), trained)
+
+    assert not isinstance(results['berlin'], Exception)
+    assert runner.step_cache.hits == {'prepare_berlin': 1, 'predict_berlin': 1}
+
+
+def test_batch_evaluation_writes_no_plot(monkeypatch):
+    """L'évaluation des prédictions batch (stratégie proxy) n'enregistre aucun graphique"""
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(15, 5, size=(50, 3)), columns=['y_lag_1', 'y_lag_2', 'y_lag_3'],
+                     index=pd.date_range('2025-01-01', periods=50, freq='3h'))
+    xgb = XGBoostManager()
+    xgb.model = XGBRegressor(n_estimators=10, max_depth=2).fit(X, X['y_lag_1'])
+    monkeypatch.setattr('model.pipeline.timeseries.classes.XGBoostManager.match_val_predict', fail)
+
+    results, predict = xgb.eval(X, X['y_lag_1'], plot=False)
+
+    assert len(predict) == 50 and 'RMSE' in results
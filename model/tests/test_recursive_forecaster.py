@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+from xgboost import XGBRegressor
+
+from model.pipeline.timeseries.classes.RecursiveForecaster import RecursiveForecaster
+from model.pipeline.timeseries.classes.XGBoostManager import XGBoostManager
+
+
+def lag_model(n_lags: int) -> XGBRegressor:
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(15, 5, size=(400, n_lags)), columns=[f'y_lag_{k}' for k in range(1, n_lags + 1)])
+    return XGBRegressor(n_estimators=40, max_depth=3).fit(X, 0.7 * X['y_lag_1'] + 0.2 * X['y_lag_2'] + 1)
+
+
+def test_batched_forecast_matches_step_by_step_loop():
+    """
+    Plusieurs séries prédites ensemble donnent le même résultat qu'une boucle
+    naïve série par série où chaque prédiction est réinjectée comme lag 1
+    """
+    model = lag_model(4)
+    histories = np.random.default_rng(1).normal(15, 5, size=(5, 4)).astype(np.float32)
+
+    forecaster = RecursiveForecaster(model.get_booster(), 4)
+    result = forecaster.forecast(histories, 10)
+
+    assert result.shape == (5, 10)
+    for row, history in enumerate(histories):
+        window = list(history)
+        for step in range(10):
+            features = pd.DataFrame([window], columns=[f'y_lag_{k}' for k in range(1, 5)], dtype=np.float32)
+            prediction = model.predict(features)[0]
+            assert result[row, step] == pytest.approx(prediction, rel=1e-5)
+            window = [prediction] + window[:-1]
+
+
+def test_manager_forecast_uses_last_observations():
+    """XGBoostManager.forecast part des dernières valeurs de la série (lag 1 = la plus récente)"""
+    model = lag_model(3)
+    dates = pd.date_range('2024-01-01', periods=8, freq='3h')
+    y = pd.Series([10.0, 11.0, 12.0, 13.0, 14.0, 15.0], index=dates[:6] - pd.Timedelta(days=1))
+
+    xgb = XGBoostManager()
+    xgb.model = model
+    predict = xgb.forecast(y, dates)
+
+    expected = RecursiveForecaster(model.get_booster(), 3).forecast(np.array([15.0, 14.0, 13.0]), 8)[0]
+    assert list(predict['ds']) == list(dates)
+    np.testing.assert_allclose(predict['y'].values, expected)
+
+    with pytest.raises(ValueError):
+        xgb.forecast(y.iloc[:2], dates)
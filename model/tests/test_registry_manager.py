@@ -0,0 +1,86 @@
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from xgboost import XGBRegressor
+
+from model.services.registry_manager import RegistryManager
+
+
+@pytest.fixture
+def registry(tmp_path):
+    RegistryManager.clear_cache()
+    yield RegistryManager(tmp_path)
+    RegistryManager.clear_cache()
+
+
+@pytest.fixture
+def model():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(100, 3)), columns=['y_lag_1', 'y_lag_2', 'y_lag_3'])
+    return XGBRegressor(n_estimators=10, max_depth=3).fit(X, X['y_lag_1'] * 2), X
+
+
+def test_save_and_load_native_booster(registry, model):
+    """
+    Le booster est stocké en UBJSON avec ses métadonnées, puis rechargé à l'identique
+    et servi depuis le cache aux chargements suivants
+    """
+    regressor, X = model
+    metadata = registry.save(regressor, 'XGBRegressor_1', {'n_lags': 3})
+
+    assert registry.model_path('XGBRegressor_1').exists()
+    assert metadata['feature_names'] == ['y_lag_1', 'y_lag_2', 'y_lag_3']
+    assert registry.metadata('XGBRegressor_1')['n_lags'] == 3
+
+    loaded = registry.load('XGBRegressor_1')
+    np.testing.assert_allclose(loaded.predict(X), regressor.predict(X))
+    assert registry.load('XGBRegressor_1') is loaded
+
+
+def test_load_rejects_corrupted_artifact(registry, model):
+    registry.save(model[0], 'XGBRegressor_2')
+    with open(registry.model_path('XGBRegressor_2'), 'ab') as file:
+        file.write(b'\0')
+
+    with pytest.raises(ValueError):
+        registry.load('XGBRegressor_2')
+
+
+def test_load_falls_back_to_joblib(registry, model):
+    regressor, X = model
+    joblib.dump(regressor, registry.legacy_path('XGBRegressor_3'))
+
+    np.testing.assert_allclose(registry.load('XGBRegressor_3').predict(X), regressor.predict(X))
+
+
+def test_retention_keeps_champion_and_recent_challengers(tmp_path, session, model):
+    """
+    L'index résout les artefacts par model_id ; la rétention garde le champion du site
+    et ses N challengers les plus récents, et supprime les fichiers des autres modèles du site
+    """
+    RegistryManager.clear_cache()
+    registry = RegistryManager(tmp_path / "registry", session=session, image_directory=tmp_path / "output")
+    (tmp_path / "output").mkdir()
+    # Modèles d'un autre site, plus anciens : hors de la rétention de berlin
+    registry.save(model[0], 'XGBRegressor_paris_0', location_id='paris')
+    registry.save(model[0], 'XGBRegressor_paris_1', location_id='paris')
+    registry.apply_retention('XGBRegressor_paris_1', keep_challengers=0, location_id='paris')
+    for index in range(5):
+        (tmp_path / "output" / f"XGBRegressor_{index}.png").write_bytes(b'png')
+        registry.save(model[0], f"XGBRegressor_{index}", {'metrics': {'RMSE': float(index)}})
+
+    deleted = registry.apply_retention('XGBRegressor_0', keep_challengers=2)
+
+    assert sorted(deleted) == ['XGBRegressor_1', 'XGBRegressor_2']
+    assert sorted(path.name for path in (tmp_path / "registry").glob("*.ubj")) == \
+        ['XGBRegressor_0.ubj', 'XGBRegressor_3.ubj', 'XGBRegressor_4.ubj', 'XGBRegressor_paris_1.ubj']
+    assert not (tmp_path / "output" / "XGBRegressor_1.png").exists()
+
+    entry = registry.repository.get('XGBRegressor_0')
+    assert entry.status == 'champion' and entry.metrics == {'RMSE': 0.0}
+    assert registry.repository.get('XGBRegressor_1').status == 'deleted'
+    assert registry.repository.get('XGBRegressor_paris_1').status == 'champion'
+    assert registry.repository.get('XGBRegressor_paris_0').status == 'deleted'
+    assert registry.load('XGBRegressor_4') is not None
+    RegistryManager.clear_cache()
@@ -0,0 +1,53 @@
+import sys
+
+import numpy as np
+import pytest
+from prometheus_client.parser import text_string_to_metric_families
+
+from model.repository.pipeline_run_metric_repository import PipelineRunMetricRepository
+from model.services.logger_manager import LoggerManager
+from model.services.stage_metrics import StageMetrics
+
+
+def test_stages_are_saved_with_the_model_and_exported(session, tmp_path):
+    """
+    Chaque étape est mesurée, y compris celle interrompue par une erreur ;
+    les mesures sont rattachées au modèle du run et exportées au format Prometheus
+    """
+    LoggerManager(session).log_training('XGBRegressor', 1.0, {}, {}, 'XGBRegressor_1')
+    metrics = StageMetrics('orchestrator', 'paris', directory=tmp_path)
+
+    with metrics.stage('prepare') as stage:
+        stage['rows'] = sum(range(10 ** 5))  # quelques millisecondes de CPU
+    with pytest.raises(ValueError):
+        with metrics.stage('training', rows=42):
+            raise ValueError("échec")
+    metrics.model_id = 'XGBRegressor_1'
+    metrics.publish(session)
+
+    saved = PipelineRunMetricRepository(session).get_by_model('XGBRegressor_1')
+    assert [(row.stage, row.status, row.location_id) for row in saved] == [
+        ('prepare', 'ok', 'paris'), ('training', 'error', 'paris')]
+    assert saved[1].rows == 42
+    assert all(row.wall_seconds >= 0 and row.cpu_seconds >= 0 and row.run_id == metrics.run_id for row in saved)
+
+    families = {family.name: family for family in
+                text_string_to_metric_families((tmp_path / 'orchestrator_paris.prom').read_text())}
+    success = {sample.labels['stage']: sample.value for sample in families['pipeline_stage_success'].samples}
+    assert success == {'prepare': 1.0, 'training': 0.0}
+    assert families['pipeline_run_info'].samples[0].labels['model_id'] == 'XGBRegressor_1'
+    assert {sample.labels['stage'] for sample in families['pipeline_stage_wall_seconds'].samples} == {'prepare', 'training'}
+
+
+@pytest.mark.skipif(sys.platform != 'linux', reason="pic de RSS par étape via /proc")
+def test_peak_rss_is_measured_per_stage():
+    """La hausse du pic de RSS est propre à chaque étape, même après une étape plus gourmande"""
+    metrics = StageMetrics('orchestrator')
+    with metrics.stage('large'):
+        np.ones(64 * 2 ** 20 // 8).sum()  # 64 Mo
+    with metrics.stage('small'):
+        np.ones(16 * 2 ** 20 // 8).sum()  # 16 Mo
+
+    large, small = (record['rss_peak_delta_bytes'] for record in metrics.records)
+    assert large >= 48 * 2 ** 20
+    assert 8 * 2 ** 20 <= small < 48 * 2 ** 20
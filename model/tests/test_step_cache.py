@@ -0,0 +1,70 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from model.pipeline.timeseries.DataManager import DataManager
+from model.repository.data_reel_timeseries_repository import DataReelTimeseriesRepository
+from model.repository.pipeline_watermark_repository import PipelineWatermarkRepository
+from model.services.step_cache import StepCache
+
+
+def ingest(session, start, hours):
+    index = pd.date_range(start, periods=hours, freq='h')
+    DataReelTimeseriesRepository(session).insert_from_dataframe(pd.DataFrame({
+        'time': index,
+        'temperature_2m': np.arange(hours, dtype=float),
+        'relative_humidity_2m': np.full(hours, 50.0),
+    }))
+
+
+def test_outputs_are_stored_by_fingerprint_and_pruned(tmp_path):
+    """Sorties relues par empreinte (Parquet ou JSON), seules les keep dernières sont conservées"""
+    cache = StepCache(tmp_path, keep=2)
+    df = pd.DataFrame({'ds': pd.date_range('2025-01-01', periods=3, freq='3h'), 'y': [1.0, 2.0, 3.0]})
+
+    assert cache.load('prepare', 'a') is None
+    cache.save('prepare', 'a', df)
+    cache.save('train', 'a', {'model_id': 'XGBRegressor_1'})
+    pd.testing.assert_frame_equal(cache.load('prepare', 'a'), df)
+    assert cache.load('train', 'a') == {'model_id': 'XGBRegressor_1'}
+    assert cache.hits == {'prepare': 1, 'train': 1} and cache.misses == {'prepare': 1}
+
+    cache.save('prepare', 'b', df)
+    cache.save('prepare', 'c', df)
+    assert sorted(path.name for path in (tmp_path / 'prepare').iterdir()) == ['b.parquet', 'c.parquet']
+    assert StepCache.fingerprint(a=1, b=datetime(2025, 1, 1)) == StepCache.fingerprint(b=datetime(2025, 1, 1), a=1)
+
+
+def test_prepare_data_is_skipped_until_raw_data_changes(session, tmp_path, monkeypatch):
+    """
+    Données brutes inchangées : les données préparées sont relues sans chargement ;
+    nouvelles lignes ou lignes réécrites (date de dernière écriture) invalident l'empreinte
+    """
+    ingest(session, '2025-01-01', 48)
+    data_manager = DataManager(SimpleNamespace(session=session), step_cache=StepCache(tmp_path))
+    first = data_manager.prepareData()
+
+    loads = []
+    load_data = DataManager.loadData
+    monkeypatch.setattr(DataManager, 'loadData',
+                        lambda self, *args, **kwargs: loads.append(1) or load_data(self, *args, **kwargs))
+
+    pd.testing.assert_frame_equal(data_manager.prepareData(), first)
+    assert loads == []
+
+    ingest(session, '2025-01-03', 6)
+    assert len(data_manager.prepareData()) == len(first) + 2
+    assert len(loads) == 1
+
+    # Mesure corrigée sans nouvelle ligne (upsert) : l'empreinte change avec la date de dernière écriture
+    written_at = PipelineWatermarkRepository(session).get_value('data_reel_timeseries:berlin')
+    DataReelTimeseriesRepository(session).upsert_from_dataframe(pd.DataFrame({
+        'time': [pd.Timestamp('2025-01-01 04:00')], 'temperature_2m': [99.0], 'relative_humidity_2m': [50.0]}))
+    session.commit()
+    assert PipelineWatermarkRepository(session).get_value('data_reel_timeseries:berlin') > written_at
+    corrected = data_manager.prepareData()
+    assert len(loads) == 2
+    assert corrected['y'].iloc[1] == pytest.approx(first['y'].iloc[1] + (99.0 - 4.0) / 3)
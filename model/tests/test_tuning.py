@@ -0,0 +1,79 @@
+import time
+
+import numpy as np
+import optuna
+import pandas as pd
+import pytest
+from optuna.trial import TrialState
+
+from model.pipeline.timeseries.classes.XGBoostManager import TuningObjective, XGBoostManager, optimize_worker, study_storage
+
+FINISHED = (TrialState.COMPLETE, TrialState.PRUNED)
+
+
+def synthetic_train(rows=240):
+    rng = np.random.default_rng(1)
+    t = np.arange(rows)
+    return pd.DataFrame({
+        'ds': pd.date_range('2025-01-01', periods=rows, freq='3h'),
+        'y': 10 + 5 * np.sin(2 * np.pi * t / 8) + rng.normal(0, 0.5, rows),
+    })
+
+
+def test_parallel_tuning_resumes_study(tmp_path):
+    """
+    Le tuning parallèle partage une étude persistée (tune_<site> par défaut) : une exécution interrompue
+    est reprise jusqu'au nombre d'essais demandé, sans échec des essais encore actifs ;
+    une étude allée à son terme est recommencée au tuning suivant
+    """
+    storage = str(tmp_path / "study.log")
+
+    # Exécution interrompue : deux essais terminés, un essai abandonné, un essai d'un processus encore actif
+    optuna.create_study(study_name="tune_paris", storage=study_storage(storage))
+    optimize_worker(storage, "tune_paris", TuningObjective(synthetic_train(), XGBoostManager.MAX_LAGS), 2)
+    interrupted = optuna.load_study(study_name="tune_paris", storage=study_storage(storage))
+    stale, active = interrupted.ask(), interrupted.ask()
+    stale.set_user_attr('heartbeat', time.time() - 3600)
+
+    resumed = XGBoostManager(n_trials=6, n_workers=2, storage=storage, location_id='paris')
+    resumed.tune(synthetic_train())
+    states = {t.number: t.state for t in resumed.params.get_trials()}
+    assert resumed.study_name == "tune_paris"
+    assert states[0] in FINISHED and states[1] in FINISHED
+    assert states[stale.number] == TrialState.FAIL
+    assert states[active.number] == TrialState.RUNNING
+    assert len([state for state in states.values() if state in FINISHED]) >= 6
+    assert 'n_lags' in resumed.params.best_params
+
+    retune = XGBoostManager(n_trials=2, n_workers=1, storage=storage, location_id='paris')
+    retune.tune(synthetic_train())
+    assert len(retune.params.get_trials()) == 2
+
+
+def test_objective_records_effective_rounds():
+    """
+    Avec l'arrêt anticipé, chaque essai enregistre le nombre de tours utiles,
+    repris comme n_estimators pour l'entraînement final
+    """
+    xgb = XGBoostManager(n_trials=3, early_stopping_rounds=5)
+    xgb.tune(synthetic_train())
+
+    best_trial = xgb.params.best_trial
+    assert len(best_trial.user_attrs['n_rounds']) == 3
+    assert best_trial.user_attrs['best_n_estimators'] <= best_trial.params['n_estimators']
+
+
+def test_fast_path_matches_regressor_path():
+    """
+    Le chemin rapide (API native, QuantileDMatrix réutilisées) donne le même score
+    que le chemin XGBRegressor pour des paramètres fixés
+    """
+    params = {'n_lags': 3, 'n_estimators': 60, 'max_depth': 4, 'learning_rate': 0.1, 'subsample': 0.8}
+    scores = {}
+    for fast_path in (False, True):
+        objective = TuningObjective(synthetic_train(), XGBoostManager.MAX_LAGS, n_jobs=1,
+                                    early_stopping_rounds=5, fast_path=fast_path)
+        trial = optuna.trial.FixedTrial(params)
+        scores[fast_path] = objective(trial)
+
+    assert scores[True] == pytest.approx(scores[False], rel=1e-3)
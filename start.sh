@@ -3,7 +3,5 @@ set -e
 
 echo "Démarrage du pipeline..."
 
-# Exécuter les commandes en séquence
-python ./data/fetch_data.py
-python -m model.pipeline.PipelineOrchestrator
-python -m model.pipeline.PipelineBatchPredictor
+# Collecte, entraînement et prédictions batch dans un seul processus
+python -m model.pipeline.PipelineRunner